@@ -18,11 +18,15 @@ class Commands():
         self.detailsPlaylistCommands = ["detailsplaylist", "dp"]
         self.ListWatchedCommands = ["listwatched", "lw"]
         self.fetchPlaylistSourcesCommands = ["fetch", "f", "update", "u"]
+        self.fetchDaemonCommands = ["fetchd"]
         self.prunePlaylistCommands = ["prune"]
         self.purgePlaylistCommands = ["purgeplaylists", "pp"]
         self.purgeCommands = ["purge"]
         self.resetPlaylistFetchCommands = ["reset"]
         self.downloadPlaylistCommands = ["downloadplaylist", "dwpl"]
+        self.listDownloadsCommands = ["downloads", "dwl"]
+        self.retryDownloadsCommands = ["retrydownloads", "dwr"]
+        self.drainDownloadsCommands = ["drain", "dwd"]
         self.exportPlaylistCommands = ["export"]
         self.unwatchAllPlaylistCommands = ["unwatchall"]
         
@@ -54,6 +58,9 @@ class Commands():
         self.listSettingsCommands = ["settings", "secrets"]
         self.listSoftDeletedCommands = ["listsoftdeleted", "listdeleted", "lsd", "ld"]
         self.refactorCommands = ["refactor"]
+        self.migrateStorageCommands = ["migratestorage"]
+        self.rebuildIndexCommands = ["rebuildindex"]
+        self.storageQuotaCommands = ["storage", "quota"]
         
     def getHelpString(self) -> str:
         """
@@ -115,12 +122,16 @@ class Commands():
         result += "\n" + str(self.listPlaylistCommands) + " [? includeSoftDeleted: bool]: List Playlists with indices that can be used instead of IDs in other commands."
         result += "\n" + str(self.detailsPlaylistCommands) + " [playlistIds or indices: list] [? includeUri: bool] [? includeId: bool] [? includeDaterTime: bool] [? includeListCount: bool] [? includeSource: bool]: Prints details about given playlist, with option for including fields of StreamSources and QueueStreams (like datetimes or IDs)."
         result += "\n" + str(self.fetchPlaylistSourcesCommands) + " [playlistIds or indices: list] [? takeAfter: datetime] [? takeBefore: datetime] [? takeNewOnly: bool]: Fetch new streams from StreamSources in Playlists indicated, e.g. if a Playlist has a YouTube channel as a source, and the channel uploads a new video, this video will be added to the Playlist. Optional arguments takeAfter: only fetch QueueStreams after this date, takeBefore: only fetch QueueStreams before this date. Dates formatted like \"2022-01-30\" (YYYY-MM-DD)."
+        result += "\n" + str(self.fetchDaemonCommands) + " [? playlistIds or indices: list]: Keep fetching new streams for Playlists indicated (all if none) until stopped with Ctrl+C. Each StreamSource is fetched more or less often depending on how often it has new streams, between FETCHD_MIN_INTERVAL and FETCHD_MAX_INTERVAL minutes, and at most FETCHD_REQUESTS_PER_MINUTE requests are sent per minute."
         result += "\n" + str(self.prunePlaylistCommands) + " [playlistIds or indices: list] [? includeSoftDeleted: bool] [? permanentlyDelete: bool]: Prune Playlists indicated, deleting watched QueueStreams."
         result += "\n" + str(self.purgePlaylistCommands) + ": Purge all Playlists, removing IDs with no corresponding relation and deleting StreamSources and QueueStreams with no linked IDs in Playlists."
         result += "\n" + str(self.purgeCommands) + ": Purge all soft deleted entities."
         result += "\n" + str(self.resetPlaylistFetchCommands) + " [playlistIds or indices: list]: Resets fetch status of StreamSources in a Playlist and deletes QueueStreams from Playlist."
-        result += "\n" + str(self.playCommands) + " [playlistId or index: str] [? startIndex: int] [? shuffle: bool] [? repeat: bool]: Start playing stream from a Playlist, order and automation (like skipping already watched QueueStreams) depending on the input and Playlist."
+        result += "\n" + str(self.playCommands) + " [playlistId or index: str] [? startIndex: int] [? shuffle: bool] [? repeat: bool]: Start playing stream from a Playlist, order and automation (like skipping already watched QueueStreams) depending on the input and Playlist. Without startIndex, playback resumes where it last stopped, in the same shuffled order if shuffle."
         result += "\n" + str(self.downloadPlaylistCommands) + " [playlistId or index: str] [? directoryName: str] [? startIndex: int] [? endIndex: int] [? streamNameRegex: str] [? useIndex: bool]: Download streams from web sources for given playlist, with optional directory name (under localStoragePath in settings), start-end index, regex for naming streams (e.g. all streams are named \"Podcast guys: Actual Title\", use regex \": (.*)\", including \"s), and option to add index (+1) on stream names so they naturally sort in order."
+        result += "\n" + str(self.listDownloadsCommands) + " [? state: str]: List downloads in the download queue, optionally only those in state queued, running, failed or done. Downloads from downloadplaylist and StreamSources with alwaysDownload are queued here and retried up to DOWNLOAD_RETRIES times if they fail."
+        result += "\n" + str(self.retryDownloadsCommands) + " [? downloadIds or indices: list]: Queue failed downloads again, all failed downloads if none are given."
+        result += "\n" + str(self.drainDownloadsCommands) + ": Run all queued downloads that are not waiting to be retried, including downloads interrupted when the program last stopped."
         result += "\n" + str(self.exportPlaylistCommands) + " [playlistId or index: str] [? directoryName: str]: Export all sources and streams in a list to a text files."
         # result += "\n" + str(self.unwatchAllPlaylistCommands) + " [playlistId or index: str]: Mark all streams in a playlist as unwatched."
         result += self.getPlaylistArgumentsHelpString()
@@ -194,6 +205,9 @@ class Commands():
         result += "\n" + str(self.listSettingsCommands) + ": Lists settings currently used by program. These settings can also be found in the file named \".env\" with examples in the file \".env-example\"."
         result += "\n" + str(self.listSoftDeletedCommands) + " [? simplified: bool]: Lists all soft deleted entities. Option for simplified, less verbose list."
         result += "\n" + str(self.refactorCommands) + ": Refactor old code/data (JSON-file storage only)."
+        result += "\n" + str(self.migrateStorageCommands) + ": Copy all entities from JSON-file storage to the SQLite database (SQLITE_FILEPATH in settings). Set STORAGE_ENGINE to \"sqlite\" afterwards to use it."
+        result += "\n" + str(self.rebuildIndexCommands) + ": Rebuild the index of QueueStreams used to find duplicates when adding to Playlists, from storage. Needed if entities were edited outside the program."
+        result += "\n" + str(self.storageQuotaCommands) + " [? evict: bool]: Report disk space used by downloaded videos and which would be evicted to stay within VIDEO_STORAGE_LIMIT, least recently used first, watched or deleted before others. Evicts them if evict is True. Also done automatically after downloads finish."
 
         return result
     
\ No newline at end of file
@@ -4,19 +4,25 @@ import sys
 from grdUtil.BashColor import BashColor
 from grdUtil.FileUtil import makeFiles
 from grdUtil.InputUtil import extractArgs, getIdsFromInput, getIfExists
-from grdUtil.PrintUtil import printLists, printS
+from grdUtil.PrintUtil import printD, printLists, printS
 from model.StreamSource import StreamSource
 
 from Commands import Commands
+from repositories.EntityCache import EntityCache
 from controllers.PlaylistCliController import PlaylistCliController
 from controllers.QueueStreamCliController import QueueStreamCliController
 from controllers.SharedCliController import SharedCliController
 from controllers.StreamSourceCliController import StreamSourceCliController
+from services.DownloadJobService import DownloadJobService
 from services.DownloadService import DownloadService
+from services.FetchDaemonService import FetchDaemonService
 from services.FetchService import FetchService
+from services.HttpService import HttpService
 from services.LegacyService import LegacyService
 from services.PlaylistService import PlaylistService
 from services.SharedService import SharedService
+from services.StorageMigrationService import StorageMigrationService
+from services.StorageQuotaService import StorageQuotaService
 from services.StreamSourceService import StreamSourceService
 from Settings import Settings
 
@@ -24,11 +30,15 @@ from Settings import Settings
 class Main:
     commands: Commands = Commands()
     settings: Settings = Settings()
+    downloadJobService: DownloadJobService = DownloadJobService()
     downloadService: DownloadService = DownloadService()
+    fetchDaemonService: FetchDaemonService = FetchDaemonService()
     fetchService: FetchService = FetchService()
     legacyService: LegacyService = LegacyService()
     playlistService: PlaylistService = PlaylistService()
     sharedService: SharedService = SharedService()
+    storageMigrationService: StorageMigrationService = StorageMigrationService()
+    storageQuotaService: StorageQuotaService = StorageQuotaService()
     streamSourceService: StreamSourceService = StreamSourceService()
     sharedCliController: SharedCliController = SharedCliController()
     playlistCliController: PlaylistCliController = PlaylistCliController()
@@ -73,6 +83,11 @@ class Main:
                         argIndex += len(inputArgs) + 1
                         continue
 
+                    if(Main.playlistService.usesSqlite()):
+                        printS("Failed to edit, Playlists are stored in SQLite (STORAGE_ENGINE in settings) and have no JSON file.", color = BashColor.FAIL)
+                        argIndex += len(inputArgs) + 1
+                        continue
+
                     filepath = os.path.join(Main.settings.localStoragePath, "Playlist", ids[0] + ".json")
                     filepath = str(filepath).replace("\\", "/")
                     os.startfile(filepath)
@@ -195,6 +210,18 @@ class Main:
                     argIndex += len(inputArgs) + 1
                     continue
 
+                elif(arg in Main.commands.fetchDaemonCommands):
+                    # Expected input: playlistIds or indices?
+                    inputArgs = extractArgs(argIndex, argV)
+                    playlistIds = getIdsFromInput(inputArgs, Main.playlistService.getAllIdsSorted(), Main.playlistService.getAllSorted(), startAtZero = False, debug = Main.settings.debug)
+                    if(len(playlistIds) == 0):
+                        playlistIds = Main.playlistService.getAllIdsSorted()
+
+                    Main.fetchDaemonService.run(playlistIds, Main.settings.fetchLimitSingleSource)
+
+                    argIndex += len(inputArgs) + 1
+                    continue
+
                 elif(arg in Main.commands.prunePlaylistCommands):
                     # Expected input: playlistIds or indices, includeSoftDeleted, permanentlyDelete, "accept changes" input within method
                     inputArgs = extractArgs(argIndex, argV)
@@ -239,7 +266,7 @@ class Main:
                     # Expected input: playlistId or index, startIndex, shuffle, repeat
                     inputArgs = extractArgs(argIndex, argV)
                     playlistIds = getIdsFromInput(inputArgs, Main.playlistService.getAllIdsSorted(), Main.playlistService.getAllSorted(), 1, startAtZero = False, debug = Main.settings.debug)
-                    startIndex = int(inputArgs[1]) - 1 if(len(inputArgs) > 1) else 0
+                    startIndex = int(inputArgs[1]) - 1 if(len(inputArgs) > 1) else None
                     shuffle = eval(inputArgs[2]) if(len(inputArgs) > 2) else False
                     repeat = eval(inputArgs[3]) if(len(inputArgs) > 3) else False
                     
@@ -263,6 +290,34 @@ class Main:
                     argIndex += len(inputArgs) + 1
                     continue
 
+                elif(arg in Main.commands.listDownloadsCommands):
+                    # Expected input: state?
+                    inputArgs = extractArgs(argIndex, argV)
+                    stateName = inputArgs[0] if(len(inputArgs) > 0) else None
+                    
+                    Main.playlistCliController.listDownloads(stateName)
+                    
+                    argIndex += len(inputArgs) + 1
+                    continue
+
+                elif(arg in Main.commands.retryDownloadsCommands):
+                    # Expected input: downloadIds or indices?
+                    inputArgs = extractArgs(argIndex, argV)
+                    downloadIds = getIdsFromInput(inputArgs, Main.downloadJobService.getAllIdsSorted(), Main.downloadJobService.getAllSorted(), startAtZero = False, debug = Main.settings.debug)
+                    
+                    Main.playlistCliController.retryDownloads(downloadIds)
+                    
+                    argIndex += len(inputArgs) + 1
+                    continue
+
+                elif(arg in Main.commands.drainDownloadsCommands):
+                    # Expected input: None
+                    
+                    Main.playlistCliController.drainDownloads()
+                    
+                    argIndex += 1
+                    continue
+
                 elif(arg in Main.commands.exportPlaylistCommands):
                     # Expected input: playlistId or index, directoryName?
                     inputArgs = extractArgs(argIndex, argV)
@@ -426,6 +481,36 @@ class Main:
 
                     argIndex += 1
                     continue
+                
+                elif(arg in Main.commands.migrateStorageCommands):
+                    # Expected input: None
+                    
+                    migrateResult = Main.storageMigrationService.migrateJsonToSqlite()
+                    printS("Migrated ", sum(migrateResult.values()), " entities to ", Main.settings.sqliteFilepath, ".", color = BashColor.OKGREEN)
+                    if(Main.settings.storageEngine != "sqlite"):
+                        printS("Set STORAGE_ENGINE to \"sqlite\" in .env to start using the database.", color = BashColor.WARNING)
+
+                    argIndex += 1
+                    continue
+
+                elif(arg in Main.commands.rebuildIndexCommands):
+                    # Expected input: None
+
+                    rebuildResult = Main.playlistService.rebuildStreamIndex()
+                    printS("Indexed ", rebuildResult, " QueueStreams.", color = BashColor.OKGREEN)
+
+                    argIndex += 1
+                    continue
+
+                elif(arg in Main.commands.storageQuotaCommands):
+                    # Expected input: evict?
+                    inputArgs = extractArgs(argIndex, argV)
+                    evict = eval(inputArgs[0]) if(len(inputArgs) > 0) else False
+
+                    Main.storageQuotaService.enforce(dryRun = not evict)
+
+                    argIndex += len(inputArgs) + 1
+                    continue
 
                 # Invalid
                 else:
@@ -435,5 +520,10 @@ class Main:
         except KeyboardInterrupt:
             printS("Program was aborted by user.", color = BashColor.OKGREEN)
 
+        cacheStats = EntityCache.getStats()
+        printD("Entity cache: ", cacheStats["hits"], " hits, ", cacheStats["misses"], " misses, ", cacheStats["invalidations"], " invalidations, ", cacheStats["entries"], " entities cached.", debug = Main.settings.debug)
+        httpStats = HttpService.getStats()
+        printD("HTTP: ", httpStats["requests"], " requests, ", httpStats["bytes"], " bytes read.", debug = Main.settings.debug)
+
 if __name__ == "__main__":
     Main.main()
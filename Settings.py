@@ -17,6 +17,34 @@ class Settings():
     logDirPath: str = None
     browserBin: str = None
     fetchLimitSingleSource: int = None
+    storageEngine: str = None
+    sqliteFilepath: str = None
+    fetchWorkers: int = None
+    httpConnectTimeout: float = None
+    httpReadTimeout: float = None
+    httpPoolSize: int = None
+    httpCacheMaxEntries: int = None
+    entityCacheMaxEntries: int = None
+    fetchdMinInterval: float = None
+    fetchdMaxInterval: float = None
+    fetchdRequestsPerMinute: int = None
+    httpHostRate: float = None
+    httpRetries: int = None
+    httpBackoffBase: float = None
+    circuitBreakerThreshold: int = None
+    circuitBreakerCooldown: float = None
+    seenIdsCapacity: int = None
+    downloadChunkSize: int = None
+    downloadWorkers: int = None
+    downloadHostWorkers: int = None
+    downloadBandwidthLimit: float = None
+    downloadRetries: int = None
+    downloadRetryBackoff: float = None
+    downloadPriorityStreams: int = None
+    videoStorageLimit: float = None
+    evictionProtectedStreams: int = None
+    watchedFlushInterval: float = None
+    prefetchStreams: int = None
     
     def __init__(self):
         envFilePath = ".env"
@@ -35,6 +63,34 @@ class Settings():
         self.logDirPath = os.environ.get("LOG_DIR_PATH")
         self.browserBin = os.environ.get("BROWSER_BIN")
         self.fetchLimitSingleSource =  int(os.environ.get("FETCH_LIMIT_SINGLE_SOURCE"))
+        self.storageEngine = os.environ.get("STORAGE_ENGINE", "json").lower()
+        self.sqliteFilepath = os.environ.get("SQLITE_FILEPATH") or os.path.join(self.localStoragePath, "storage.db")
+        self.fetchWorkers = int(os.environ.get("FETCH_WORKERS", "4"))
+        self.httpConnectTimeout = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+        self.httpReadTimeout = float(os.environ.get("HTTP_READ_TIMEOUT", "30"))
+        self.httpPoolSize = int(os.environ.get("HTTP_POOL_SIZE", "10"))
+        self.httpCacheMaxEntries = int(os.environ.get("HTTP_CACHE_MAX_ENTRIES", "1000"))
+        self.entityCacheMaxEntries = int(os.environ.get("ENTITY_CACHE_MAX_ENTRIES", "5000"))
+        self.fetchdMinInterval = float(os.environ.get("FETCHD_MIN_INTERVAL", "15"))
+        self.fetchdMaxInterval = float(os.environ.get("FETCHD_MAX_INTERVAL", "1440"))
+        self.fetchdRequestsPerMinute = int(os.environ.get("FETCHD_REQUESTS_PER_MINUTE", "30"))
+        self.httpHostRate = float(os.environ.get("HTTP_HOST_RATE", "2"))
+        self.httpRetries = int(os.environ.get("HTTP_RETRIES", "3"))
+        self.httpBackoffBase = float(os.environ.get("HTTP_BACKOFF_BASE", "1"))
+        self.circuitBreakerThreshold = int(os.environ.get("CIRCUIT_BREAKER_THRESHOLD", "5"))
+        self.circuitBreakerCooldown = float(os.environ.get("CIRCUIT_BREAKER_COOLDOWN", "30"))
+        self.seenIdsCapacity = int(os.environ.get("SEEN_IDS_CAPACITY", "5000"))
+        self.downloadChunkSize = int(os.environ.get("DOWNLOAD_CHUNK_SIZE", "1024"))
+        self.downloadWorkers = int(os.environ.get("DOWNLOAD_WORKERS", "3"))
+        self.downloadHostWorkers = int(os.environ.get("DOWNLOAD_HOST_WORKERS", "2"))
+        self.downloadBandwidthLimit = float(os.environ.get("DOWNLOAD_BANDWIDTH_LIMIT", "0"))
+        self.downloadRetries = int(os.environ.get("DOWNLOAD_RETRIES", "3"))
+        self.downloadRetryBackoff = float(os.environ.get("DOWNLOAD_RETRY_BACKOFF", "5"))
+        self.downloadPriorityStreams = int(os.environ.get("DOWNLOAD_PRIORITY_STREAMS", "5"))
+        self.videoStorageLimit = float(os.environ.get("VIDEO_STORAGE_LIMIT", "0"))
+        self.evictionProtectedStreams = int(os.environ.get("EVICTION_PROTECTED_STREAMS", "5"))
+        self.watchedFlushInterval = float(os.environ.get("WATCHED_FLUSH_INTERVAL", "5"))
+        self.prefetchStreams = int(os.environ.get("PREFETCH_STREAMS", "3"))
     
     def getAllSettingsAsString(self) -> str:
         """
@@ -53,7 +109,35 @@ class Settings():
                "\n", "WATCHED_LOG_FILEPATH: ", self.watchedLogFilepath,
                "\n", "LOG_DIR_PATH: ", self.logDirPath,
                "\n", "BROWSER_BIN: ", self.browserBin,
-               "\n", "FETCH_LIMIT_SINGLE_SOURCE: ", self.fetchLimitSingleSource)
+               "\n", "FETCH_LIMIT_SINGLE_SOURCE: ", self.fetchLimitSingleSource,
+               "\n", "STORAGE_ENGINE: ", self.storageEngine,
+               "\n", "SQLITE_FILEPATH: ", self.sqliteFilepath,
+               "\n", "FETCH_WORKERS: ", self.fetchWorkers,
+               "\n", "HTTP_CONNECT_TIMEOUT: ", self.httpConnectTimeout,
+               "\n", "HTTP_READ_TIMEOUT: ", self.httpReadTimeout,
+               "\n", "HTTP_POOL_SIZE: ", self.httpPoolSize,
+               "\n", "HTTP_CACHE_MAX_ENTRIES: ", self.httpCacheMaxEntries,
+               "\n", "ENTITY_CACHE_MAX_ENTRIES: ", self.entityCacheMaxEntries,
+               "\n", "FETCHD_MIN_INTERVAL: ", self.fetchdMinInterval,
+               "\n", "FETCHD_MAX_INTERVAL: ", self.fetchdMaxInterval,
+               "\n", "FETCHD_REQUESTS_PER_MINUTE: ", self.fetchdRequestsPerMinute,
+               "\n", "HTTP_HOST_RATE: ", self.httpHostRate,
+               "\n", "HTTP_RETRIES: ", self.httpRetries,
+               "\n", "HTTP_BACKOFF_BASE: ", self.httpBackoffBase,
+               "\n", "CIRCUIT_BREAKER_THRESHOLD: ", self.circuitBreakerThreshold,
+               "\n", "CIRCUIT_BREAKER_COOLDOWN: ", self.circuitBreakerCooldown,
+               "\n", "SEEN_IDS_CAPACITY: ", self.seenIdsCapacity,
+               "\n", "DOWNLOAD_CHUNK_SIZE: ", self.downloadChunkSize,
+               "\n", "DOWNLOAD_WORKERS: ", self.downloadWorkers,
+               "\n", "DOWNLOAD_HOST_WORKERS: ", self.downloadHostWorkers,
+               "\n", "DOWNLOAD_BANDWIDTH_LIMIT: ", self.downloadBandwidthLimit,
+               "\n", "DOWNLOAD_RETRIES: ", self.downloadRetries,
+               "\n", "DOWNLOAD_RETRY_BACKOFF: ", self.downloadRetryBackoff,
+               "\n", "DOWNLOAD_PRIORITY_STREAMS: ", self.downloadPriorityStreams,
+               "\n", "VIDEO_STORAGE_LIMIT: ", self.videoStorageLimit,
+               "\n", "EVICTION_PROTECTED_STREAMS: ", self.evictionProtectedStreams,
+               "\n", "WATCHED_FLUSH_INTERVAL: ", self.watchedFlushInterval,
+               "\n", "PREFETCH_STREAMS: ", self.prefetchStreams)
         
     def getAllSettingsAsTable(self) -> str:
         """
@@ -72,7 +156,35 @@ class Settings():
             "WATCHED_LOG_FILEPATH", 
             "LOG_DIR_PATH", 
             "BROWSER_BIN", 
-            "FETCH_LIMIT_SINGLE_SOURCE"]
+            "FETCH_LIMIT_SINGLE_SOURCE",
+            "STORAGE_ENGINE",
+            "SQLITE_FILEPATH",
+            "FETCH_WORKERS",
+            "HTTP_CONNECT_TIMEOUT",
+            "HTTP_READ_TIMEOUT",
+            "HTTP_POOL_SIZE",
+            "HTTP_CACHE_MAX_ENTRIES",
+            "ENTITY_CACHE_MAX_ENTRIES",
+            "FETCHD_MIN_INTERVAL",
+            "FETCHD_MAX_INTERVAL",
+            "FETCHD_REQUESTS_PER_MINUTE",
+            "HTTP_HOST_RATE",
+            "HTTP_RETRIES",
+            "HTTP_BACKOFF_BASE",
+            "CIRCUIT_BREAKER_THRESHOLD",
+            "CIRCUIT_BREAKER_COOLDOWN",
+            "SEEN_IDS_CAPACITY",
+            "DOWNLOAD_CHUNK_SIZE",
+            "DOWNLOAD_WORKERS",
+            "DOWNLOAD_HOST_WORKERS",
+            "DOWNLOAD_BANDWIDTH_LIMIT",
+            "DOWNLOAD_RETRIES",
+            "DOWNLOAD_RETRY_BACKOFF",
+            "DOWNLOAD_PRIORITY_STREAMS",
+            "VIDEO_STORAGE_LIMIT",
+            "EVICTION_PROTECTED_STREAMS",
+            "WATCHED_FLUSH_INTERVAL",
+            "PREFETCH_STREAMS"]
         settings = [self.debug,
             self.localStoragePath,
             self.logWatched,
@@ -82,7 +194,35 @@ class Settings():
             self.watchedLogFilepath,
             self.logDirPath,
             self.browserBin,
-            self.fetchLimitSingleSource]
+            self.fetchLimitSingleSource,
+            self.storageEngine,
+            self.sqliteFilepath,
+            self.fetchWorkers,
+            self.httpConnectTimeout,
+            self.httpReadTimeout,
+            self.httpPoolSize,
+            self.httpCacheMaxEntries,
+            self.entityCacheMaxEntries,
+            self.fetchdMinInterval,
+            self.fetchdMaxInterval,
+            self.fetchdRequestsPerMinute,
+            self.httpHostRate,
+            self.httpRetries,
+            self.httpBackoffBase,
+            self.circuitBreakerThreshold,
+            self.circuitBreakerCooldown,
+            self.seenIdsCapacity,
+            self.downloadChunkSize,
+            self.downloadWorkers,
+            self.downloadHostWorkers,
+            self.downloadBandwidthLimit,
+            self.downloadRetries,
+            self.downloadRetryBackoff,
+            self.downloadPriorityStreams,
+            self.videoStorageLimit,
+            self.evictionProtectedStreams,
+            self.watchedFlushInterval,
+            self.prefetchStreams]
         settingsStrings = [str(s) for s in settings]
         
         overlyComplicatedSettingsListList = []
@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from jsonpath_ng import parse
+
+from services.ParseService import ParseService
+
+fixturesDirectory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def loadFixtures() -> dict:
+    """
+    Load recorded channel pages from benchmarks/fixtures, see --record.
+
+    Returns:
+        dict: Page content (bytes) by filename.
+    """
+
+    if(not os.path.isdir(fixturesDirectory)):
+        return {}
+
+    result = {}
+    for filename in sorted(os.listdir(fixturesDirectory)):
+        if(filename.endswith(".html")):
+            with open(os.path.join(fixturesDirectory, filename), "rb") as file:
+                result[filename] = file.read()
+
+    return result
+
+def record(url: str, name: str) -> None:
+    """
+    Save page at url as a fixture.
+
+    Args:
+        url (str): URL of page, like https://www.youtube.com/@channel/videos.
+        name (str): Name of fixture, without extension.
+    """
+
+    from services.HttpService import HttpService
+
+    os.makedirs(fixturesDirectory, exist_ok = True)
+    response = HttpService().get(url)
+    response.raise_for_status()
+    with open(os.path.join(fixturesDirectory, f"{name}.html"), "wb") as file:
+        file.write(response.content)
+
+    print(f"Saved {len(response.content)} bytes to {name}.html")
+
+def syntheticChannelPage(videoCount: int) -> bytes:
+    """
+    Build a page shaped like a YouTube channel videos tab, for running without recorded fixtures.
+
+    Args:
+        videoCount (int): Number of videos on page.
+
+    Returns:
+        bytes: HTML.
+    """
+
+    items = [{"richItemRenderer": {"content": {"videoRenderer": {
+        "videoId": f"vid{i:08d}",
+        "thumbnail": {"thumbnails": [{"url": f"https://i.ytimg.com/vi/vid{i:08d}/hq{size}.jpg", "width": size, "height": size} for size in [168, 196, 246, 336]]},
+        "title": {"runs": [{"text": f"Video number {i}"}], "accessibility": {"accessibilityData": {"label": f"Video number {i} by Channel"}}},
+        "descriptionSnippet": {"runs": [{"text": "Lorem ipsum dolor sit amet " * 8}]},
+        "publishedTimeText": {"simpleText": f"{i + 1} days ago"},
+        "lengthText": {"simpleText": f"{i % 60}:{i % 60:02d}"},
+        "viewCountText": {"simpleText": f"{i * 1000} views"},
+        "navigationEndpoint": {"commandMetadata": {"webCommandMetadata": {"url": f"/watch?v=vid{i:08d}"}}}}}}} for i in range(videoCount)]
+    data = {"contents": {"twoColumnBrowseResultsRenderer": {"tabs": [{"tabRenderer": {"title": "Videos", "content": {"richGridRenderer": {"contents": items}}}}]}},
+        "header": {"c4TabbedHeaderRenderer": {"title": "Channel"}},
+        "frameworkUpdates": {"entityBatchUpdate": {"mutations": [{"entityKey": f"key{i}", "payload": {"value": "x" * 200}} for i in range(videoCount * 4)]}}}
+    filler = "".join([f"<div class=\"filler\"><span>{i}</span></div>" for i in range(videoCount * 40)])
+    return "".join(["<html><head><script>var ytcfg = {};</script></head><body>", filler,
+        "<script nonce=\"x\">var ytInitialData = ", json.dumps(data), ";</script>",
+        "<script>var other = 1;</script></body></html>"]).encode("utf-8")
+
+def syntheticRumblePage(videoCount: int) -> bytes:
+    """
+    Build a page shaped like a Rumble channel page, for running without recorded fixtures.
+
+    Args:
+        videoCount (int): Number of videos on page.
+
+    Returns:
+        bytes: HTML.
+    """
+
+    navigation = "".join([f"<li class=\"nav-item\"><a href=\"/c/other{i}\"><img src=\"/i/{i}.png\" alt=\"Other {i}\"/>Other channel {i}</a></li>" for i in range(videoCount * 10)])
+    entries = "".join([f"<li class=\"video-listing-entry\"><article class=\"video-item\"><a class=\"video-item--a\" href=\"/v{i:06d}-video.html\"><img class=\"video-item--img\" src=\"/t/{i}.jpg\"/></a>"
+        f"<span class=\"video-item--duration\" data-value=\"{i % 60}:{i % 60:02d}\"></span><div class=\"video-item--info\"><h3 class=\"video-item--title\">Video number {i}</h3>"
+        f"<div class=\"video-item--meta\">{i} views</div></div></article></li>" for i in range(videoCount)])
+    return "".join(["<html><head><title>Channel</title></head><body><nav><ul>", navigation, "</ul></nav><main><ol>", entries, "</ol></main></body></html>"]).encode("utf-8")
+
+def getInitialData(html: bytes) -> object:
+    text = html.decode("utf-8")
+    return json.loads(text.split("ytInitialData = ")[1].split(";</script>")[0])
+
+def extractJsonpath(data: object, batchSize: int) -> list:
+    """
+    Extraction as done by fetchYoutubeHtml before ParseService, re-walking the tree per video.
+    """
+
+    videoRenderer = parse("contents..videoRenderer")
+    videoId = parse("contents..videoRenderer.videoId")
+    title = parse("contents..title.runs[0].text")
+    streams = [_.value for _ in videoRenderer.find(data)][0:batchSize]
+    return [(videoId.find(data)[i].value, title.find(data)[i].value) for i, _ in enumerate(streams)]
+
+def extractParseService(parseService: ParseService, data: object, batchSize: int) -> list:
+    return [(_[0], _[1]) for _, i in zip(parseService.iterYoutubeVideos(data), range(batchSize))]
+
+def timeIt(function, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+
+    return (time.perf_counter() - started) / repeat
+
+def measure(function, repeat: int) -> tuple:
+    """
+    Get mean seconds and peak traced memory of function.
+
+    Returns:
+        tuple: Tuple of (seconds, peak bytes).
+    """
+
+    seconds = timeIt(function, repeat)
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+def parseYoutubeFullDom(html: bytes) -> object:
+    """
+    Page parse as done by fetchYoutubeHtml before ParseService.extractYtInitialData.
+    """
+
+    document = BeautifulSoup(html, "html.parser")
+    document.find_all("form", {"action": "https://consent.youtube.com/save"})
+    script = document.find(lambda tag: tag.name == "script" and "ytInitialData" in tag.text).text
+    return json.loads(script.split("ytInitialData = ")[1].split(";")[0])
+
+def parseYoutubeRaw(parseService: ParseService, html: bytes) -> object:
+    parseService.isYoutubeConsentPage(html)
+    return parseService.extractYtInitialData(html)
+
+def parseRumbleFullDom(html: bytes) -> list:
+    return BeautifulSoup(html, "html.parser").select(".video-listing-entry")
+
+def benchmarkPageParse(pages: dict, repeat: int) -> None:
+    parseService = ParseService()
+    print(f"Page parse, mean of {repeat} runs, peak traced memory of one run")
+    for name, html in pages.items():
+        if(b"ytInitialData" in html):
+            fullDom = measure(lambda: parseYoutubeFullDom(html), repeat)
+            fast = measure(lambda: parseYoutubeRaw(parseService, html), repeat)
+        elif(b"video-listing-entry" in html):
+            fullDom = measure(lambda: parseRumbleFullDom(html), repeat)
+            fast = measure(lambda: parseService.getRumbleListingEntries(html), repeat)
+        else:
+            print(f"\t{name}: not a YouTube or Rumble channel page, skipped")
+            continue
+
+        print(f"\t{name} ({len(html) / 1024:.0f} KiB): full DOM {fullDom[0] * 1000:.2f} ms / {fullDom[1] / 1024:.0f} KiB, "
+            f"fast path {fast[0] * 1000:.2f} ms / {fast[1] / 1024:.0f} KiB, {fullDom[0] / fast[0]:.1f}x")
+
+def benchmarkExtraction(pages: dict, batchSize: int, repeat: int) -> None:
+    parseService = ParseService()
+    print(f"ytInitialData extraction, batchSize {batchSize}, mean of {repeat} runs")
+    for name, html in pages.items():
+        if(b"ytInitialData" not in html):
+            continue
+
+        data = getInitialData(html)
+        jsonpathSeconds = timeIt(lambda: extractJsonpath(data, batchSize), repeat)
+        parseServiceSeconds = timeIt(lambda: extractParseService(parseService, data, batchSize), repeat)
+        print(f"\t{name}: jsonpath {jsonpathSeconds * 1000:.2f} ms, ParseService {parseServiceSeconds * 1000:.2f} ms, {jsonpathSeconds / parseServiceSeconds:.1f}x")
+
+if __name__ == "__main__":
+    argParser = argparse.ArgumentParser(description = "Benchmark parsing of channel pages. Run from the base directory of the project.")
+    argParser.add_argument("--record", nargs = 2, metavar = ("URL", "NAME"), help = "Save page at URL as fixture NAME and exit.")
+    argParser.add_argument("--synthetic", type = int, default = 0, metavar = "VIDEOS", help = "Also benchmark generated YouTube and Rumble pages with VIDEOS videos.")
+    argParser.add_argument("--batch-size", type = int, default = 30)
+    argParser.add_argument("--repeat", type = int, default = 5)
+    args = argParser.parse_args()
+
+    if(args.record != None):
+        record(args.record[0], args.record[1])
+        sys.exit(0)
+
+    pages = loadFixtures()
+    if(args.synthetic > 0):
+        pages[f"synthetic-youtube-{args.synthetic}"] = syntheticChannelPage(args.synthetic)
+        pages[f"synthetic-rumble-{args.synthetic}"] = syntheticRumblePage(args.synthetic)
+
+    if(len(pages) == 0):
+        print(f"No fixtures in {fixturesDirectory}. Record some with --record URL NAME, or use --synthetic VIDEOS.")
+        sys.exit(1)
+
+    benchmarkPageParse(pages, args.repeat)
+    benchmarkExtraction(pages, args.batch_size, args.repeat)
@@ -1,6 +1,6 @@
 import re
 from datetime import datetime
-from typing import List
+from typing import Dict, List
 
 from grdUtil.BashColor import BashColor
 from grdUtil.DateTimeUtil import getDateTime
@@ -9,18 +9,21 @@ from grdUtil.PrintUtil import printLists, printS
 from grdUtil.StaticUtil import StaticUtil
 
 from controllers.SharedCliController import SharedCliController
+from enums.DownloadJobState import DownloadJobState
+from model.DownloadJob import DownloadJob
 from model.Playlist import Playlist
-from services.DownloadService import DownloadService
+from services.DownloadJobService import DownloadJobService
 from services.FetchService import FetchService
 from services.PlaybackService import PlaybackService
 from services.PlaylistService import PlaylistService
 from services.QueueStreamService import QueueStreamService
+from services.RequestGovernorService import RequestGovernorService
 from services.StreamSourceService import StreamSourceService
 from Settings import Settings
 
 
 class PlaylistCliController():
-    downloadService: DownloadService() = None
+    downloadJobService: DownloadJobService = None
     fetchService: FetchService() = None
     playbackService: PlaybackService = None
     playlistService: PlaylistService = None
@@ -30,7 +33,7 @@ class PlaylistCliController():
     settings: Settings = None
 
     def __init__(self):
-        self.downloadService = DownloadService()
+        self.downloadJobService = DownloadJobService()
         self.fetchService = FetchService()
         self.playbackService = PlaybackService()
         self.playlistService = PlaylistService()
@@ -268,18 +271,41 @@ class PlaylistCliController():
             printS("Failed to fetch, missing playlistIds or indices.", color = BashColor.FAIL)
             return result
         
-        started = getDateTime()
-        for id in playlistIds:
-            if(self.settings.removeWatchedOnFetch):
+        if(self.settings.removeWatchedOnFetch):
+            for id in playlistIds:
                 self.sharedCliController.prune(id)
                 print("") # Space before fetching
-            
-            result += self.fetchService.fetch(id, batchSize, _takeAfter, _takeBefore, takeNewOnly)
-            playlist = self.playlistService.get(id)
-            completed = getDateTime()
-            duration = completed - started
-            printS(f"Fetched {result} for playlist \"{playlist.name}\" successfully in {duration}.", color = BashColor.OKGREEN)
+        
+        RequestGovernorService.resetStats()
+        started = getDateTime()
+        fetchResults = self.fetchService.fetchPlaylists(playlistIds, batchSize, _takeAfter, _takeBefore, takeNewOnly)
+        duration = getDateTime() - started
+        cacheHits = 0
+        cacheMisses = 0
+        fetchesSaved = 0
+        sourcesSkipped = 0
+        for fetchResult in fetchResults:
+            result += fetchResult.added
+            cacheHits += fetchResult.cacheHits
+            cacheMisses += fetchResult.cacheMisses
+            fetchesSaved += fetchResult.fetchesSaved
+            sourcesSkipped += fetchResult.sourcesSkipped
+            playlist = self.playlistService.get(fetchResult.playlistId)
+            if(playlist == None):
+                continue
+
+            printS(f"Fetched {fetchResult.added} for playlist \"{playlist.name}\" successfully.", color = BashColor.OKGREEN)
+            printS(fetchResult.sourceTimesString(), doPrint = (len(fetchResult.sourceSeconds) > 0))
     
+        printS(f"Fetched {result} in total in {duration}.", color = BashColor.OKGREEN, doPrint = (len(fetchResults) > 1))
+        printS(f"{fetchesSaved} fetch(es) saved by sources shared between playlists.", doPrint = (fetchesSaved > 0))
+        cacheRequests = cacheHits + cacheMisses
+        if(cacheRequests > 0):
+            printS(f"{cacheHits} of {cacheRequests} sources unchanged since last fetch ({cacheHits / cacheRequests:.0%} cache hit rate).")
+        
+        governorStats = RequestGovernorService.getStats()
+        printS(f"{sourcesSkipped} source(s) skipped as their host failed repeatedly, see CIRCUIT_BREAKER_COOLDOWN.", color = BashColor.WARNING, doPrint = (sourcesSkipped > 0))
+        printS(f"Requests: {governorStats['throttled']} delayed by HTTP_HOST_RATE, {governorStats['retries']} retried, {governorStats['failures']} failed, {governorStats['breakerTrips']} host(s) paused.", doPrint = (sum(governorStats.values()) > 0))
         return result
       
     def resetPlaylists(self, playlistIds: List[str]) -> int:
@@ -312,7 +338,7 @@ class PlaylistCliController():
 
         Args:
             playlistId (str): ID of playlist to play from.
-            startIndex (int): Index to start playing from.
+            startIndex (int): Index to start playing from, None to resume where playback stopped.
             shuffle (bool): Shuffle videos.
             repeatPlaylist (bool): repeat playlist once it reaches the end.
 
@@ -325,7 +351,7 @@ class PlaylistCliController():
             printS("Failed to play playlist, missing playlistIds or indices.", color = BashColor.FAIL)
             return result
         
-        if(not isNumber(startIndex, intOnly = True)):
+        if(startIndex != None and not isNumber(startIndex, intOnly = True)):
             printS("Failed to play playlist, input startIndex must be an integer.", color = BashColor.FAIL)
             return result
         
@@ -379,15 +405,34 @@ class PlaylistCliController():
             printS("Playlist \"", playlist.name, "\" has no streams, download aborted.", color = BashColor.OKGREEN)
             
         downloadDirectory = directory if(directory != None) else playlist.name
-        for i, streamId in enumerate(playlist.streamIds[startIndex:endIndex]):
-            stream = self.queueStreamService.get(streamId)
+        streamIds = playlist.streamIds[startIndex:endIndex]
+        streams = self.queueStreamService.getMany(streamIds)
+        priorities = self.downloadJobService.getPriorities(playlist)
+        self.downloadJobService.reclaim()
+        downloads = []
+        for i, stream in enumerate(streams):
+            if(stream == None):
+                printS("QueueStream with ID ", streamIds[i], " could not be found. Consider removing it using the purge or purgeplaylists commands.", color = BashColor.FAIL)
+                continue
             if(not stream.isWeb):
                 printS("Cannot download a non-web stream, \"", stream.name, "\" was skipped.", color = BashColor.WARNING)
                 continue
             
+            prefix = f"{i+1} " if(useIndex) else None
+            job = self.downloadJobService.enqueue(stream.uri, downloadDirectory, nameRegex, prefix, priorities.get(stream.id, 0), stream.id, playlist.id)
+            if(job == None):
+                printS("Stream \"", stream.name, "\" could not be queued for download, skipped.", color = BashColor.FAIL)
+                continue
+            if(job.stateId != DownloadJobState.QUEUED.value):
+                printS("Stream \"", stream.name, "\" is already being downloaded, skipped.", color = BashColor.WARNING)
+                continue
+
+            downloads.append((stream, self.downloadJobService.start(job)))
+        
+        self.downloadJobService.downloadExecutorService.wait([future for _, future in downloads])
+        for stream, future in downloads:
             try:
-                prefix = f"{i+1} " if(useIndex) else None
-                result.append(self.downloadService.download(stream.uri, downloadDirectory, nameRegex = nameRegexCompiled, prefix = prefix))
+                result.append(future.result())
             except AttributeError as e:
                 printS("Failed to download stream \"", stream.name, "\": Regex was not matched", color = BashColor.FAIL)
                 continue
@@ -400,6 +445,64 @@ class PlaylistCliController():
     
         return result
       
+    def listDownloads(self, stateName: str = None) -> List[DownloadJob]:
+        """
+        Print DownloadJobs in the download queue, with indices that can be used instead of IDs in retryDownloads.
+
+        Args:
+            stateName (str): Only DownloadJobs in this state (queued, running, failed or done). Defaults to None.
+
+        Returns:
+            List[DownloadJob]: DownloadJobs printed.
+        """
+
+        self.downloadJobService.reclaim()
+        states = [_.name.lower() for _ in DownloadJobState]
+        if(stateName != None and stateName.lower() not in states):
+            printS("Failed to list downloads, state must be one of ", states, ".", color = BashColor.FAIL)
+            return []
+
+        result = []
+        for (i, entry) in enumerate(self.downloadJobService.getAllSorted()):
+            if(stateName != None and DownloadJobState(entry.stateId).name.lower() != stateName.lower()):
+                continue
+
+            padI = str(i + 1).rjust(4, " ")
+            printS(padI, " - ", entry.summaryString())
+            result.append(entry)
+
+        if(len(result) == 0):
+            printS("No downloads found.", color = BashColor.WARNING)
+
+        return result
+
+    def retryDownloads(self, jobIds: List[str] = None) -> List[DownloadJob]:
+        """
+        Queue failed DownloadJobs again.
+
+        Args:
+            jobIds (List[str]): IDs of DownloadJobs. Defaults to None, which retries all failed.
+
+        Returns:
+            List[DownloadJob]: DownloadJobs queued.
+        """
+
+        result = self.downloadJobService.retry(jobIds if(jobIds != None and len(jobIds) > 0) else None)
+        printS("Queued ", len(result), " failed download(s) again, run them with \"drain\".", color = BashColor.OKGREEN if(len(result) > 0) else BashColor.WARNING)
+        return result
+
+    def drainDownloads(self) -> Dict[str, int]:
+        """
+        Run all downloads in the download queue that are due.
+
+        Returns:
+            Dict[str, int]: Number of DownloadJobs done, queued for retry and failed, by name.
+        """
+
+        result = self.downloadJobService.drain()
+        printS("Downloads done: ", result["done"], ", waiting to be retried: ", result["retry"], ", failed: ", result["failed"], ".", color = BashColor.OKGREEN if(result["failed"] == 0) else BashColor.WARNING)
+        return result
+
     def exportPlaylist(self, playlistId: str, directory: str = None) -> List[str]:
         """
         Export Playlist info to file.
@@ -0,0 +1,7 @@
+from enum import IntEnum
+
+class DownloadJobState(IntEnum):
+    QUEUED = 1,
+    RUNNING = 2,
+    FAILED = 3,
+    DONE = 4,
@@ -26,8 +26,15 @@ class StreamSourceTypeUtil():
             StreamSourceType: StreamSourceType if a fitting StreamSourceType was found, else None
         """
         
+        # Imported here as UrlService depends on StreamSourceType
+        from services.UrlService import UrlService
+
         if(os.path.isdir(source)):
             return StreamSourceType.DICTIONARY
+
+        sourceType = UrlService.canonicalize(source)[0]
+        if(sourceType != None):
+            return sourceType
         elif("youtu.be" in source or "youtube" in source):
             return StreamSourceType.YOUTUBE
         elif("odysee" in source):
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from grdUtil.DateTimeUtil import getDateTime
+from grdUtil.StrUtil import maxLen
+
+from enums.DownloadJobState import DownloadJobState
+
+
+class DownloadJob():
+    def __init__(self, 
+                 url: str = None,
+                 directory: str = None,
+                 nameRegex: str = None,
+                 prefix: str = None,
+                 queueStreamId: str = None,
+                 playlistId: str = None,
+                 stateId: int = DownloadJobState.QUEUED.value,
+                 priority: int = 0, # Descending, higher runs first
+                 attempts: int = 0,
+                 nextAttempt: float = None, # Timestamp, None if due now
+                 heartbeat: float = None, # Timestamp, last sign of life from the process running it
+                 lastError: str = None,
+                 path: str = None,
+                 deleted: datetime = None,
+                 added: datetime = getDateTime(),
+                 id: str = None):
+        self.url: str = url
+        self.directory: str = directory
+        self.nameRegex: str = nameRegex
+        self.prefix: str = prefix
+        self.queueStreamId: str = queueStreamId
+        self.playlistId: str = playlistId
+        self.stateId: int = stateId
+        self.priority: int = priority
+        self.attempts: int = attempts
+        self.nextAttempt: float = nextAttempt
+        self.heartbeat: float = heartbeat
+        self.lastError: str = lastError
+        self.path: str = path
+        self.deleted: datetime = deleted
+        self.added: datetime = added
+        self.id: str = id
+
+    def summaryString(self):
+        return "".join(map(str, [DownloadJobState(self.stateId).name.lower(),
+        ", priority ", self.priority,
+        ", attempts ", self.attempts,
+        ", URL: ", self.url,
+        ", path: " + str(self.path) if(self.path != None) else "",
+        ", error: \"" + maxLen(self.lastError, 60) + "\"" if(self.lastError != None and self.stateId != DownloadJobState.DONE.value) else ""]))
+
+    def detailsString(self, includeUri: bool = True, includeId: bool = True, includeDatetime: bool = True, includeListCount: bool = True):
+        uriString = ", url: " + self.url if(includeUri) else ""
+        idString = ", id: " + self.id if(includeId) else ""
+        queueStreamIdString = ", queueStreamId: " + str(self.queueStreamId) if(includeId) else ""
+        deletedString = ", deleted: " + str(self.deleted) if(includeDatetime) else ""
+        addedString = ", added: " + str(self.added) if(includeDatetime) else ""
+        
+        return "".join(map(str, ["state: ", DownloadJobState(self.stateId).name.lower(),
+        uriString,
+        ", directory: ", self.directory,
+        ", priority: ", self.priority,
+        ", attempts: ", self.attempts,
+        ", path: ", self.path,
+        ", lastError: ", self.lastError,
+        queueStreamIdString,
+        deletedString,
+        addedString,
+        idString]))
@@ -0,0 +1,16 @@
+class DownloadResult():
+    def __init__(self,
+                 path: str = None,
+                 byteCount: int = 0,
+                 seconds: float = 0,
+                 resumes: int = 0):
+        self.path: str = path
+        self.byteCount: int = byteCount
+        self.seconds: float = seconds
+        self.resumes: int = resumes
+
+    def summaryString(self):
+        megabytes = self.byteCount / (1024 * 1024)
+        throughput = megabytes / self.seconds if(self.seconds > 0) else 0
+        return "".join(map(str, [f"{megabytes:.1f}", " MiB in ", f"{self.seconds:.1f}", "s (", f"{throughput:.2f}", " MiB/s)",
+        ", resumed ", self.resumes, " time(s)" if(self.resumes != 1) else " time"]))
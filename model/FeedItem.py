@@ -0,0 +1,15 @@
+from datetime import datetime
+
+
+class FeedItem:
+    def __init__(self, 
+                 title: str = None,
+                 published: datetime = None,
+                 link: str = None,
+                 guid: str = None,
+                 duration: str = None):
+        self.title: str = title
+        self.published: datetime = published
+        self.link: str = link
+        self.guid: str = guid
+        self.duration: str = duration
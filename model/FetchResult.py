@@ -0,0 +1,22 @@
+from typing import List, Tuple
+
+
+class FetchResult():
+    def __init__(self, 
+                 playlistId: str = None,
+                 added: int = 0,
+                 sourceSeconds: List[Tuple[str, float]] = None,
+                 cacheHits: int = 0,
+                 cacheMisses: int = 0,
+                 fetchesSaved: int = 0,
+                 sourcesSkipped: int = 0):
+        self.playlistId: str = playlistId
+        self.added: int = added
+        self.sourceSeconds: List[Tuple[str, float]] = sourceSeconds if(sourceSeconds != None) else []
+        self.cacheHits: int = cacheHits
+        self.cacheMisses: int = cacheMisses
+        self.fetchesSaved: int = fetchesSaved
+        self.sourcesSkipped: int = sourcesSkipped
+
+    def sourceTimesString(self):
+        return "\n".join(["".join(["\t\"", name, "\": ", f"{seconds:.2f}", "s"]) for name, seconds in self.sourceSeconds])
@@ -0,0 +1,138 @@
+import random
+from typing import Callable, Dict, List, Tuple
+
+from model.QueueStream import QueueStream
+
+
+class PlaybackCursor():
+    """
+    Lazy position in the streamIds of a Playlist during playback. QueueStreams are loaded with loadMany in windows of windowSize from the current position, so starting playback does not load the whole Playlist and skipped QueueStreams are never loaded. Shuffle is a permutation of indices in streamIds, given by shuffleSeed.
+    """
+
+    def __init__(self,
+                 streamIds: List[str],
+                 loadMany: Callable[[List[str]], List[QueueStream]],
+                 windowSize: int = 20,
+                 startIndex: int = 0,
+                 shuffleSeed: int = None,
+                 order: List[int] = None,
+                 position: int = 0,
+                 streamCount: int = None): # Number of streamIds the shuffle was made for, later streamIds are shuffled after them
+        self.streamIds: List[str] = streamIds
+        self.loadMany: Callable[[List[str]], List[QueueStream]] = loadMany
+        self.windowSize: int = max(1, windowSize)
+        self.shuffleSeed: int = shuffleSeed
+        self.order: List[int] = order if(order != None) else self.getOrder(startIndex, shuffleSeed, streamCount)
+        self.position: int = min(max(0, position), len(self.order))
+        self.window: Dict[int, QueueStream] = {}
+        self.missingIds: List[str] = []
+
+    def __iter__(self) -> "PlaybackCursor":
+        return self
+
+    def __next__(self) -> Tuple[int, QueueStream]:
+        while(self.position < len(self.order)):
+            index = self.order[self.position]
+            if(index not in self.window):
+                self.load()
+
+            self.position += 1
+            stream = self.window.pop(index, None)
+            if(stream != None):
+                return index, stream
+
+            self.missingIds.append(self.streamIds[index])
+
+        raise StopIteration
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def getOrder(self, startIndex: int, shuffleSeed: int, streamCount: int = None) -> List[int]:
+        """
+        Get indices in streamIds to play, in order.
+
+        Args:
+            startIndex (int): Index in streamIds to start from.
+            shuffleSeed (int): Seed of shuffle, None to not shuffle.
+            streamCount (int): Number of streamIds the shuffle was made for. Defaults to None, all streamIds.
+
+        Returns:
+            List[int]: Indices, from startIndex to the end of streamIds.
+        """
+
+        startIndex = min(max(0, startIndex), len(self.streamIds))
+        if(shuffleSeed == None):
+            return list(range(startIndex, len(self.streamIds)))
+
+        streamCount = min(max(startIndex, streamCount if(streamCount != None) else len(self.streamIds)), len(self.streamIds))
+        result = list(range(startIndex, streamCount))
+        added = list(range(streamCount, len(self.streamIds)))
+        random.Random(shuffleSeed).shuffle(result)
+        random.Random(shuffleSeed + 1).shuffle(added)
+        return result + added
+
+    def getStreamId(self, position: int) -> str:
+        """
+        Get ID of QueueStream at position, without loading it.
+
+        Args:
+            position (int): Position in order.
+
+        Returns:
+            str | None: ID, None if position is past the end.
+        """
+
+        return self.streamIds[self.order[position]] if(0 <= position < len(self.order)) else None
+
+    def load(self) -> None:
+        """
+        Load the window of QueueStreams starting at position, replacing the previous window.
+        """
+
+        indices = self.order[self.position:self.position + self.windowSize]
+        streams = self.loadMany([self.streamIds[_] for _ in indices])
+        self.window = {index: stream for index, stream in zip(indices, streams)}
+
+    def skip(self, nSkip: int) -> List[int]:
+        """
+        Move past the next nSkip QueueStreams without loading them.
+
+        Args:
+            nSkip (int): Number of QueueStreams to skip.
+
+        Returns:
+            List[int]: Indices in streamIds of skipped QueueStreams.
+        """
+
+        skipped = self.order[self.position:self.position + max(0, nSkip)]
+        self.position += len(skipped)
+        return skipped
+
+    def peek(self, count: int = 1) -> List[Tuple[int, QueueStream]]:
+        """
+        Get the next QueueStreams without moving past them, loading more if not in the current window.
+
+        Args:
+            count (int): Number of QueueStreams to get. Defaults to 1.
+
+        Returns:
+            List[Tuple[int, QueueStream]]: Index in streamIds and QueueStream, fewer than count at the end, None where a QueueStream was not found.
+        """
+
+        indices = self.order[self.position:self.position + max(0, count)]
+        notLoaded = [_ for _ in indices if(_ not in self.window)]
+        if(len(notLoaded) > 0):
+            self.window.update({index: stream for index, stream in zip(notLoaded, self.loadMany([self.streamIds[_] for _ in notLoaded]))})
+
+        return [(_, self.window[_]) for _ in indices]
+
+    def remaining(self) -> int:
+        """
+        Get number of QueueStreams after position, including any not found.
+
+        Returns:
+            int: Number of QueueStreams left.
+        """
+
+        return len(self.order) - self.position
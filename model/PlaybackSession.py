@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import List
+
+from grdUtil.DateTimeUtil import getDateTime
+
+
+class PlaybackSession():
+    def __init__(self,
+                 playlistId: str = None,
+                 startIndex: int = 0,
+                 shuffleSeed: int = None, # None if not shuffled
+                 streamCount: int = 0, # Number of streamIds in Playlist when the order was made
+                 position: int = 0, # Position in order of the QueueStream playing or next to play
+                 streamId: str = None, # ID of QueueStream at position, to check the order still applies
+                 skipped: List[int] = [],
+                 updated: float = None, # Timestamp
+                 deleted: datetime = None,
+                 added: datetime = getDateTime(),
+                 id: str = None):
+        self.playlistId: str = playlistId
+        self.startIndex: int = startIndex
+        self.shuffleSeed: int = shuffleSeed
+        self.streamCount: int = streamCount
+        self.position: int = position
+        self.streamId: str = streamId
+        self.skipped: List[int] = list(skipped)
+        self.updated: float = updated
+        self.deleted: datetime = deleted
+        self.added: datetime = added
+        self.id: str = id
+
+    def summaryString(self):
+        positionString = "stream number " + str(self.startIndex + self.position + 1) if(self.shuffleSeed == None) else "stream " + str(self.position + 1) + " in shuffled order"
+        
+        return "".join(map(str, [positionString,
+        ", shuffle is ", "on" if(self.shuffleSeed != None) else "off",
+        ", skipped ", len(self.skipped)]))
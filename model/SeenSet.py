@@ -0,0 +1,99 @@
+import base64
+import hashlib
+from typing import Dict, Iterable, List
+
+
+class SeenSet():
+    """
+    Bounded set of IDs already fetched from a StreamSource. IDs are stored as 8 byte hashes in insertion order, dropping the oldest above capacity, and serialized as one base64 string (StreamSource.seenIds), about 11 characters per ID.
+    """
+
+    hashSize: int = 8
+
+    def __init__(self,
+                 capacity: int = 5000,
+                 data: str = None):
+        self.capacity: int = capacity
+        self.hashes: Dict[bytes, None] = {}
+        if(data):
+            raw = base64.b64decode(data)
+            self.addHashes([raw[i:i + SeenSet.hashSize] for i in range(0, len(raw), SeenSet.hashSize)])
+
+    def __contains__(self, id: str) -> bool:
+        return self.getHash(id) in self.hashes
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def add(self, id: str) -> None:
+        """
+        Add ID, as the newest.
+
+        Args:
+            id (str): ID.
+        """
+
+        self.addHashes([self.getHash(id)])
+
+    def addMany(self, ids: Iterable[str]) -> None:
+        """
+        Add IDs, in order from oldest to newest.
+
+        Args:
+            ids (Iterable[str]): IDs.
+        """
+
+        self.addHashes([self.getHash(_) for _ in ids if(_ != None)])
+
+    def addHashes(self, hashes: List[bytes]) -> None:
+        """
+        Add hashes of IDs, in order from oldest to newest, dropping the oldest above capacity.
+
+        Args:
+            hashes (List[bytes]): Hashes from getHash.
+        """
+
+        for hash in hashes:
+            self.hashes.pop(hash, None)
+            self.hashes[hash] = None
+
+        while(len(self.hashes) > self.capacity):
+            self.hashes.pop(next(iter(self.hashes)))
+
+    def intersection(self, others: List["SeenSet"]) -> "SeenSet":
+        """
+        Get IDs in this and every SeenSet in others.
+
+        Args:
+            others (List[SeenSet]): SeenSets.
+
+        Returns:
+            SeenSet: Intersection, with the capacity of this.
+        """
+
+        result = SeenSet(self.capacity)
+        result.addHashes([_ for _ in self.hashes if(all([_ in other.hashes for other in others]))])
+        return result
+
+    def serialize(self) -> str:
+        """
+        Get IDs as a string for StreamSource.seenIds.
+
+        Returns:
+            str: base64 of hashes, oldest first.
+        """
+
+        return base64.b64encode(b"".join(self.hashes)).decode("ascii")
+
+    def getHash(self, id: str) -> bytes:
+        """
+        Get hash of ID.
+
+        Args:
+            id (str): ID.
+
+        Returns:
+            bytes: First hashSize bytes of BLAKE2b.
+        """
+
+        return hashlib.blake2b(str(id).encode("utf-8"), digest_size = SeenSet.hashSize).digest()
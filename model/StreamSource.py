@@ -15,8 +15,11 @@ class StreamSource:
                  lastSuccessfulFetched: datetime = None,
                  lastFetchedId: str = None, # Legacy
                  lastFetchedIds: List[str] = [],
+                 seenIds: str = None,
                  backgroundContent: bool = False,
                  alwaysDownload: bool = False,
+                 remoteId: str = None,
+                 remoteIdFailed: float = None, # Timestamp of last lookup of remoteId that found none
                  deleted: datetime = None,
                  added: datetime = getDateTime(),
                  id: str = None):
@@ -28,8 +31,11 @@ class StreamSource:
         self.lastFetched: datetime = lastFetched
         self.lastSuccessfulFetched: datetime = lastSuccessfulFetched
         self.lastFetchedIds: List[str] = lastFetchedIds
+        self.seenIds: str = seenIds
         self.backgroundContent: bool = backgroundContent
         self.alwaysDownload: bool = alwaysDownload
+        self.remoteId: str = remoteId
+        self.remoteIdFailed: float = remoteIdFailed
         self.deleted: datetime = deleted
         self.added: datetime = added
         self.id: str = id
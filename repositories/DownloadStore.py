@@ -0,0 +1,263 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List
+
+from services.UrlService import UrlService
+
+
+class DownloadStore():
+    """
+    Process-wide manifest of downloaded videos, keyed by platform and canonical remote ID (UrlService.canonicalize), persisted as JSON. Each entry has the name, size and SHA-256 of the video, when it was last used and every path it was saved to, so a video already downloaded for one Playlist is hardlinked for the next instead of downloaded again. The paths of an entry count its references: a file is orphaned when its entry has no other path left.
+    """
+
+    entries: Dict[str, dict] = {}
+    keysByPath: Dict[str, str] = {}
+    lock: threading.RLock = threading.RLock()
+    path: str = None
+
+    def load(path: str) -> None:
+        """
+        Load manifest from file in path, once per path.
+
+        Args:
+            path (str): Absolute path of JSON file.
+        """
+
+        with DownloadStore.lock:
+            if(DownloadStore.path == path):
+                return
+
+            DownloadStore.path = path
+            DownloadStore.entries = {}
+            DownloadStore.keysByPath = {}
+            if(os.path.isfile(path)):
+                try:
+                    with open(path, "r") as file:
+                        DownloadStore.entries = json.load(file)
+                except (OSError, ValueError):
+                    DownloadStore.entries = {}
+
+            for key, entry in DownloadStore.entries.items():
+                for entryPath in entry["paths"]:
+                    DownloadStore.keysByPath[os.path.normcase(entryPath)] = key
+
+    def save() -> None:
+        """
+        Write manifest to file. Call while holding lock, or after changes.
+        """
+
+        with DownloadStore.lock:
+            if(DownloadStore.path == None):
+                return
+
+            temporaryPath = f"{DownloadStore.path}.tmp"
+            with open(temporaryPath, "w") as file:
+                json.dump(DownloadStore.entries, file)
+
+            os.replace(temporaryPath, DownloadStore.path)
+
+    def getKey(url: str) -> str:
+        """
+        Get key of video at url in the manifest.
+
+        Args:
+            url (str): URL of video, any form UrlService.canonicalize understands.
+
+        Returns:
+            str | None: Key, None if url is not a video of a supported platform.
+        """
+
+        sourceType, canonicalId, canonicalUrl = UrlService.canonicalize(url)
+        if(sourceType == None or canonicalId == None):
+            return None
+
+        return f"{int(sourceType)} {canonicalId}"
+
+    def get(key: str) -> dict:
+        """
+        Get entry of key, dropping paths that no longer exist or have changed size.
+
+        Args:
+            key (str): Key from getKey.
+
+        Returns:
+            dict | None: Copy of entry with name, size, hash and paths, None if not downloaded or no file is left.
+        """
+
+        with DownloadStore.lock:
+            entry = DownloadStore.entries.get(key)
+            if(entry == None):
+                return None
+
+            paths = [_ for _ in entry["paths"] if(os.path.isfile(_) and os.path.getsize(_) == entry["size"])]
+            if(len(paths) != len(entry["paths"])):
+                for removedPath in set(entry["paths"]) - set(paths):
+                    DownloadStore.keysByPath.pop(os.path.normcase(removedPath), None)
+
+                entry["paths"] = paths
+                if(len(paths) == 0):
+                    DownloadStore.entries.pop(key)
+
+                DownloadStore.save()
+
+            return dict(entry) if(len(paths) > 0) else None
+
+    def add(key: str, path: str, name: str) -> dict:
+        """
+        Add a downloaded file to the manifest, hashing it. Replaces the entry of key if the file differs from it.
+
+        Args:
+            key (str): Key from getKey.
+            path (str): Absolute path of file.
+            name (str): Name of video, used to name links to it.
+
+        Returns:
+            dict: Entry.
+        """
+
+        size = os.path.getsize(path)
+        digest = DownloadStore.getHash(path)
+        with DownloadStore.lock:
+            entry = DownloadStore.entries.get(key)
+            if(entry == None or entry["hash"] != digest):
+                for oldPath in (entry["paths"] if(entry != None) else []):
+                    DownloadStore.keysByPath.pop(os.path.normcase(oldPath), None)
+
+                entry = {"name": name, "size": size, "hash": digest, "accessed": time.time(), "paths": []}
+                DownloadStore.entries[key] = entry
+
+            DownloadStore.addPath(key, path)
+            return dict(entry)
+
+    def addPath(key: str, path: str) -> None:
+        """
+        Add a reference to the file of key, a hardlink or the file itself.
+
+        Args:
+            key (str): Key from getKey, in manifest.
+            path (str): Absolute path of file.
+        """
+
+        with DownloadStore.lock:
+            entry = DownloadStore.entries[key]
+            if(path not in entry["paths"]):
+                entry["paths"].append(path)
+
+            DownloadStore.keysByPath[os.path.normcase(path)] = key
+            entry["accessed"] = time.time()
+            DownloadStore.save()
+
+    def touch(key: str) -> None:
+        """
+        Mark video of key as used now, see getAccessed.
+
+        Args:
+            key (str): Key from getKey.
+        """
+
+        with DownloadStore.lock:
+            entry = DownloadStore.entries.get(key)
+            if(entry == None):
+                return
+
+            entry["accessed"] = time.time()
+            DownloadStore.save()
+
+    def getKeyOfPath(path: str) -> str:
+        """
+        Get key of video saved to path.
+
+        Args:
+            path (str): Absolute path of file.
+
+        Returns:
+            str | None: Key, None if path is not in manifest.
+        """
+
+        with DownloadStore.lock:
+            return DownloadStore.keysByPath.get(os.path.normcase(path))
+
+    def getAccessed(key: str) -> float:
+        """
+        Get when video of key was last downloaded, linked or otherwise used.
+
+        Args:
+            key (str): Key from getKey.
+
+        Returns:
+            float: Timestamp, 0 if not in manifest.
+        """
+
+        with DownloadStore.lock:
+            return DownloadStore.entries.get(key, {}).get("accessed", 0)
+
+    def removePath(path: str) -> bool:
+        """
+        Remove a reference, for a file that was deleted or is about to be. Does not delete the file.
+
+        Args:
+            path (str): Absolute path of file.
+
+        Returns:
+            bool: True if no other path references the video, meaning its data is gone once path is deleted.
+        """
+
+        with DownloadStore.lock:
+            key = DownloadStore.keysByPath.pop(os.path.normcase(path), None)
+            if(key == None):
+                return True
+
+            entry = DownloadStore.entries[key]
+            entry["paths"] = [_ for _ in entry["paths"] if(os.path.normcase(_) != os.path.normcase(path))]
+            if(len(entry["paths"]) == 0):
+                DownloadStore.entries.pop(key)
+
+            DownloadStore.save()
+            return len(entry["paths"]) == 0
+
+    def getReferenceCount(path: str) -> int:
+        """
+        Get number of paths referencing the same video as path, including path.
+
+        Args:
+            path (str): Absolute path of file.
+
+        Returns:
+            int: Count, 0 if path is not in manifest.
+        """
+
+        with DownloadStore.lock:
+            key = DownloadStore.keysByPath.get(os.path.normcase(path))
+            return len(DownloadStore.entries[key]["paths"]) if(key != None) else 0
+
+    def getPaths() -> List[str]:
+        """
+        Get all paths in manifest.
+
+        Returns:
+            List[str]: Absolute paths.
+        """
+
+        with DownloadStore.lock:
+            return [_ for entry in DownloadStore.entries.values() for _ in entry["paths"]]
+
+    def getHash(path: str) -> str:
+        """
+        Get SHA-256 of file, read in chunks.
+
+        Args:
+            path (str): Absolute path of file.
+
+        Returns:
+            str: Hex digest.
+        """
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(chunk)
+
+        return digest.hexdigest()
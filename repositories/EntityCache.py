@@ -0,0 +1,111 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+
+class EntityCache():
+    """
+    Process-wide identity map of entities keyed by (type name, ID), shared by all service instances. Each entry stores a validation token (file mtime for JSON storage, data version for SQLite) so edits made outside the program are detected. Entities are handed out as copies, so changes are only visible to others once written through a service. At most maxEntries (ENTITY_CACHE_MAX_ENTRIES) entities are kept, evicting the least recently used.
+    """
+
+    entries: "OrderedDict[Tuple[str, str], Tuple[object, object]]" = OrderedDict()
+    maxEntries: int = 5000
+    lock: threading.RLock = threading.RLock()
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+    def get(typeName: str, id: str, token: object) -> object:
+        """
+        Get a copy of cached entity, if cached with the same token.
+
+        Args:
+            typeName (str): Name of entity type.
+            id (str): ID of entity.
+            token (object): Current validation token of entity in storage.
+
+        Returns:
+            object | None: Copy of entity if cached and valid, else None.
+        """
+
+        with EntityCache.lock:
+            entry = EntityCache.entries.get((typeName, id))
+            if(entry == None or token == None or entry[1] != token):
+                EntityCache.misses += 1
+                return None
+
+            EntityCache.hits += 1
+            EntityCache.entries.move_to_end((typeName, id))
+            return copy.deepcopy(entry[0])
+
+    def set(typeName: str, id: str, entity: object, token: object) -> None:
+        """
+        Cache a copy of entity with validation token, evicting the least recently used entities above maxEntries.
+
+        Args:
+            typeName (str): Name of entity type.
+            id (str): ID of entity.
+            entity (object): Entity to cache.
+            token (object): Validation token of entity in storage. None will not cache.
+        """
+
+        if(token == None or entity == None):
+            return
+
+        with EntityCache.lock:
+            EntityCache.entries.pop((typeName, id), None)
+            EntityCache.entries[(typeName, id)] = (copy.deepcopy(entity), token)
+            while(len(EntityCache.entries) > EntityCache.maxEntries):
+                EntityCache.entries.popitem(last = False)
+
+    def setMaxEntries(maxEntries: int) -> None:
+        """
+        Set number of entities to keep, evicting the least recently used above it.
+
+        Args:
+            maxEntries (int): Number of entities.
+        """
+
+        with EntityCache.lock:
+            EntityCache.maxEntries = max(0, maxEntries)
+            while(len(EntityCache.entries) > EntityCache.maxEntries):
+                EntityCache.entries.popitem(last = False)
+
+    def invalidate(typeName: str, id: str) -> None:
+        """
+        Remove entity from cache.
+
+        Args:
+            typeName (str): Name of entity type.
+            id (str): ID of entity.
+        """
+
+        with EntityCache.lock:
+            if(EntityCache.entries.pop((typeName, id), None) != None):
+                EntityCache.invalidations += 1
+
+    def clear() -> None:
+        """
+        Remove all entities from cache and reset counters.
+        """
+
+        with EntityCache.lock:
+            EntityCache.entries = OrderedDict()
+            EntityCache.hits = 0
+            EntityCache.misses = 0
+            EntityCache.invalidations = 0
+
+    def getStats() -> Dict[str, int]:
+        """
+        Get hit, miss and invalidation counters, and number of entities cached.
+
+        Returns:
+            Dict[str, int]: Counters by name.
+        """
+
+        with EntityCache.lock:
+            return {"hits": EntityCache.hits,
+                "misses": EntityCache.misses,
+                "invalidations": EntityCache.invalidations,
+                "entries": len(EntityCache.entries)}
@@ -0,0 +1,225 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+
+class HttpCache():
+    """
+    Process-wide store of HTTP validators (ETag, Last-Modified, SHA-256 of body) per StreamSource and URL, persisted as JSON and bounded by least recently used. Validators from a response are staged first and only committed once the fetch they belong to has been saved, so a failed fetch is never mistaken for an unchanged source later.
+    """
+
+    entries: "OrderedDict[str, dict]" = OrderedDict()
+    staged: Dict[str, dict] = {}
+    lock: threading.RLock = threading.RLock()
+    path: str = None
+    maxEntries: int = 1000
+    dirty: bool = False
+
+    def load(path: str, maxEntries: int) -> None:
+        """
+        Load validators from file in path, once per path.
+
+        Args:
+            path (str): Absolute path of JSON file.
+            maxEntries (int): Number of URLs to keep validators for.
+        """
+
+        with HttpCache.lock:
+            HttpCache.maxEntries = maxEntries
+            if(HttpCache.path == path):
+                return
+
+            HttpCache.path = path
+            HttpCache.entries = OrderedDict()
+            HttpCache.staged = {}
+            if(os.path.isfile(path)):
+                try:
+                    with open(path, "r") as file:
+                        for entry in json.load(file):
+                            HttpCache.entries[entry["key"]] = entry
+                except (OSError, ValueError, KeyError):
+                    HttpCache.entries = OrderedDict()
+
+    def save() -> None:
+        """
+        Write validators to file, if changed since last save.
+        """
+
+        with HttpCache.lock:
+            if(not HttpCache.dirty or HttpCache.path == None):
+                return
+
+            temporaryPath = f"{HttpCache.path}.tmp"
+            with open(temporaryPath, "w") as file:
+                json.dump(list(HttpCache.entries.values()), file)
+
+            os.replace(temporaryPath, HttpCache.path)
+            HttpCache.dirty = False
+
+    def getKey(sourceId: str, url: str) -> str:
+        """
+        Get key for validators of url fetched for StreamSource given by sourceId.
+
+        Args:
+            sourceId (str): ID of StreamSource.
+            url (str): URL requested.
+
+        Returns:
+            str: Key.
+        """
+
+        return f"{sourceId} {url}"
+
+    def getConditionalHeaders(key: str) -> Dict[str, str]:
+        """
+        Get If-None-Match and If-Modified-Since headers for key, from committed validators.
+
+        Args:
+            key (str): Key from getKey.
+
+        Returns:
+            Dict[str, str]: Headers, empty if nothing is cached.
+        """
+
+        with HttpCache.lock:
+            entry = HttpCache.entries.get(key)
+            if(entry == None):
+                return {}
+
+            headers = {}
+            if(entry.get("etag") != None):
+                headers["If-None-Match"] = entry["etag"]
+            if(entry.get("lastModified") != None):
+                headers["If-Modified-Since"] = entry["lastModified"]
+
+            return headers
+
+    def stage(key: str, etag: str, lastModified: str, bodyHash: str, notModified: bool) -> None:
+        """
+        Stage validators of a response, to be committed when the fetch is saved.
+
+        Args:
+            key (str): Key from getKey.
+            etag (str): ETag header of response.
+            lastModified (str): Last-Modified header of response.
+            bodyHash (str): SHA-256 of body, None if body was not read (streamed or 304).
+            notModified (bool): Response was 304 or had the same body hash as committed validators.
+        """
+
+        with HttpCache.lock:
+            entry = HttpCache.entries.get(key, {})
+            HttpCache.staged[key] = {"key": key,
+                "etag": etag if(etag != None) else entry.get("etag"),
+                "lastModified": lastModified if(lastModified != None) else entry.get("lastModified"),
+                "bodyHash": bodyHash if(bodyHash != None) else entry.get("bodyHash"),
+                "notModified": notModified}
+
+    def getBodyHash(key: str) -> str:
+        """
+        Get committed body hash for key.
+
+        Args:
+            key (str): Key from getKey.
+
+        Returns:
+            str | None: SHA-256 of body.
+        """
+
+        with HttpCache.lock:
+            entry = HttpCache.entries.get(key)
+            return entry.get("bodyHash") if(entry != None) else None
+
+    def getStagedKeys(sourceId: str) -> List[str]:
+        """
+        Get keys staged for StreamSource given by sourceId.
+
+        Args:
+            sourceId (str): ID of StreamSource.
+
+        Returns:
+            List[str]: Keys.
+        """
+
+        prefix = f"{sourceId} "
+        with HttpCache.lock:
+            return [_ for _ in HttpCache.staged if(_.startswith(prefix))]
+
+    def isNotModified(sourceId: str) -> bool:
+        """
+        Check if every response staged for StreamSource given by sourceId was unchanged.
+
+        Args:
+            sourceId (str): ID of StreamSource.
+
+        Returns:
+            bool: Result, False if nothing was staged.
+        """
+
+        keys = HttpCache.getStagedKeys(sourceId)
+        with HttpCache.lock:
+            return len(keys) > 0 and all([HttpCache.staged[_]["notModified"] for _ in keys])
+
+    def commit(sourceId: str) -> None:
+        """
+        Commit validators staged for StreamSource given by sourceId, evicting least recently used entries above maxEntries.
+
+        Args:
+            sourceId (str): ID of StreamSource.
+        """
+
+        with HttpCache.lock:
+            for key in HttpCache.getStagedKeys(sourceId):
+                entry = HttpCache.staged.pop(key)
+                entry.pop("notModified")
+                entry["lastUsed"] = time.time()
+                HttpCache.entries.pop(key, None)
+                HttpCache.entries[key] = entry
+                HttpCache.dirty = True
+
+            while(len(HttpCache.entries) > HttpCache.maxEntries):
+                HttpCache.entries.popitem(last = False)
+
+    def discard(sourceId: str) -> None:
+        """
+        Discard validators staged for StreamSource given by sourceId.
+
+        Args:
+            sourceId (str): ID of StreamSource.
+        """
+
+        with HttpCache.lock:
+            for key in HttpCache.getStagedKeys(sourceId):
+                HttpCache.staged.pop(key)
+
+    def removeSource(sourceId: str) -> None:
+        """
+        Remove all validators for StreamSource given by sourceId, also those of groups of StreamSources it was fetched in (see FetchService.getFetchGroupSource), so the next fetch reads everything.
+
+        Args:
+            sourceId (str): ID of StreamSource.
+        """
+
+        with HttpCache.lock:
+            for key in [_ for _ in HttpCache.entries if(HttpCache.hasSource(_, sourceId))]:
+                HttpCache.entries.pop(key)
+                HttpCache.dirty = True
+
+            for key in [_ for _ in HttpCache.staged if(HttpCache.hasSource(_, sourceId))]:
+                HttpCache.staged.pop(key)
+
+    def hasSource(key: str, sourceId: str) -> bool:
+        """
+        Check if key is for StreamSource given by sourceId, alone or in a group of StreamSources with a "+"-joined ID.
+
+        Args:
+            key (str): Key from getKey.
+            sourceId (str): ID of StreamSource.
+
+        Returns:
+            bool: Result.
+        """
+
+        return sourceId in key.split(" ", 1)[0].split("+")
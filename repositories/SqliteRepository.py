@@ -0,0 +1,348 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Generic, List, TypeVar
+
+T = TypeVar("T")
+
+class SqliteRepository(Generic[T]):
+    connections: Dict[str, sqlite3.Connection] = {}
+    locks: Dict[str, threading.RLock] = {}
+    connectionsLock: threading.Lock = threading.Lock()
+
+    def __init__(self, typeT: type, debug: bool, databasePath: str):
+        self.typeT = typeT
+        self.debug = debug
+        self.databasePath = databasePath
+        self.table = typeT.__name__
+        self.connection, self.lock = SqliteRepository.getConnection(databasePath)
+        self.createTables()
+
+    def getConnection(databasePath: str) -> tuple:
+        """
+        Get the process-wide connection and lock for database given by databasePath, opening it if needed.
+
+        Args:
+            databasePath (str): Absolute path to SQLite database file.
+
+        Returns:
+            tuple: Tuple of (sqlite3.Connection, threading.RLock).
+        """
+
+        with SqliteRepository.connectionsLock:
+            if(databasePath not in SqliteRepository.connections):
+                directory = os.path.dirname(databasePath)
+                if(directory):
+                    os.makedirs(directory, exist_ok = True)
+
+                connection = sqlite3.connect(databasePath, check_same_thread = False, isolation_level = None)
+                connection.execute("PRAGMA journal_mode = WAL")
+                connection.execute("PRAGMA synchronous = NORMAL")
+                SqliteRepository.connections[databasePath] = connection
+                SqliteRepository.locks[databasePath] = threading.RLock()
+
+            return SqliteRepository.connections[databasePath], SqliteRepository.locks[databasePath]
+
+    def createTables(self) -> None:
+        """
+        Create table for T and the shared Playlist membership table, with indices, if they do not exist.
+        """
+
+        with self.lock:
+            self.connection.execute(f"""CREATE TABLE IF NOT EXISTS "{self.table}" (
+                id TEXT PRIMARY KEY,
+                deleted TEXT,
+                watched TEXT,
+                uri TEXT,
+                remoteId TEXT,
+                data TEXT NOT NULL)""")
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS \"ix_{self.table}_deleted\" ON \"{self.table}\" (deleted)")
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS \"ix_{self.table}_watched\" ON \"{self.table}\" (watched)")
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS \"ix_{self.table}_uri\" ON \"{self.table}\" (uri)")
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS \"ix_{self.table}_remoteId\" ON \"{self.table}\" (remoteId)")
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS PlaylistMember (
+                playlistId TEXT NOT NULL,
+                memberId TEXT NOT NULL,
+                memberType TEXT NOT NULL,
+                position INTEGER NOT NULL)""")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS ix_PlaylistMember_playlistId ON PlaylistMember (playlistId)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS ix_PlaylistMember_memberId ON PlaylistMember (memberId)")
+
+    def serialize(self, entity: T) -> tuple:
+        """
+        Get row values for entity, data being the whole entity as JSON.
+
+        Args:
+            entity (T): Entity to serialize.
+
+        Returns:
+            tuple: Values for columns id, deleted, watched, uri, remoteId, data.
+        """
+
+        data = entity.__dict__
+        deleted = data.get("deleted")
+        watched = data.get("watched")
+        return (entity.id,
+            str(deleted) if(deleted != None) else None,
+            str(watched) if(watched != None) else None,
+            data.get("uri"),
+            data.get("remoteId"),
+            json.dumps(data, default = str))
+
+    def deserialize(self, data: str) -> T:
+        """
+        Get entity of type T from JSON in data column.
+
+        Args:
+            data (str): JSON string.
+
+        Returns:
+            T: Entity.
+        """
+
+        return self.typeT(**json.loads(data))
+
+    def writeMembers(self, entity: T) -> None:
+        """
+        Rewrite Playlist membership rows for entity, if entity has streamIds and streamSourceIds (Playlist).
+
+        Args:
+            entity (T): Entity to write memberships for.
+        """
+
+        if(not hasattr(entity, "streamIds") or not hasattr(entity, "streamSourceIds")):
+            return
+
+        rows = [(entity.id, id, "QueueStream", i) for i, id in enumerate(entity.streamIds)]
+        rows += [(entity.id, id, "StreamSource", i) for i, id in enumerate(entity.streamSourceIds)]
+        self.connection.execute("DELETE FROM PlaylistMember WHERE playlistId = ?", (entity.id,))
+        self.connection.executemany("INSERT INTO PlaylistMember (playlistId, memberId, memberType, position) VALUES (?, ?, ?, ?)", rows)
+
+    def add(self, entity: T) -> bool:
+        """
+        Add entity, fails if an entity with the same ID exists.
+
+        Args:
+            entity (T): Entity to add.
+
+        Returns:
+            bool: Result.
+        """
+
+        with self.lock:
+            self.connection.execute("BEGIN")
+            try:
+                self.connection.execute(f"INSERT INTO \"{self.table}\" (id, deleted, watched, uri, remoteId, data) VALUES (?, ?, ?, ?, ?, ?)", self.serialize(entity))
+                self.writeMembers(entity)
+                self.connection.execute("COMMIT")
+                return True
+            except sqlite3.IntegrityError:
+                self.connection.execute("ROLLBACK")
+                return False
+            except:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def addMany(self, entities: List[T]) -> int:
+        """
+        Add or replace entities in a single transaction.
+
+        Args:
+            entities (List[T]): Entities to add.
+
+        Returns:
+            int: Number of entities written.
+        """
+
+        with self.lock:
+            self.connection.execute("BEGIN")
+            try:
+                self.connection.executemany(f"INSERT OR REPLACE INTO \"{self.table}\" (id, deleted, watched, uri, remoteId, data) VALUES (?, ?, ?, ?, ?, ?)", [self.serialize(_) for _ in entities])
+                for entity in entities:
+                    self.writeMembers(entity)
+                self.connection.execute("COMMIT")
+            except:
+                self.connection.execute("ROLLBACK")
+                raise
+
+        return len(entities)
+
+    def update(self, entity: T) -> bool:
+        """
+        Update entity, fails if no entity with the same ID exists.
+
+        Args:
+            entity (T): Entity to update.
+
+        Returns:
+            bool: Result.
+        """
+
+        row = self.serialize(entity)
+        with self.lock:
+            self.connection.execute("BEGIN")
+            try:
+                cursor = self.connection.execute(f"UPDATE \"{self.table}\" SET deleted = ?, watched = ?, uri = ?, remoteId = ?, data = ? WHERE id = ?", row[1:] + (row[0],))
+                if(cursor.rowcount == 0):
+                    self.connection.execute("ROLLBACK")
+                    return False
+
+                self.writeMembers(entity)
+                self.connection.execute("COMMIT")
+                return True
+            except:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def remove(self, id: str) -> bool:
+        """
+        Permanently remove entity given by ID, and its Playlist membership rows, as Playlist or as member.
+
+        Args:
+            id (str): ID of entity to remove.
+
+        Returns:
+            bool: Result.
+        """
+
+        with self.lock:
+            self.connection.execute("BEGIN")
+            try:
+                cursor = self.connection.execute(f"DELETE FROM \"{self.table}\" WHERE id = ?", (id,))
+                self.connection.execute("DELETE FROM PlaylistMember WHERE playlistId = ? OR memberId = ?", (id, id))
+                self.connection.execute("COMMIT")
+                return cursor.rowcount > 0
+            except:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def get(self, id: str) -> T:
+        """
+        Get entity given by ID, regardless of soft-deleted status.
+
+        Args:
+            id (str): ID of entity to get.
+
+        Returns:
+            T | None: Entity if found, else None.
+        """
+
+        with self.lock:
+            row = self.connection.execute(f"SELECT data FROM \"{self.table}\" WHERE id = ?", (id,)).fetchone()
+
+        return self.deserialize(row[0]) if(row != None) else None
+
+    def getMany(self, ids: List[str]) -> Dict[str, T]:
+        """
+        Get entities given by IDs, regardless of soft-deleted status, in a single scan per 500 IDs.
+
+        Args:
+            ids (List[str]): IDs of entities to get.
+
+        Returns:
+            Dict[str, T]: Entities found, by ID.
+        """
+
+        result = {}
+        uniqueIds = list(dict.fromkeys(ids))
+        for i in range(0, len(uniqueIds), 500):
+            chunk = uniqueIds[i:i + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            with self.lock:
+                rows = self.connection.execute(f"SELECT id, data FROM \"{self.table}\" WHERE id IN ({placeholders})", chunk).fetchall()
+
+            for id, data in rows:
+                result[id] = self.deserialize(data)
+
+        return result
+
+    def getAll(self, includeSoftDeleted: bool = False) -> List[T]:
+        """
+        Get all entities.
+
+        Args:
+            includeSoftDeleted (bool): should include soft-deleted entities.
+
+        Returns:
+            List[T]: Entities.
+        """
+
+        where = "" if(includeSoftDeleted) else " WHERE deleted IS NULL"
+        with self.lock:
+            rows = self.connection.execute(f"SELECT data FROM \"{self.table}\"{where}").fetchall()
+
+        return [self.deserialize(_[0]) for _ in rows]
+
+    def getAllIds(self, includeSoftDeleted: bool = False) -> List[str]:
+        """
+        Get IDs of all entities without reading their data.
+
+        Args:
+            includeSoftDeleted (bool): should include soft-deleted entities.
+
+        Returns:
+            List[str]: IDs.
+        """
+
+        where = "" if(includeSoftDeleted) else " WHERE deleted IS NULL"
+        with self.lock:
+            rows = self.connection.execute(f"SELECT id FROM \"{self.table}\"{where}").fetchall()
+
+        return [_[0] for _ in rows]
+
+    def getAllDeleted(self) -> List[T]:
+        """
+        Get all soft-deleted entities, using the index on deleted.
+
+        Returns:
+            List[T]: Soft-deleted entities.
+        """
+
+        with self.lock:
+            rows = self.connection.execute(f"SELECT data FROM \"{self.table}\" WHERE deleted IS NOT NULL").fetchall()
+
+        return [self.deserialize(_[0]) for _ in rows]
+
+    def getPlaylistIdsByMemberId(self, memberId: str) -> List[str]:
+        """
+        Get IDs of Playlists which list memberId in streamIds or streamSourceIds.
+
+        Args:
+            memberId (str): ID of QueueStream or StreamSource.
+
+        Returns:
+            List[str]: Playlist IDs.
+        """
+
+        with self.lock:
+            rows = self.connection.execute("SELECT DISTINCT playlistId FROM PlaylistMember WHERE memberId = ?", (memberId,)).fetchall()
+
+        return [_[0] for _ in rows]
+
+    def exists(self, id: str) -> bool:
+        """
+        Check if entity given by ID exists, regardless of soft-deleted status.
+
+        Args:
+            id (str): ID of entity.
+
+        Returns:
+            bool: Result.
+        """
+
+        with self.lock:
+            row = self.connection.execute(f"SELECT 1 FROM \"{self.table}\" WHERE id = ?", (id,)).fetchone()
+
+        return row != None
+
+    def getDataVersion(self) -> int:
+        """
+        Get the SQLite data version, which changes when another connection (another process or manual edit) commits to the database.
+
+        Returns:
+            int: Data version.
+        """
+
+        with self.lock:
+            return self.connection.execute("PRAGMA data_version").fetchone()[0]
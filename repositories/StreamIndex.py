@@ -0,0 +1,275 @@
+import atexit
+import json
+import os
+import threading
+from typing import Dict, List, Set
+
+from model.QueueStream import QueueStream
+from services.UrlService import UrlService
+
+
+class StreamIndex():
+    """
+    Process-wide index from QueueStream keys (remote ID with StreamSourceType, URI and name) to QueueStream IDs and the Playlists they are in, persisted as JSON. Used for duplicate checks without loading every QueueStream of a Playlist. Lookups only give candidates, which the caller should verify against storage, as Playlists can be changed without going through the index. A marker file is kept next to the index while it has unsaved changes, so an index left behind by a crash is rebuilt instead of trusted.
+    """
+
+    version: int = 4
+    streams: Dict[str, dict] = {}
+    keys: Dict[str, Set[str]] = {}
+    lock: threading.RLock = threading.RLock()
+    path: str = None
+    dirty: bool = False
+
+    def load(path: str) -> bool:
+        """
+        Load index from file in path, once per path. Changes are saved on exit, or by save.
+
+        Args:
+            path (str): Absolute path of JSON file.
+
+        Returns:
+            bool: True if the index is usable, False if it is missing, was not saved cleanly or has keys of another version, and must be rebuilt, see PlaylistService.rebuildStreamIndex.
+        """
+
+        with StreamIndex.lock:
+            if(StreamIndex.path == path):
+                return True
+
+            if(StreamIndex.path == None):
+                atexit.register(StreamIndex.save)
+
+            StreamIndex.path = path
+            StreamIndex.streams = {}
+            StreamIndex.keys = {}
+            StreamIndex.dirty = False
+            if(not os.path.isfile(path) or os.path.isfile(StreamIndex.getDirtyMarkerPath())):
+                return False
+
+            try:
+                with open(path, "r") as file:
+                    data = json.load(file)
+
+                if(data["version"] != StreamIndex.version):
+                    return False
+
+                for streamId, entry in data["streams"].items():
+                    StreamIndex.setEntry(streamId, entry["keys"], entry["playlistIds"])
+            except (OSError, ValueError, KeyError, TypeError):
+                StreamIndex.streams = {}
+                StreamIndex.keys = {}
+                return False
+
+            return True
+
+    def save() -> None:
+        """
+        Write index to file, if changed since last save, and remove the unsaved changes marker.
+        """
+
+        with StreamIndex.lock:
+            if(not StreamIndex.dirty or StreamIndex.path == None):
+                return
+
+            temporaryPath = f"{StreamIndex.path}.tmp"
+            with open(temporaryPath, "w") as file:
+                json.dump({"version": StreamIndex.version, "streams": StreamIndex.streams}, file)
+
+            os.replace(temporaryPath, StreamIndex.path)
+            if(os.path.isfile(StreamIndex.getDirtyMarkerPath())):
+                os.remove(StreamIndex.getDirtyMarkerPath())
+
+            StreamIndex.dirty = False
+
+    def clear() -> None:
+        """
+        Remove everything from index.
+        """
+
+        with StreamIndex.lock:
+            StreamIndex.streams = {}
+            StreamIndex.keys = {}
+            StreamIndex.markDirty()
+
+    def getKeys(stream: QueueStream) -> List[str]:
+        """
+        Get keys QueueStream is indexed by: canonical ID and remote ID qualified by platform, canonical URL (UrlService.canonicalize) and name.
+
+        Args:
+            stream (QueueStream): QueueStream.
+
+        Returns:
+            List[str]: Keys.
+        """
+
+        sourceType, canonicalId, canonicalUrl = UrlService.canonicalize(stream.uri)
+        sourceTypeValue = int(sourceType) if(sourceType != None) else ""
+        result = []
+        for id in [canonicalId, stream.remoteId]:
+            if(id and f"id {sourceTypeValue} {id}" not in result):
+                result.append(f"id {sourceTypeValue} {id}")
+        if(canonicalUrl):
+            result.append(f"uri {canonicalUrl}")
+        if(stream.name):
+            result.append(f"name {stream.name}")
+
+        return result
+
+    def add(stream: QueueStream, playlistId: str) -> None:
+        """
+        Index QueueStream as a member of Playlist given by playlistId.
+
+        Args:
+            stream (QueueStream): QueueStream, with ID.
+            playlistId (str): ID of Playlist.
+        """
+
+        with StreamIndex.lock:
+            entry = StreamIndex.streams.get(stream.id)
+            playlistIds = entry["playlistIds"] if(entry != None) else []
+            if(playlistId not in playlistIds):
+                playlistIds = playlistIds + [playlistId]
+
+            StreamIndex.removeStream(stream.id)
+            StreamIndex.setEntry(stream.id, StreamIndex.getKeys(stream), playlistIds)
+            StreamIndex.markDirty()
+
+    def removeMembership(streamId: str, playlistId: str) -> None:
+        """
+        Remove QueueStream given by streamId from Playlist given by playlistId in index, and the QueueStream itself if it is in no other Playlist.
+
+        Args:
+            streamId (str): ID of QueueStream.
+            playlistId (str): ID of Playlist.
+        """
+
+        with StreamIndex.lock:
+            entry = StreamIndex.streams.get(streamId)
+            if(entry == None or playlistId not in entry["playlistIds"]):
+                return
+
+            entry["playlistIds"].remove(playlistId)
+            if(len(entry["playlistIds"]) == 0):
+                StreamIndex.removeStream(streamId)
+
+            StreamIndex.markDirty()
+
+    def removeStream(streamId: str) -> None:
+        """
+        Remove QueueStream given by streamId from index.
+
+        Args:
+            streamId (str): ID of QueueStream.
+        """
+
+        with StreamIndex.lock:
+            entry = StreamIndex.streams.pop(streamId, None)
+            if(entry == None):
+                return
+
+            for key in entry["keys"]:
+                ids = StreamIndex.keys.get(key)
+                if(ids != None):
+                    ids.discard(streamId)
+                    if(len(ids) == 0):
+                        StreamIndex.keys.pop(key)
+
+            StreamIndex.markDirty()
+
+    def find(stream: QueueStream, playlistId: str = None) -> List[str]:
+        """
+        Get IDs of indexed QueueStreams sharing a key with stream (getKeys).
+
+        Args:
+            stream (QueueStream): QueueStream to look up, ID not needed.
+            playlistId (str): Only QueueStreams in Playlist given by playlistId. Defaults to None.
+
+        Returns:
+            List[str]: IDs of QueueStreams, candidates for duplicates.
+        """
+
+        with StreamIndex.lock:
+            result = []
+            for key in StreamIndex.getKeys(stream):
+                for id in StreamIndex.keys.get(key, ()):
+                    if(id not in result and (playlistId == None or playlistId in StreamIndex.streams[id]["playlistIds"])):
+                        result.append(id)
+
+            return result
+
+    def findByRemoteId(sourceTypeValue: int, remoteId: str) -> List[str]:
+        """
+        Get IDs of indexed QueueStreams with canonical or remote ID remoteId.
+
+        Args:
+            sourceTypeValue (int): Value of StreamSourceType of remoteId.
+            remoteId (str): Canonical or remote ID.
+
+        Returns:
+            List[str]: IDs of QueueStreams.
+        """
+
+        with StreamIndex.lock:
+            return list(StreamIndex.keys.get(f"id {sourceTypeValue} {remoteId}", ()))
+
+    def getPlaylistIds(streamId: str) -> List[str]:
+        """
+        Get IDs of Playlists QueueStream given by streamId is in.
+
+        Args:
+            streamId (str): ID of QueueStream.
+
+        Returns:
+            List[str]: IDs of Playlists, empty if not indexed.
+        """
+
+        with StreamIndex.lock:
+            entry = StreamIndex.streams.get(streamId)
+            return list(entry["playlistIds"]) if(entry != None) else []
+
+    def getCount() -> int:
+        """
+        Get number of QueueStreams indexed.
+
+        Returns:
+            int: Count.
+        """
+
+        with StreamIndex.lock:
+            return len(StreamIndex.streams)
+
+    def setEntry(streamId: str, keys: List[str], playlistIds: List[str]) -> None:
+        """
+        Set entry of QueueStream given by streamId, without checking for an existing one. Call while holding lock.
+
+        Args:
+            streamId (str): ID of QueueStream.
+            keys (List[str]): Keys from getKeys.
+            playlistIds (List[str]): IDs of Playlists.
+        """
+
+        StreamIndex.streams[streamId] = {"keys": keys, "playlistIds": playlistIds}
+        for key in keys:
+            StreamIndex.keys.setdefault(key, set()).add(streamId)
+
+    def markDirty() -> None:
+        """
+        Mark index as changed, writing the unsaved changes marker on the first change since last save. Call while holding lock.
+        """
+
+        if(StreamIndex.dirty or StreamIndex.path == None):
+            StreamIndex.dirty = True
+            return
+
+        StreamIndex.dirty = True
+        with open(StreamIndex.getDirtyMarkerPath(), "w"):
+            pass
+
+    def getDirtyMarkerPath() -> str:
+        """
+        Get path of unsaved changes marker.
+
+        Returns:
+            str: Absolute path.
+        """
+
+        return f"{StreamIndex.path}.dirty"
@@ -0,0 +1,144 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from re import Pattern
+from typing import Dict, List
+
+from grdUtil.BashColor import BashColor
+from grdUtil.PrintUtil import printS
+
+from services.DownloadService import DownloadService
+from services.HttpService import HttpService
+from services.RequestGovernorService import RequestGovernorService
+from Settings import Settings
+
+
+class DownloadExecutorService():
+    """
+    Process-wide pool running downloads in the background. At most DOWNLOAD_WORKERS downloads run at a time, and at most DOWNLOAD_HOST_WORKERS from the same site, others wait in order of submission. Bandwidth is limited by RequestGovernorService (DOWNLOAD_BANDWIDTH_LIMIT). Downloads still running when the program ends are finished before it exits.
+    """
+
+    lock: threading.Lock = threading.Lock()
+    executor: ThreadPoolExecutor = None
+    pending: List[dict] = []
+    running: Dict[str, int] = {}
+    stats: Dict[str, int] = {"submitted": 0, "done": 0, "failed": 0}
+    downloadService: DownloadService = None
+    requestGovernorService: RequestGovernorService = None
+    settings: Settings = None
+
+    def __init__(self):
+        self.downloadService = DownloadService()
+        self.requestGovernorService = RequestGovernorService()
+        self.settings = Settings()
+
+    def submit(self, url: str, directory: str, nameRegex: Pattern[str] = None, prefix: str = None) -> Future:
+        """
+        Queue download of stream given by URL, see DownloadService.download.
+
+        Args:
+            url (str): URL to stream.
+            directory (str): Directory (under self.settings.localStoragePath) to save downloaded content.
+            nameRegex (Pattern[str]): Regex to use for name. Defaults to None.
+            prefix (str): Any string to prefix filename with. Defaults to None.
+
+        Returns:
+            Future: Future of absolute path of file, None if download failed.
+        """
+
+        job = {"future": Future(), "host": self.requestGovernorService.getHost(url), "url": url, "directory": directory, "nameRegex": nameRegex, "prefix": prefix}
+        with DownloadExecutorService.lock:
+            DownloadExecutorService.pending.append(job)
+            DownloadExecutorService.stats["submitted"] += 1
+
+        self.dispatch()
+        return job["future"]
+
+    def dispatch(self) -> None:
+        """
+        Start workers for queued downloads while there are free workers.
+        """
+
+        with DownloadExecutorService.lock:
+            if(DownloadExecutorService.executor == None):
+                DownloadExecutorService.executor = ThreadPoolExecutor(max_workers = max(1, self.settings.downloadWorkers), thread_name_prefix = "download")
+
+            while(True):
+                job = self.takeNext()
+                if(job == None):
+                    break
+
+                DownloadExecutorService.executor.submit(self.run, job)
+
+    def takeNext(self) -> dict:
+        """
+        Take the first queued download that may start, skipping those from sites already at DOWNLOAD_HOST_WORKERS, and count it as running. Call while holding lock.
+
+        Returns:
+            dict | None: Job from submit, None if no free workers or no download may start.
+        """
+
+        if(sum(DownloadExecutorService.running.values()) >= max(1, self.settings.downloadWorkers)):
+            return None
+
+        for job in DownloadExecutorService.pending:
+            if(DownloadExecutorService.running.get(job["host"], 0) < max(1, self.settings.downloadHostWorkers)):
+                DownloadExecutorService.pending.remove(job)
+                DownloadExecutorService.running[job["host"]] = DownloadExecutorService.running.get(job["host"], 0) + 1
+                return job
+
+        return None
+
+    def run(self, job: dict) -> None:
+        """
+        Run downloads, setting the result of their futures, starting with job and continuing with queued downloads until none may start. Workers take the next download themselves, so the queue is drained also while the program is exiting.
+
+        Args:
+            job (dict): Job from submit.
+        """
+
+        while(job != None):
+            path = None
+            try:
+                path = self.downloadService.download(job["url"], job["directory"], nameRegex = job["nameRegex"], prefix = job["prefix"])
+                job["future"].set_result(path)
+            except Exception as e:
+                job["future"].set_exception(e)
+            finally:
+                with DownloadExecutorService.lock:
+                    DownloadExecutorService.running[job["host"]] -= 1
+                    DownloadExecutorService.stats["done" if(path != None) else "failed"] += 1
+                    job = self.takeNext()
+
+    def wait(self, futures: List[Future], progressInterval: float = 5) -> None:
+        """
+        Wait for downloads, printing progress of all downloads every progressInterval seconds.
+
+        Args:
+            futures (List[Future]): Futures from submit.
+            progressInterval (float): Seconds between progress reports. Defaults to 5.
+        """
+
+        started = time.monotonic()
+        bytesBefore = HttpService.getStats()["bytes"]
+        remaining = set(futures)
+        while(len(remaining) > 0):
+            _, remaining = wait(remaining, timeout = progressInterval, return_when = FIRST_COMPLETED)
+            byteCount = HttpService.getStats()["bytes"] - bytesBefore
+            seconds = max(0.001, time.monotonic() - started)
+            stats = DownloadExecutorService.getStats()
+            printS("Downloads: ", len(futures) - len(remaining), "/", len(futures), " finished, ", stats["running"], " running, ", stats["queued"], " queued, ",
+                f"{byteCount / (1024 * 1024):.1f}", " MiB at ", f"{byteCount / (1024 * 1024) / seconds:.2f}", " MiB/s.", color = BashColor.OKBLUE)
+
+    def getStats() -> Dict[str, int]:
+        """
+        Get counters of downloads submitted, finished (done), failed, running and queued by all DownloadExecutorServices.
+
+        Returns:
+            Dict[str, int]: Counters by name.
+        """
+
+        with DownloadExecutorService.lock:
+            return {**DownloadExecutorService.stats,
+                "running": sum(DownloadExecutorService.running.values()),
+                "queued": len(DownloadExecutorService.pending)}
@@ -0,0 +1,392 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Set
+
+from grdUtil.BashColor import BashColor
+from grdUtil.PrintUtil import printD, printS
+
+from enums.DownloadJobState import DownloadJobState
+from model.DownloadJob import DownloadJob
+from model.Playlist import Playlist
+from services.DownloadExecutorService import DownloadExecutorService
+from services.EntityService import EntityService
+from services.QueueStreamService import QueueStreamService
+from services.StorageQuotaService import StorageQuotaService
+from Settings import Settings
+
+T = DownloadJob
+
+class DownloadJobService(EntityService[T]):
+    """
+    Durable queue of downloads, stored as DownloadJobs under LOCAL_STORAGE_PATH and run by DownloadExecutorService. Failed downloads are retried DOWNLOAD_RETRIES times, waiting DOWNLOAD_RETRY_BACKOFF minutes doubled per attempt. Jobs run in order of priority. While running, a job gets a heartbeat every heartbeatInterval seconds, and jobs whose heartbeat stopped (the process running them crashed or was killed) are queued again by reclaim. Unfinished DownloadJobs are found by URL and directory through a process-wide index, built once per storage path, and only the maxDoneJobs most recently finished DownloadJobs are kept.
+    """
+
+    heartbeatInterval: float = 60
+    maxDoneJobs: int = 200
+    lock: threading.RLock = threading.RLock()
+    runningIds: Set[str] = set()
+    indexPath: str = None
+    unfinishedIds: Dict[str, str] = {}
+    doneIds: List[str] = []
+    heartbeatThread: threading.Thread = None
+    downloadExecutorService: DownloadExecutorService = None
+    queueStreamService: QueueStreamService = None
+    storageQuotaService: StorageQuotaService = None
+    settings: Settings = None
+
+    def __init__(self):
+        self.downloadExecutorService = DownloadExecutorService()
+        self.queueStreamService = QueueStreamService()
+        self.storageQuotaService = StorageQuotaService()
+        self.settings = Settings()
+        EntityService.__init__(self, T, self.settings.debug, os.path.join(self.settings.localStoragePath, "DownloadJob"))
+
+    def enqueue(self, url: str, directory: str, nameRegex: str = None, prefix: str = None, priority: int = 0, queueStreamId: str = None, playlistId: str = None) -> T:
+        """
+        Add a download to the queue, or get the unfinished DownloadJob already queued for the same URL and directory. A failed DownloadJob is queued again, with attempts reset.
+
+        Args:
+            url (str): URL to stream.
+            directory (str): Directory (under self.settings.localStoragePath) to save downloaded content.
+            nameRegex (str): Regex to use for name. Defaults to None.
+            prefix (str): Any string to prefix filename with. Defaults to None.
+            priority (int): Priority, higher runs first, see getPriorities. Defaults to 0.
+            queueStreamId (str): ID of QueueStream downloaded. Defaults to None.
+            playlistId (str): ID of Playlist the download is for. Defaults to None.
+
+        Returns:
+            DownloadJob | None: DownloadJob if added or already queued, else None.
+        """
+
+        with DownloadJobService.lock:
+            self.loadIndex()
+            key = self.getIndexKey(url, directory)
+            jobId = DownloadJobService.unfinishedIds.get(key)
+            job = self.get(jobId) if(jobId != None) else None
+            if(job != None and job.url == url and job.directory == directory and job.stateId != DownloadJobState.DONE.value):
+                if(job.stateId == DownloadJobState.FAILED.value):
+                    job.stateId = DownloadJobState.QUEUED.value
+                    job.attempts = 0
+                    job.nextAttempt = None
+
+                job.priority = max(priority, job.priority)
+                return self.update(job)
+
+            job = self.add(DownloadJob(url = url, directory = directory, nameRegex = nameRegex, prefix = prefix, priority = priority, queueStreamId = queueStreamId, playlistId = playlistId))
+            if(job != None):
+                DownloadJobService.unfinishedIds[key] = job.id
+
+            return job
+
+    def loadIndex(self) -> None:
+        """
+        Build index of unfinished DownloadJobs by URL and directory, once per storage path, removing DownloadJobs done beyond maxDoneJobs. Call while holding lock.
+        """
+
+        indexPath = f"{self.storageEngine} {self.storagePath}"
+        if(DownloadJobService.indexPath == indexPath):
+            return
+
+        DownloadJobService.indexPath = indexPath
+        DownloadJobService.unfinishedIds = {}
+        DownloadJobService.doneIds = []
+        jobs = sorted(self.getAll(), key = lambda _: str(_.added))
+        for job in jobs:
+            if(job.stateId == DownloadJobState.DONE.value):
+                DownloadJobService.doneIds.append(job.id)
+            else:
+                DownloadJobService.unfinishedIds[self.getIndexKey(job.url, job.directory)] = job.id
+
+        self.pruneDone()
+
+    def getIndexKey(self, url: str, directory: str) -> str:
+        """
+        Get key of download in index of unfinished DownloadJobs.
+
+        Args:
+            url (str): URL to stream.
+            directory (str): Directory to save downloaded content.
+
+        Returns:
+            str: Key.
+        """
+
+        return f"{directory}\n{url}"
+
+    def pruneDone(self) -> int:
+        """
+        Remove the oldest DownloadJobs done beyond maxDoneJobs. Call while holding lock.
+
+        Returns:
+            int: Number of DownloadJobs removed.
+        """
+
+        result = 0
+        while(len(DownloadJobService.doneIds) > DownloadJobService.maxDoneJobs):
+            if(self.remove(DownloadJobService.doneIds.pop(0), includeSoftDeleted = True) != None):
+                result += 1
+
+        if(result > 0):
+            printD("Removed ", result, " finished download(s).", debug = self.settings.debug)
+
+        return result
+
+    def getPriorities(self, playlist: Playlist) -> Dict[str, int]:
+        """
+        Get priority of downloading each QueueStream in Playlist. The next DOWNLOAD_PRIORITY_STREAMS unwatched QueueStreams of favorite Playlists come first (2), then the rest of favorite Playlists (1), then others (0).
+
+        Args:
+            playlist (Playlist): Playlist.
+
+        Returns:
+            Dict[str, int]: Priority by QueueStream ID.
+        """
+
+        if(not playlist.favorite):
+            return {_: 0 for _ in playlist.streamIds}
+
+        result = {_: 1 for _ in playlist.streamIds}
+        remaining = self.settings.downloadPriorityStreams
+        for stream in self.queueStreamService.getMany(playlist.streamIds):
+            if(remaining <= 0):
+                break
+            if(stream == None or stream.watched != None):
+                continue
+
+            result[stream.id] = 2
+            remaining -= 1
+
+        return result
+
+    def getDue(self) -> List[T]:
+        """
+        Get queued DownloadJobs which are not waiting to be retried, in the order they should run.
+
+        Returns:
+            List[DownloadJob]: DownloadJobs by priority, then by time added.
+        """
+
+        now = time.time()
+        jobs = [_ for _ in self.getAll() if(_.stateId == DownloadJobState.QUEUED.value and (_.nextAttempt == None or _.nextAttempt <= now))]
+        return sorted(jobs, key = lambda _: (-_.priority, str(_.added)))
+
+    def getAllSorted(self) -> List[T]:
+        """
+        Get all DownloadJobs sorted by state (queued, running, failed, done), then as getDue.
+
+        Returns:
+            List[DownloadJob]: DownloadJobs in storage, sorted.
+        """
+
+        return sorted(self.getAll(), key = lambda _: (_.stateId, -_.priority, str(_.added)))
+
+    def getAllIdsSorted(self) -> List[str]:
+        """
+        Get all IDs of DownloadJobs sorted after getAllSorted().
+
+        Returns:
+            List[str]: IDs in storage, sorted.
+        """
+
+        return [_.id for _ in self.getAllSorted()]
+
+    def start(self, job: T) -> Future:
+        """
+        Run DownloadJob in the background, marking it running until it finishes.
+
+        Args:
+            job (DownloadJob): DownloadJob, queued.
+
+        Returns:
+            Future: Future of absolute path of file, None if download failed, done after DownloadJob is updated.
+        """
+
+        with DownloadJobService.lock:
+            job.stateId = DownloadJobState.RUNNING.value
+            job.attempts += 1
+            job.heartbeat = time.time()
+            self.update(job)
+            DownloadJobService.runningIds.add(job.id)
+            self.startHeartbeat()
+
+        nameRegex = re.compile(job.nameRegex) if(job.nameRegex != None) else None
+        result = Future()
+        future = self.downloadExecutorService.submit(job.url, job.directory, nameRegex, job.prefix)
+        future.add_done_callback(lambda _: self.finish(job.id, _, result))
+        return result
+
+    def finish(self, jobId: str, future: Future, result: Future) -> None:
+        """
+        Update DownloadJob given by jobId by the result of its download: done, queued for retry with backoff, or failed after DOWNLOAD_RETRIES retries. When the last running download finishes, videos are evicted to stay within VIDEO_STORAGE_LIMIT. Used as callback of DownloadExecutorService.submit.
+
+        Args:
+            jobId (str): ID of DownloadJob.
+            future (Future): Future of download.
+            result (Future): Future returned by start, given the result of future when DownloadJob is updated.
+        """
+
+        error = future.exception()
+        try:
+            self.updateFinished(jobId, future.result() if(error == None) else None, error)
+            with DownloadJobService.lock:
+                allFinished = len(DownloadJobService.runningIds) == 0
+
+            if(allFinished and self.settings.videoStorageLimit > 0):
+                self.storageQuotaService.enforce()
+        finally:
+            if(error != None):
+                result.set_exception(error)
+            else:
+                result.set_result(future.result())
+
+    def updateFinished(self, jobId: str, path: str, error: Exception) -> None:
+        """
+        Update DownloadJob given by jobId by the result of its download, see finish.
+
+        Args:
+            jobId (str): ID of DownloadJob.
+            path (str): Absolute path of file, None if download failed.
+            error (Exception): Error raised by download, if any.
+        """
+
+        with DownloadJobService.lock:
+            DownloadJobService.runningIds.discard(jobId)
+            job = self.get(jobId)
+            if(job == None):
+                return
+
+            job.path = path
+            job.heartbeat = None
+            if(job.path != None):
+                job.stateId = DownloadJobState.DONE.value
+                job.lastError = None
+                self.loadIndex()
+                key = self.getIndexKey(job.url, job.directory)
+                if(DownloadJobService.unfinishedIds.get(key) == job.id):
+                    DownloadJobService.unfinishedIds.pop(key)
+
+                DownloadJobService.doneIds.append(job.id)
+            else:
+                job.lastError = str(error) if(error != None) else "Download failed, see output for details."
+                if(job.attempts > self.settings.downloadRetries):
+                    job.stateId = DownloadJobState.FAILED.value
+                else:
+                    job.stateId = DownloadJobState.QUEUED.value
+                    job.nextAttempt = time.time() + self.settings.downloadRetryBackoff * 60 * 2 ** (job.attempts - 1)
+
+            self.update(job)
+            self.pruneDone()
+
+    def drain(self) -> Dict[str, int]:
+        """
+        Run queued DownloadJobs that are due, until none are. Jobs waiting to be retried are left for a later drain.
+
+        Returns:
+            Dict[str, int]: Number of DownloadJobs done, queued for retry and failed, by name.
+        """
+
+        self.reclaim()
+        jobIds = []
+        while(True):
+            jobs = self.getDue()
+            if(len(jobs) == 0):
+                break
+
+            jobIds += [_.id for _ in jobs if(_.id not in jobIds)]
+            self.downloadExecutorService.wait([self.start(_) for _ in jobs])
+
+        result = {"done": 0, "retry": 0, "failed": 0}
+        for job in self.getMany(jobIds):
+            if(job == None):
+                continue
+            if(job.stateId == DownloadJobState.DONE.value):
+                result["done"] += 1
+            elif(job.stateId == DownloadJobState.FAILED.value):
+                result["failed"] += 1
+            else:
+                result["retry"] += 1
+
+        return result
+
+    def retry(self, jobIds: List[str] = None) -> List[T]:
+        """
+        Queue failed DownloadJobs again, with attempts reset.
+
+        Args:
+            jobIds (List[str]): IDs of DownloadJobs. Defaults to None, which retries all failed.
+
+        Returns:
+            List[DownloadJob]: DownloadJobs queued.
+        """
+
+        result = []
+        with DownloadJobService.lock:
+            jobs = self.getMany(jobIds) if(jobIds != None) else self.getAll()
+            for job in jobs:
+                if(job == None or job.stateId != DownloadJobState.FAILED.value):
+                    continue
+
+                job.stateId = DownloadJobState.QUEUED.value
+                job.attempts = 0
+                job.nextAttempt = None
+                if(self.update(job) != None):
+                    result.append(job)
+
+        return result
+
+    def reclaim(self) -> List[T]:
+        """
+        Queue DownloadJobs marked running without a recent heartbeat, left behind by a process that stopped before they finished. The interrupted attempt is not counted.
+
+        Returns:
+            List[DownloadJob]: DownloadJobs queued.
+        """
+
+        result = []
+        staleBefore = time.time() - 3 * DownloadJobService.heartbeatInterval
+        with DownloadJobService.lock:
+            for job in self.getAll():
+                if(job.stateId != DownloadJobState.RUNNING.value or job.id in DownloadJobService.runningIds or (job.heartbeat != None and job.heartbeat > staleBefore)):
+                    continue
+
+                job.stateId = DownloadJobState.QUEUED.value
+                job.attempts = max(0, job.attempts - 1)
+                job.heartbeat = None
+                if(self.update(job) != None):
+                    result.append(job)
+
+        printS("Reclaimed ", len(result), " interrupted download(s).", color = BashColor.WARNING, doPrint = (len(result) > 0))
+        return result
+
+    def startHeartbeat(self) -> None:
+        """
+        Start the process-wide thread updating heartbeat of running DownloadJobs, if not running. Call while holding lock.
+        """
+
+        if(DownloadJobService.heartbeatThread != None and DownloadJobService.heartbeatThread.is_alive()):
+            return
+
+        DownloadJobService.heartbeatThread = threading.Thread(target = self.beat, name = "downloadHeartbeat", daemon = True)
+        DownloadJobService.heartbeatThread.start()
+
+    def beat(self) -> None:
+        """
+        Update heartbeat of DownloadJobs running in this process every heartbeatInterval seconds, until none are running.
+        """
+
+        while(True):
+            time.sleep(DownloadJobService.heartbeatInterval)
+            with DownloadJobService.lock:
+                if(len(DownloadJobService.runningIds) == 0):
+                    DownloadJobService.heartbeatThread = None
+                    return
+
+                for job in self.getMany(list(DownloadJobService.runningIds)):
+                    if(job != None and job.stateId == DownloadJobState.RUNNING.value):
+                        job.heartbeat = time.time()
+                        self.update(job)
+
+            printD("Updated heartbeat of ", len(DownloadJobService.runningIds), " running download(s).", debug = self.settings.debug)
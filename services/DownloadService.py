@@ -2,10 +2,8 @@ import json
 import os
 import re
 import sys
-import urllib.request
 from re import Pattern
 
-import mechanize
 from bs4 import BeautifulSoup
 from grdException.ArgumentException import ArgumentException
 from grdException.NotImplementedException import NotImplementedException
@@ -17,18 +15,24 @@ from grdUtil.PrintUtil import printD, printS
 from jsonpath_ng import jsonpath, parse
 from pytube import YouTube
 
+from repositories.DownloadStore import DownloadStore
+from services.HttpService import HttpService
 from Settings import Settings
 
 
 class DownloadService():
+    httpService: HttpService = None
     settings: Settings = None
     
     def __init__(self):
+        self.httpService = HttpService()
         self.settings = Settings()
+        mkdir(os.path.join(self.settings.localStoragePath, "video"))
+        DownloadStore.load(os.path.join(self.settings.localStoragePath, "video", "downloadStore.json"))
         
     def download(self, url: str, directory: str, fileExtension: str = "mp4", nameRegex: Pattern[str] = None, prefix: str = None) -> str:
         """
-        Download stream given by URL.
+        Download stream given by URL. Videos already downloaded, for this or another Playlist, are hardlinked from DownloadStore instead.
 
         Args:
             url (str): URL to stream.
@@ -41,6 +45,10 @@ class DownloadService():
             str: Absolute path of file.
         """
         
+        storedPath = self.linkStored(url, directory, fileExtension, nameRegex, prefix)
+        if(storedPath != None):
+            return storedPath
+
         youtubeRegex = re.compile(r'(\.|\/)youtu(\.?)be(\.|\/)')
         odyseeRegex = re.compile(r'(\.|\/)odysee\.')
         
@@ -51,6 +59,62 @@ class DownloadService():
         
         raise NotImplementedException("No implementation for url: %s" % url)
         
+    def linkStored(self, url: str, directory: str, fileExtension: str = "mp4", nameRegex: Pattern[str] = None, prefix: str = None) -> str:
+        """
+        Hardlink video at URL into directory if it is in DownloadStore. If hardlinks are not supported (like across drives), the stored file is used as is.
+
+        Args:
+            url (str): URL to stream.
+            directory (str): Directory (under self.settings.localStoragePath) to save downloaded content.
+            fileExtension (str): File extension of stream.
+            nameRegex (Pattern[str]): Regex to use for name.
+            prefix (str): Any string to prefix filename with.
+
+        Returns:
+            str | None: Absolute path of file, None if video is not stored.
+        """
+
+        key = DownloadStore.getKey(url)
+        entry = DownloadStore.get(key) if(key != None) else None
+        if(entry == None):
+            return None
+
+        videoPath = self.getVideoPath(directory, entry["name"], fileExtension, nameRegex, prefix)
+        DownloadStore.touch(key)
+        if(videoPath in entry["paths"]):
+            printS("Already downloaded ", url, " to ", videoPath, color = BashColor.OKGREEN)
+            return videoPath
+
+        sameDirectory = [_ for _ in entry["paths"] if(os.path.dirname(_) == os.path.dirname(videoPath))]
+        if(len(sameDirectory) > 0 and prefix == None and nameRegex == None):
+            printS("Already downloaded ", url, " to ", sameDirectory[0], color = BashColor.OKGREEN)
+            return sameDirectory[0]
+
+        try:
+            os.link(entry["paths"][0], videoPath)
+        except OSError as e:
+            printD("Could not hardlink ", entry["paths"][0], ": ", e, debug = self.settings.debug)
+            printS("Already downloaded ", url, " to ", entry["paths"][0], color = BashColor.OKGREEN)
+            return entry["paths"][0]
+
+        DownloadStore.addPath(key, videoPath)
+        printS("Already downloaded ", url, ", linked to ", videoPath, color = BashColor.OKGREEN)
+        return videoPath
+
+    def addStored(self, url: str, videoPath: str, name: str) -> None:
+        """
+        Add a downloaded video to DownloadStore, if url is a video of a supported platform.
+
+        Args:
+            url (str): URL of stream.
+            videoPath (str): Absolute path of file.
+            name (str): Name of video.
+        """
+
+        key = DownloadStore.getKey(url)
+        if(key != None):
+            DownloadStore.add(key, videoPath, name)
+
     def getVideoPath(self, sourceName: str, name: str, fileExtension: str, nameRegex: Pattern[str] = None, prefix: str = None) -> str:
         """
         Get absolute path to download videos to, filename, with extension.
@@ -111,11 +175,12 @@ class DownloadService():
             youtube = YouTube(url)
             printS("Downloading video from ", url)
             videoPath = self.getVideoPath(directory, youtube.title(), fileExtension, nameRegex, prefix)
-            path = "/".join(videoPath.split("/")[0:-1])
-            name = videoPath.split("/")[-1]
-            
-            youtube.streams.filter(progressive = True, file_extension = fileExtension).order_by("resolution").desc().first().download(path, name)
+            stream = youtube.streams.filter(progressive = True, file_extension = fileExtension).order_by("resolution").desc().first()
             
+            # Stream URLs are signed per session, the video URL identifies the partial file between runs
+            downloadResult = self.httpService.downloadFile(stream.url, videoPath, partKey = url, expectedSize = stream.filesize)
+            printS("Downloaded \"", os.path.basename(videoPath), "\": ", downloadResult.summaryString(), color = BashColor.OKGREEN)
+            self.addStored(url, videoPath, youtube.title())
             return videoPath
         except Exception as e:
             printS("Failed download video: ", e, color = BashColor.FAIL)
@@ -136,16 +201,13 @@ class DownloadService():
             str: Absolute path of file.
         """
         
-        br = mechanize.Browser()
-        br.set_handle_robots(False)
-        br.addheaders = [('User-agent', 'Mozilla/5.0 (X11; U; Linux i686; en-US; rv:1.9.0.1) Gecko/2008071615 Fedora/3.0.1-1.fc9 Firefox/3.0.1')]
         videoTitle = None
         fileUrl = None
         try:
             printS("Fetching data for video ", url)
-            br.open(url)
-            html = br.response().read()
-            document = BeautifulSoup(html, 'html.parser')
+            httpRequest = self.httpService.get(url)
+            httpRequest.raise_for_status()
+            document = BeautifulSoup(httpRequest.content, 'html.parser')
             scriptContent = document.find("script", { "type": "application/ld+json" })
             if(scriptContent == None):
                 printS("No content was found for URL \"", url, "\". Please check that the URL is correct.", color = BashColor.FAIL)
@@ -172,7 +234,9 @@ class DownloadService():
         
         videoPath = self.getVideoPath(directory, videoTitle, fileExtension, nameRegex, prefix)
         try:
-            urllib.request.urlretrieve(fileUrl, videoPath) 
+            downloadResult = self.httpService.downloadFile(fileUrl, videoPath, partKey = url)
+            printS("Downloaded \"", os.path.basename(videoPath), "\": ", downloadResult.summaryString(), color = BashColor.OKGREEN)
+            self.addStored(url, videoPath, videoTitle)
         except Exception as e:
             printS("Failed download video: ", e, color = BashColor.FAIL)
             return None
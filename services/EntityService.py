@@ -0,0 +1,336 @@
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, TypeVar
+
+from grdService.BaseService import BaseService
+from grdUtil.DateTimeUtil import getDateTime
+
+from repositories.EntityCache import EntityCache
+from repositories.SqliteRepository import SqliteRepository
+from Settings import Settings
+
+T = TypeVar("T")
+
+class EntityService(BaseService[T]):
+    """
+    BaseService with a storage engine selected by the STORAGE_ENGINE setting. "json" keeps one JSON file per entity (BaseService), "sqlite" uses a single SQLite database.
+    """
+
+    storageEngine: str = None
+    storagePath: str = None
+    typeName: str = None
+    sqliteRepository: SqliteRepository = None
+    getManyWorkers: int = 16
+
+    def __init__(self, typeT: type, debug: bool, storagePath: str):
+        settings = Settings()
+        EntityCache.setMaxEntries(settings.entityCacheMaxEntries)
+        self.storageEngine = settings.storageEngine
+        if(self.storageEngine == "sqlite"):
+            self.sqliteRepository = SqliteRepository(typeT, debug, settings.sqliteFilepath)
+
+        BaseService.__init__(self, typeT, debug, storagePath)
+        self.storagePath = storagePath
+        self.typeName = typeT.__name__
+
+    def usesSqlite(self) -> bool:
+        """
+        Check if this service stores entities in SQLite.
+
+        Returns:
+            bool: Result.
+        """
+
+        return self.sqliteRepository != None
+
+    def get(self, id: str, includeSoftDeleted: bool = False) -> T:
+        """
+        Get entity given by ID.
+
+        Args:
+            id (str): ID of entity to get.
+            includeSoftDeleted (bool): should include soft-deleted entities.
+
+        Returns:
+            T | None: Entity if found, else None.
+        """
+
+        token = self.getCacheToken(id)
+        entity = EntityCache.get(self.typeName, id, token)
+        if(entity == None):
+            entity = self.sqliteRepository.get(id) if(self.usesSqlite()) else BaseService.get(self, id, True)
+            EntityCache.set(self.typeName, id, entity, token)
+
+        if(entity == None or (entity.deleted != None and not includeSoftDeleted)):
+            return None
+
+        return entity
+
+    def getMany(self, ids: List[str], includeSoftDeleted: bool = False) -> List[T]:
+        """
+        Get entities given by IDs in bulk, with a single query for SQLite or a thread pool of reads for JSON files.
+
+        Args:
+            ids (List[str]): IDs of entities to get.
+            includeSoftDeleted (bool): should include soft-deleted entities.
+
+        Returns:
+            List[T | None]: Entities in the same order as ids, None where an ID was not found. Use getMissingIds to list them.
+        """
+
+        if(len(ids) == 0):
+            return []
+
+        if(self.usesSqlite()):
+            token = self.sqliteRepository.getDataVersion()
+            found = {}
+            for id in dict.fromkeys(ids):
+                entity = EntityCache.get(self.typeName, id, token)
+                if(entity != None):
+                    found[id] = entity
+
+            read = self.sqliteRepository.getMany([id for id in ids if(id not in found)])
+            for id, entity in read.items():
+                EntityCache.set(self.typeName, id, entity, token)
+            
+            found.update(read)
+            result = [found.get(id) for id in ids]
+            return [_ if(_ != None and (_.deleted == None or includeSoftDeleted)) else None for _ in result]
+
+        uniqueIds = list(dict.fromkeys(ids))
+        with ThreadPoolExecutor(max_workers = min(self.getManyWorkers, len(uniqueIds))) as executor:
+            found = dict(zip(uniqueIds, executor.map(lambda id: self.get(id, includeSoftDeleted), uniqueIds)))
+
+        return [found[id] for id in ids]
+
+    def getMissingIds(self, ids: List[str], entities: List[T]) -> List[str]:
+        """
+        Get IDs which getMany could not find.
+
+        Args:
+            ids (List[str]): IDs given to getMany.
+            entities (List[T]): Result of getMany.
+
+        Returns:
+            List[str]: IDs with no entity.
+        """
+
+        return [id for id, entity in zip(ids, entities) if(entity == None)]
+
+    def getAll(self, includeSoftDeleted: bool = False) -> List[T]:
+        """
+        Get all entities. Not added to EntityCache, as a full scan would only push out the entities read by ID.
+
+        Args:
+            includeSoftDeleted (bool): should include soft-deleted entities.
+
+        Returns:
+            List[T]: Entities in storage.
+        """
+
+        return self.sqliteRepository.getAll(includeSoftDeleted) if(self.usesSqlite()) else BaseService.getAll(self, includeSoftDeleted)
+
+    def getAllIds(self, includeSoftDeleted: bool = False) -> List[str]:
+        """
+        Get IDs of all entities.
+
+        Args:
+            includeSoftDeleted (bool): should include soft-deleted entities.
+
+        Returns:
+            List[str]: IDs in storage.
+        """
+
+        if(not self.usesSqlite()):
+            return BaseService.getAllIds(self, includeSoftDeleted)
+
+        return self.sqliteRepository.getAllIds(includeSoftDeleted)
+
+    def getAllDeleted(self) -> List[T]:
+        """
+        Get all soft-deleted entities.
+
+        Returns:
+            List[T]: Soft-deleted entities.
+        """
+
+        if(not self.usesSqlite()):
+            return [_ for _ in BaseService.getAll(self, includeSoftDeleted = True) if _.deleted != None]
+
+        return self.sqliteRepository.getAllDeleted()
+
+    def add(self, entity: T) -> T:
+        """
+        Add a new entity, setting a new ID if entity has none.
+
+        Args:
+            entity (T): Entity to add.
+
+        Returns:
+            T | None: Entity if added, else None.
+        """
+
+        if(not self.usesSqlite()):
+            return self.cacheWritten(entity.id, BaseService.add(self, entity))
+
+        if(entity.id == None):
+            entity.id = str(uuid.uuid4())
+
+        return self.cacheWritten(entity.id, entity if(self.sqliteRepository.add(entity)) else None)
+
+    def update(self, entity: T, allowSoftDeleted: bool = False) -> T:
+        """
+        Update an existing entity.
+
+        Args:
+            entity (T): Entity to update.
+            allowSoftDeleted (bool): should allow updating soft-deleted entities.
+
+        Returns:
+            T | None: Entity if updated, else None.
+        """
+
+        if(not self.usesSqlite()):
+            return self.cacheWritten(entity.id, BaseService.update(self, entity, allowSoftDeleted))
+
+        if(self.get(entity.id, allowSoftDeleted) == None):
+            return None
+
+        return self.cacheWritten(entity.id, entity if(self.sqliteRepository.update(entity)) else None)
+
+    def delete(self, id: str) -> T:
+        """
+        Soft delete entity given by ID.
+
+        Args:
+            id (str): ID of entity to delete.
+
+        Returns:
+            T | None: Entity if deleted, else None.
+        """
+
+        if(not self.usesSqlite()):
+            return self.cacheWritten(id, BaseService.delete(self, id))
+
+        entity = self.get(id)
+        if(entity == None):
+            return None
+
+        entity.deleted = getDateTime()
+        return self.cacheWritten(id, entity if(self.sqliteRepository.update(entity)) else None)
+
+    def restore(self, id: str) -> T:
+        """
+        Restore soft-deleted entity given by ID.
+
+        Args:
+            id (str): ID of entity to restore.
+
+        Returns:
+            T | None: Entity if restored, else None.
+        """
+
+        if(not self.usesSqlite()):
+            return self.cacheWritten(id, BaseService.restore(self, id))
+
+        entity = self.get(id, includeSoftDeleted = True)
+        if(entity == None):
+            return None
+
+        entity.deleted = None
+        return self.cacheWritten(id, entity if(self.sqliteRepository.update(entity)) else None)
+
+    def remove(self, id: str, includeSoftDeleted: bool = False) -> T:
+        """
+        Permanently remove entity given by ID.
+
+        Args:
+            id (str): ID of entity to remove.
+            includeSoftDeleted (bool): should include soft-deleted entities.
+
+        Returns:
+            T | None: Entity if removed, else None.
+        """
+
+        if(not self.usesSqlite()):
+            result = BaseService.remove(self, id, includeSoftDeleted)
+            EntityCache.invalidate(self.typeName, id)
+            return result
+
+        entity = self.get(id, includeSoftDeleted)
+        EntityCache.invalidate(self.typeName, id)
+        if(entity == None):
+            return None
+
+        return entity if(self.sqliteRepository.remove(id)) else None
+
+    def exists(self, id: str) -> bool:
+        """
+        Check if entity given by ID exists, regardless of soft-deleted status.
+
+        Args:
+            id (str): ID of entity.
+
+        Returns:
+            bool: Result.
+        """
+
+        if(not self.usesSqlite()):
+            return BaseService.exists(self, id)
+
+        return self.sqliteRepository.exists(id)
+
+    def getFilePath(self, id: str) -> str:
+        """
+        Get path of JSON file for entity given by ID, when using JSON storage.
+
+        Args:
+            id (str): ID of entity.
+
+        Returns:
+            str | None: Absolute file path, None if using SQLite.
+        """
+
+        if(self.usesSqlite()):
+            return None
+
+        return os.path.join(self.storagePath, f"{id}.json")
+
+    def getCacheToken(self, id: str) -> object:
+        """
+        Get token used by EntityCache to detect changes to entity given by ID, including changes made outside the program. Modified time and size of the JSON file, or the data version of the SQLite database.
+
+        Args:
+            id (str): ID of entity.
+
+        Returns:
+            object | None: Token, None if entity is not stored.
+        """
+
+        if(self.usesSqlite()):
+            return self.sqliteRepository.getDataVersion()
+
+        try:
+            stat = os.stat(self.getFilePath(id))
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def cacheWritten(self, id: str, entity: T) -> T:
+        """
+        Update EntityCache after a write, invalidating the entry if the write failed.
+
+        Args:
+            id (str): ID of entity written.
+            entity (T): Result of the write.
+
+        Returns:
+            T | None: entity.
+        """
+
+        EntityCache.invalidate(self.typeName, id)
+        if(entity != None):
+            EntityCache.set(self.typeName, entity.id, entity, self.getCacheToken(entity.id))
+
+        return entity
@@ -0,0 +1,244 @@
+import heapq
+import json
+import os
+import random
+import signal
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from grdUtil.BashColor import BashColor
+from grdUtil.PrintUtil import printD, printS
+
+from model.StreamSource import StreamSource
+from services.FetchService import FetchService
+from services.HttpService import HttpService
+from Settings import Settings
+
+
+class FetchDaemonService():
+    """
+    Long-running fetch (fetchd). StreamSources are kept in a priority queue by the time they are due, and each is polled at an interval adapted to how often it has new videos, within FETCHD_MIN_INTERVAL and FETCHD_MAX_INTERVAL. Requests are limited by FETCHD_REQUESTS_PER_MINUTE. The schedule is saved in LOCAL_STORAGE_PATH so a restart continues where it stopped, spreading overdue sources out instead of fetching all at once.
+    """
+
+    fetchService: FetchService = None
+    settings: Settings = None
+    schedulePath: str = None
+    schedule: Dict[str, dict] = None
+    stopEvent: threading.Event = None
+    uploadHistoryLength: int = 10
+
+    def __init__(self):
+        self.fetchService = FetchService()
+        self.settings = Settings()
+        self.schedulePath = os.path.join(self.settings.localStoragePath, "fetchdSchedule.json")
+        self.schedule = {}
+        self.stopEvent = threading.Event()
+
+    def run(self, playlistIds: List[str], batchSize: int = 10) -> None:
+        """
+        Fetch StreamSources of Playlists as they become due, until stopped by SIGINT or SIGTERM. The fetch in progress is finished and the schedule saved before returning.
+
+        Args:
+            playlistIds (List[str]): IDs of Playlists to fetch for.
+            batchSize (int): Number of videos to check at a time, unrelated to max videos that will be read. Defaults to 10.
+        """
+
+        self.stopEvent.clear()
+        previousHandlers = {_: signal.signal(_, self.stop) for _ in [signal.SIGINT, signal.SIGTERM]}
+        minInterval = self.settings.fetchdMinInterval * 60
+        budgetPerSecond = self.settings.fetchdRequestsPerMinute / 60
+        tokens = float(self.settings.fetchdRequestsPerMinute)
+        tokensUpdated = time.time()
+
+        self.loadSchedule()
+        printS("Fetch daemon started for ", len(playlistIds), " playlist(s), stop with Ctrl+C.", color = BashColor.OKGREEN)
+        try:
+            while(not self.stopEvent.is_set()):
+                groups = self.fetchService.getFetchGroups(playlistIds)
+                groupsByKey = {self.getScheduleKey(members[0][1]): members for members in groups}
+                queue = self.getQueue(groupsByKey, minInterval)
+                if(len(queue) == 0):
+                    printS("No StreamSources with fetch enabled, waiting.", color = BashColor.WARNING)
+                    self.stopEvent.wait(minInterval)
+                    continue
+
+                now = time.time()
+                tokens = min(float(self.settings.fetchdRequestsPerMinute), tokens + (now - tokensUpdated) * budgetPerSecond)
+                tokensUpdated = now
+
+                dueKeys = []
+                while(len(queue) > 0 and queue[0][0] <= now and len(dueKeys) < int(tokens)):
+                    dueKeys.append(heapq.heappop(queue)[1])
+
+                if(len(dueKeys) == 0):
+                    nextDue = queue[0][0] if(len(queue) > 0 and queue[0][0] > now) else now + (1 - tokens % 1) / budgetPerSecond
+                    printD("Next fetch in ", round(nextDue - now), " seconds.", debug = self.settings.debug)
+                    self.stopEvent.wait(max(1, nextDue - now))
+                    continue
+
+                requestsBefore = HttpService.getStats()["requests"]
+                self.fetchDue(playlistIds, [groupsByKey[_] for _ in dueKeys], dueKeys, batchSize)
+                tokens -= max(len(dueKeys), HttpService.getStats()["requests"] - requestsBefore)
+                self.saveSchedule()
+        finally:
+            self.saveSchedule()
+            for signalNumber, handler in previousHandlers.items():
+                signal.signal(signalNumber, handler)
+
+            printS("Fetch daemon stopped.", color = BashColor.OKGREEN)
+
+    def stop(self, signalNumber: int = None, frame: object = None) -> None:
+        """
+        Stop run after the fetch in progress. Used as signal handler.
+
+        Args:
+            signalNumber (int): Signal received. Defaults to None.
+            frame (object): Current stack frame. Defaults to None.
+        """
+
+        printS("Stopping fetch daemon after current fetch...", color = BashColor.WARNING, doPrint = (not self.stopEvent.is_set()))
+        self.stopEvent.set()
+
+    def fetchDue(self, playlistIds: List[str], groups: List[List[Tuple[int, StreamSource]]], keys: List[str], batchSize: int) -> None:
+        """
+        Fetch groups of StreamSources and reschedule them by the result.
+
+        Args:
+            playlistIds (List[str]): IDs of Playlists the groups were made from.
+            groups (List[List[Tuple[int, StreamSource]]]): Groups to fetch.
+            keys (List[str]): Schedule keys of groups.
+            batchSize (int): Number of videos to check at a time.
+        """
+
+        lastSuccessfulFetched = [max([self.toTimestamp(source.lastSuccessfulFetched) for _, source in members]) for members in groups]
+        results = self.fetchService.fetchGroups(playlistIds, groups, batchSize, takeNewOnly = True)
+        now = time.time()
+        for key, members, previousSuccessfulFetched in zip(keys, groups, lastSuccessfulFetched):
+            entry = self.schedule[key]
+            foundNew = any([self.toTimestamp(source.lastSuccessfulFetched) > previousSuccessfulFetched for _, source in members])
+            if(foundNew):
+                entry["uploadTimes"] = (entry["uploadTimes"] + [now])[-self.uploadHistoryLength:]
+
+            entry["interval"] = self.getInterval(entry["uploadTimes"], previousSuccessfulFetched, now)
+            entry["lastFetched"] = now
+            entry["nextDue"] = now + entry["interval"]
+            printD("Fetched ", members[0][1].name, ", next fetch in ", round(entry["interval"] / 60), " minutes.", debug = self.settings.debug)
+
+        added = sum([_.added for _ in results])
+        printS(datetime.now().strftime("%Y-%m-%d %H:%M:%S"), ": Fetched ", len(groups), " source(s), added ", added, " stream(s).", color = BashColor.OKGREEN if(added > 0) else None)
+
+    def getInterval(self, uploadTimes: List[float], lastSuccessfulFetched: float, now: float) -> float:
+        """
+        Get seconds until next fetch from the upload rate of a source: a quarter of the average time between new videos found, or of the time since last new video if there is no history yet. Clamped to FETCHD_MIN_INTERVAL and FETCHD_MAX_INTERVAL.
+
+        Args:
+            uploadTimes (List[float]): Timestamps of fetches that found new videos.
+            lastSuccessfulFetched (float): Timestamp of StreamSource.lastSuccessfulFetched before this fetch, 0 if never.
+            now (float): Current timestamp.
+
+        Returns:
+            float: Seconds.
+        """
+
+        minInterval = self.settings.fetchdMinInterval * 60
+        maxInterval = self.settings.fetchdMaxInterval * 60
+        if(len(uploadTimes) >= 2):
+            gap = (uploadTimes[-1] - uploadTimes[0]) / (len(uploadTimes) - 1)
+            gap = max(gap, now - uploadTimes[-1])
+        elif(lastSuccessfulFetched > 0):
+            gap = now - lastSuccessfulFetched
+        else:
+            gap = maxInterval
+
+        return min(maxInterval, max(minInterval, gap / 4))
+
+    def getQueue(self, groupsByKey: Dict[str, list], minInterval: float) -> List[Tuple[float, str]]:
+        """
+        Get priority queue of groups by time due, adding new groups to the schedule. Groups never scheduled, or overdue when the schedule was loaded, are spread randomly over the minimum interval.
+
+        Args:
+            groupsByKey (Dict[str, list]): Groups by schedule key.
+            minInterval (float): FETCHD_MIN_INTERVAL in seconds.
+
+        Returns:
+            List[Tuple[float, str]]: Heap of (due timestamp, schedule key).
+        """
+
+        now = time.time()
+        queue = []
+        for key in groupsByKey:
+            entry = self.schedule.get(key)
+            if(entry == None):
+                entry = {"nextDue": now + random.uniform(0, minInterval), "interval": minInterval, "uploadTimes": [], "lastFetched": None}
+                self.schedule[key] = entry
+
+            queue.append((entry["nextDue"], key))
+
+        heapq.heapify(queue)
+        return queue
+
+    def getScheduleKey(self, source: StreamSource) -> str:
+        """
+        Get key of a fetch group in the schedule, stable between runs.
+
+        Args:
+            source (StreamSource): Any StreamSource in group.
+
+        Returns:
+            str: Key.
+        """
+
+        return "|".join([str(_) for _ in self.fetchService.getFetchKey(source)])
+
+    def loadSchedule(self) -> None:
+        """
+        Load schedule from file. Overdue entries are spread randomly over the minimum interval, so a restart does not fetch every source at once.
+        """
+
+        self.schedule = {}
+        if(os.path.isfile(self.schedulePath)):
+            try:
+                with open(self.schedulePath, "r") as file:
+                    self.schedule = json.load(file)
+            except (OSError, ValueError) as e:
+                printS("Could not read fetch schedule, starting a new one: ", e, color = BashColor.WARNING)
+
+        now = time.time()
+        spread = self.settings.fetchdMinInterval * 60
+        for entry in self.schedule.values():
+            if(entry["nextDue"] < now):
+                entry["nextDue"] = now + random.uniform(0, min(spread, entry["interval"]))
+
+    def saveSchedule(self) -> None:
+        """
+        Save schedule to file.
+        """
+
+        temporaryPath = f"{self.schedulePath}.tmp"
+        with open(temporaryPath, "w") as file:
+            json.dump(self.schedule, file)
+
+        os.replace(temporaryPath, self.schedulePath)
+
+    def toTimestamp(self, value: object) -> float:
+        """
+        Get timestamp of a datetime, or datetime string as stored in JSON.
+
+        Args:
+            value (object): datetime, string or None.
+
+        Returns:
+            float: Timestamp, 0 if value is None or not a date.
+        """
+
+        if(value == None):
+            return 0
+        if(isinstance(value, datetime)):
+            return value.timestamp()
+
+        try:
+            return datetime.fromisoformat(str(value)).timestamp()
+        except ValueError:
+            return 0
@@ -1,133 +1,483 @@
-import json
+import copy
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import List
-from xml.dom.minidom import parseString
+from itertools import islice, takewhile
+from typing import Callable, List, Tuple
+from xml.etree.ElementTree import ParseError
 
-import mechanize
 import requests
-from bs4 import BeautifulSoup
+
 from grdException.ArgumentException import ArgumentException
 from grdException.DatabaseException import DatabaseException
 from grdException.NotImplementedException import NotImplementedException
 from grdUtil.BashColor import BashColor
-from grdUtil.DateTimeUtil import getDateTime, stringToDatetime
+from grdUtil.DateTimeUtil import getDateTime
 from grdUtil.FileUtil import mkdir
 from grdUtil.InputUtil import sanitize
 from grdUtil.PrintUtil import printD, printS
-from jsonpath_ng import jsonpath, parse
 from pytube import Channel
 
+from enums.DownloadJobState import DownloadJobState
 from enums.StreamSourceType import StreamSourceType
+from model.FeedItem import FeedItem
+from model.FetchResult import FetchResult
 from model.Playlist import Playlist
 from model.PlaylistDetailed import PlaylistDetailed
 from model.QueueStream import QueueStream
+from model.SeenSet import SeenSet
 from model.StreamSource import StreamSource
-from services.DownloadService import DownloadService
+from repositories.HttpCache import HttpCache
+from repositories.StreamIndex import StreamIndex
+from services.DownloadJobService import DownloadJobService
+from services.HttpService import HttpService
+from services.ParseService import ParseService
 from services.PlaylistService import PlaylistService
 from services.QueueStreamService import QueueStreamService
+from services.RequestGovernorService import RequestGovernorService
 from services.StreamSourceService import StreamSourceService
+from services.UrlService import UrlService
 from Settings import Settings
 
 
 class FetchService():
-    downloadService: DownloadService = None
+    channelIdRetryInterval: float = 7 * 24 * 60 * 60
+    downloadJobService: DownloadJobService = None
+    httpService: HttpService = None
+    parseService: ParseService = None
     playlistService: PlaylistService = None
     queueStreamService: QueueStreamService = None
+    requestGovernorService: RequestGovernorService = None
     streamSourceService: StreamSourceService = None
     settings: Settings = None
 
     def __init__(self):
-        self.downloadService = DownloadService()
+        self.downloadJobService = DownloadJobService()
+        self.httpService = HttpService()
+        self.parseService = ParseService()
         self.playlistService = PlaylistService()
         self.queueStreamService = QueueStreamService()
+        self.requestGovernorService = RequestGovernorService()
         self.streamSourceService = StreamSourceService()
         self.settings = Settings()
 
         mkdir(self.settings.localStoragePath)
+        HttpCache.load(os.path.join(self.settings.localStoragePath, "httpCache.json"), self.settings.httpCacheMaxEntries)
 
-    def fetch(self, playlistId: str, batchSize: int = 10, takeAfter: datetime = None, takeBefore: datetime = None, takeNewOnly: bool = False) -> int:
+    def fetch(self, playlistId: str, batchSize: int = 10, takeAfter: datetime = None, takeBefore: datetime = None, takeNewOnly: bool = False) -> FetchResult:
         """
-        Fetch new videos from watched sources, adding them in chronological order.
+        Fetch new videos from watched sources, adding them in chronological order. See fetchPlaylists.
 
         Args:
             batchSize (int): Number of videos to check at a time, unrelated to max videos that will be read. Defaults to 10.
             takeAfter (datetime): Limit to take video after. Defaults to None.
             takeBefore (datetime): Limit to take video before. Defaults to None.
-            takeNewOnly (bool): Only take streams marked as new. Disables takeAfter and takeBefore-checks. To use takeAfter and/or takeBefore, set this to False. Defaults to False.
+            takeNewOnly (bool): Only take streams marked as new. Disables takeAfter and takeBefore-checks. To use takeAfter and/or takeBefore, set this to False. Sources unchanged since last fetch (HttpCache) are skipped without parsing. Defaults to False.
 
         Returns:
-            int: Number of videos added.
+            FetchResult: Number of videos added, time spent per source, and HttpCache hits and misses.
+        """
+
+        return self.fetchPlaylists([playlistId], batchSize, takeAfter, takeBefore, takeNewOnly)[0]
+
+    def fetchPlaylists(self, playlistIds: List[str], batchSize: int = 10, takeAfter: datetime = None, takeBefore: datetime = None, takeNewOnly: bool = False) -> List[FetchResult]:
+        """
+        Fetch new videos from watched sources of Playlists, adding them in chronological order. StreamSources with the same type and URI, in one or several Playlists, are fetched once and the result is given to each of them. Sources are fetched in parallel (FETCH_WORKERS in settings), while updates and additions are applied in the order of Playlists and sources in Playlist.
+
+        Args:
+            playlistIds (List[str]): IDs of Playlists to fetch for.
+            batchSize (int): Number of videos to check at a time, unrelated to max videos that will be read. Defaults to 10.
+            takeAfter (datetime): Limit to take video after. Defaults to None.
+            takeBefore (datetime): Limit to take video before. Defaults to None.
+            takeNewOnly (bool): Only take streams marked as new. Disables takeAfter and takeBefore-checks. To use takeAfter and/or takeBefore, set this to False. Sources unchanged since last fetch (HttpCache) are skipped without parsing. Defaults to False.
+
+        Returns:
+            List[FetchResult]: Result per Playlist, in the same order as playlistIds.
         """
         
         if(batchSize < 1):
             raise ArgumentException("fetch - batchSize was less than 1.")
 
-        playlist = self.playlistService.get(playlistId)
-        if(playlist == None):
-            return 0
+        return self.fetchGroups(playlistIds, self.getFetchGroups(playlistIds), batchSize, takeAfter, takeBefore, takeNewOnly)
 
-        newStreams = []
-        for sourceId in playlist.streamSourceIds:
-            source = self.streamSourceService.get(sourceId)
-            
-            if(source == None):
-                printS("StreamSource with ID ", sourceId, " could not be found. Consider removing it using the purge or purgeplaylists commands.", color = BashColor.FAIL)
-                continue
-            
-            if(not source.enableFetch):
-                continue
+    def fetchGroups(self, playlistIds: List[str], groups: List[List[Tuple[int, StreamSource]]], batchSize: int = 10, takeAfter: datetime = None, takeBefore: datetime = None, takeNewOnly: bool = False) -> List[FetchResult]:
+        """
+        Fetch groups of StreamSources from getFetchGroups, each group once, and add new videos to the Playlists of each source.
+
+        Args:
+            playlistIds (List[str]): IDs of Playlists groups were made from.
+            groups (List[List[Tuple[int, StreamSource]]]): Groups from getFetchGroups, or a selection of them.
+            batchSize (int): Number of videos to check at a time, unrelated to max videos that will be read. Defaults to 10.
+            takeAfter (datetime): Limit to take video after. Defaults to None.
+            takeBefore (datetime): Limit to take video before. Defaults to None.
+            takeNewOnly (bool): Only take streams marked as new. Defaults to False.
 
-            fetchedStreams = []
-            _takeAfter = takeAfter if(not takeNewOnly) else source.lastSuccessfulFetched
+        Returns:
+            List[FetchResult]: Result per Playlist, in the same order as playlistIds.
+        """
+
+        results = [FetchResult(_) for _ in playlistIds]
+        if(len(groups) == 0):
+            return results
+
+        groupSources = [self.getFetchGroupSource([source for _, source in members]) for members in groups]
+        with ThreadPoolExecutor(max_workers = max(1, min(self.settings.fetchWorkers, len(groups)))) as executor:
+            futures = [executor.submit(self.fetchSourceTimed, groupSource, batchSize, takeAfter, takeBefore, takeNewOnly) if(not self.isHostPaused(groupSource)) else None for groupSource in groupSources]
             
-            if(source.isWeb):
-                # if(source.streamSourceTypeId == StreamSourceType.YOUTUBE.value):
-                #     fetchedStreams = self.fetchYoutube(source, batchSize, _takeAfter, takeBefore, takeNewOnly)
-                if(source.streamSourceTypeId == StreamSourceType.YOUTUBE.value):
-                    if(_takeAfter != None or takeBefore != None):
-                        printS("Arguments takeAfter and takeBefore are not supported by fetchYoutubeHtml, they will be ignored.", color = BashColor.WARNING)
-
-                    fetchedStreams = self.fetchYoutubeHtml(source, batchSize, takeNewOnly)
-                elif(source.streamSourceTypeId == StreamSourceType.ODYSEE.value):
-                    fetchedStreams = self.fetchOdysee(source, batchSize, _takeAfter, takeBefore, takeNewOnly)
-                elif(source.streamSourceTypeId == StreamSourceType.RUMBLE.value):
-                    fetchedStreams = self.fetchRumble(source, batchSize, _takeAfter, takeBefore, takeNewOnly)
+            # Apply results in Playlist order, regardless of which source finished first
+            for members, groupSource, future in zip(groups, groupSources, futures):
+                if(future == None):
+                    for resultIndex, _ in members:
+                        results[resultIndex].sourcesSkipped += 1
+
+                    continue
+
+                fetchedStreams, seconds = future.result()
+                firstResult = results[members[0][0]]
+                if(HttpCache.isNotModified(groupSource.id)):
+                    firstResult.cacheHits += 1
+                elif(len(HttpCache.getStagedKeys(groupSource.id)) > 0):
+                    firstResult.cacheMisses += 1
+
+                applied = True
+                for i, (resultIndex, source) in enumerate(members):
+                    results[resultIndex].sourceSeconds.append((source.name, seconds))
+                    results[resultIndex].fetchesSaved += 1 if(i > 0) else 0
+                    if(fetchedStreams == None):
+                        continue
+                    
+                    if(source.remoteId == None):
+                        source.remoteId = groupSource.remoteId
+                        source.remoteIdFailed = groupSource.remoteIdFailed
+
+                    memberStreams = self.getMemberStreams(source, fetchedStreams, takeNewOnly) if(len(members) > 1) else fetchedStreams
+                    added, updated = self.applyFetched(results[resultIndex].playlistId, source, memberStreams, batchSize)
+                    results[resultIndex].added += len(added)
+                    applied = applied and updated
+
+                if(fetchedStreams != None and applied):
+                    HttpCache.commit(groupSource.id)
                 else:
-                    printS("\t Source \"", source.name, "\" could not be fetched as it is not implemented for this source.", color = BashColor.WARNING)
+                    HttpCache.discard(groupSource.id)
+
+        HttpCache.save()
+        StreamIndex.save()
+        return results
+
+    def getFetchGroups(self, playlistIds: List[str]) -> List[List[Tuple[int, StreamSource]]]:
+        """
+        Get StreamSources to fetch for Playlists, grouped by fetch key (getFetchKey). A StreamSource in several Playlists is the same object in every group member.
+
+        Args:
+            playlistIds (List[str]): IDs of Playlists.
+
+        Returns:
+            List[List[Tuple[int, StreamSource]]]: Groups in order of first appearance, each a list of (index in playlistIds, StreamSource).
+        """
+
+        groups = {}
+        sourcesById = {}
+        for i, playlist in enumerate(self.playlistService.getMany(playlistIds)):
+            if(playlist == None):
+                continue
+
+            for sourceId, source in zip(playlist.streamSourceIds, self.streamSourceService.getMany(playlist.streamSourceIds)):
+                if(source == None):
+                    printS("StreamSource with ID ", sourceId, " could not be found. Consider removing it using the purge or purgeplaylists commands.", color = BashColor.FAIL)
+                    continue
+                
+                if(not source.enableFetch):
                     continue
-            else:
-                fetchedStreams = self.fetchDirectory(source, batchSize, _takeAfter, takeBefore, takeNewOnly)
 
-            if(len(fetchedStreams) > 0):
-                source.lastSuccessfulFetched = getDateTime()
-            
-            lenFetched = len(source.lastFetchedIds)
-            fetchedIds = [_.remoteId for _ in fetchedStreams]
-            source.lastFetchedIds += fetchedIds
-            if(lenFetched > batchSize):
-                source.lastFetchedIds = source.lastFetchedIds[lenFetched - batchSize:]
-            
-            source.lastFetched = getDateTime()
-            updateSuccess = self.streamSourceService.update(source)
-            if(updateSuccess):
-                newStreamsToAdd = fetchedStreams
-                newStreams += self.playlistService.addStreams(playlist.id, newStreamsToAdd)
-                for stream in newStreamsToAdd:
-                    printS("\tAdding \"", stream.name, "\".")
+                source = sourcesById.setdefault(source.id, source)
+                groups.setdefault(self.getFetchKey(source), []).append((i, source))
+
+        return list(groups.values())
+
+    def getFetchKey(self, source: StreamSource) -> Tuple[int, bool, str]:
+        """
+        Get key identifying the remote (or local) content of StreamSource: type, isWeb, and normalized URI.
+
+        Args:
+            source (StreamSource): StreamSource.
+
+        Returns:
+            Tuple[int, bool, str]: Key.
+        """
+
+        uri = (source.uri or "").strip()
+        if(not source.isWeb):
+            return (source.streamSourceTypeId, False, os.path.normcase(os.path.abspath(uri)))
+
+        return (source.streamSourceTypeId, True, UrlService.canonicalize(uri)[2])
+
+    def getFetchGroupSource(self, sources: List[StreamSource]) -> StreamSource:
+        """
+        Get StreamSource to fetch a group of StreamSources with the same fetch key. A single source is fetched as is. For several, a copy of the first is used, which only stops at IDs every source has fetched already, and has a group ID for HttpCache.
+
+        Args:
+            sources (List[StreamSource]): StreamSources in group.
+
+        Returns:
+            StreamSource: StreamSource to fetch.
+        """
+
+        if(len(sources) == 1):
+            return sources[0]
+
+        groupSource = copy.copy(sources[0])
+        groupSource.id = "+".join(sorted(set([_.id for _ in sources])))
+        groupSource.lastFetchedIds = [_ for _ in sources[0].lastFetchedIds if(all([_ in source.lastFetchedIds for source in sources]))]
+        groupSource.seenIds = self.getSeenIds(sources[0]).intersection([self.getSeenIds(_) for _ in sources[1:]]).serialize()
+        groupSource.lastSuccessfulFetched = min([_.lastSuccessfulFetched for _ in sources], key = lambda _: _ if(_ != None) else datetime.min)
+        groupSource.remoteId = next((_.remoteId for _ in sources if(_.remoteId != None)), None)
+        groupSource.remoteIdFailed = max([_.remoteIdFailed for _ in sources if(_.remoteIdFailed != None)], default = None)
+        return groupSource
+
+    def getMemberStreams(self, source: StreamSource, fetchedStreams: List[QueueStream], takeNewOnly: bool) -> List[QueueStream]:
+        """
+        Get copies of QueueStreams fetched for a group for one StreamSource in it. With takeNewOnly, streams are cut at the first stream source has fetched before, like fetching source alone.
+
+        Args:
+            source (StreamSource): StreamSource in group.
+            fetchedStreams (List[QueueStream]): QueueStreams fetched for group.
+            takeNewOnly (bool): Only take streams marked as new.
+
+        Returns:
+            List[QueueStream]: QueueStreams for source.
+        """
+
+        streams = fetchedStreams
+        if(takeNewOnly):
+            # YouTube fetchers return newest first, others oldest first
+            newestFirst = source.streamSourceTypeId == StreamSourceType.YOUTUBE.value
+            ordered = streams if(newestFirst) else list(reversed(streams))
+            seenIds = self.getSeenIds(source)
+            streams = list(takewhile(lambda _: _.remoteId not in seenIds, ordered))
+            streams = streams if(newestFirst) else list(reversed(streams))
+
+        result = []
+        for stream in streams:
+            memberStream = copy.deepcopy(stream)
+            memberStream.streamSourceId = source.id
+            memberStream.backgroundContent = source.backgroundContent
+            result.append(memberStream)
+
+        return result
+
+    def isHostPaused(self, source: StreamSource) -> bool:
+        """
+        Check if the host of a web StreamSource failed repeatedly and should not be fetched from until its circuit breaker closes, see RequestGovernorService.
+
+        Args:
+            source (StreamSource): StreamSource to check.
+
+        Returns:
+            bool: Result.
+        """
+
+        if(not source.isWeb):
+            return False
+
+        host = self.requestGovernorService.getHost(source.uri)
+        if(not self.requestGovernorService.isOpen(host, count = True)):
+            return False
+
+        pausedUntil = datetime.fromtimestamp(self.requestGovernorService.getOpenUntil(host)).strftime("%H:%M")
+        printS("\t Source \"", source.name, "\" skipped, ", host, " failed repeatedly and is paused until ", pausedUntil, ".", color = BashColor.WARNING)
+        return True
+
+    def getSeenIds(self, source: StreamSource) -> SeenSet:
+        """
+        Get IDs already fetched from StreamSource, from seenIds and lastFetchedIds (sources last fetched before seenIds was added), bounded by SEEN_IDS_CAPACITY.
+
+        Args:
+            source (StreamSource): StreamSource.
+
+        Returns:
+            SeenSet: IDs, checked with "id in result".
+        """
+
+        result = SeenSet(self.settings.seenIdsCapacity, source.seenIds)
+        result.addMany(source.lastFetchedIds)
+        return result
+
+    def fetchSourceTimed(self, source: StreamSource, batchSize: int, takeAfter: datetime, takeBefore: datetime, takeNewOnly: bool) -> Tuple[List[QueueStream], float]:
+        """
+        Fetch streams from StreamSource, measuring wall time. Exceptions are printed and counted as a failed fetch.
+
+        Args:
+            source (StreamSource): StreamSource to fetch from.
+            batchSize (int): Number of videos to check at a time.
+            takeAfter (datetime): Limit to take video after.
+            takeBefore (datetime): Limit to take video before.
+            takeNewOnly (bool): Only take streams marked as new.
+
+        Returns:
+            Tuple[List[QueueStream], float]: QueueStreams fetched (None if source is not supported or failed), and seconds spent.
+        """
+
+        started = time.perf_counter()
+        try:
+            fetchedStreams = self.fetchSource(source, batchSize, takeAfter, takeBefore, takeNewOnly)
+        except Exception as e:
+            printS("\t Source \"", source.name, "\" could not be fetched: ", e, color = BashColor.FAIL)
+            fetchedStreams = None
+
+        return fetchedStreams, time.perf_counter() - started
+
+    def fetchSource(self, source: StreamSource, batchSize: int = 10, takeAfter: datetime = None, takeBefore: datetime = None, takeNewOnly: bool = False) -> List[QueueStream]:
+        """
+        Fetch streams from StreamSource, using the fetcher for its StreamSourceType.
+
+        Args:
+            source (StreamSource): StreamSource to fetch from.
+            batchSize (int): Number of videos to check at a time, unrelated to max videos that will be read. Defaults to 10.
+            takeAfter (datetime): Limit to take video after. Defaults to None.
+            takeBefore (datetime): Limit to take video before. Defaults to None.
+            takeNewOnly (bool): Only take streams marked as new. Disables takeAfter and takeBefore-checks. Defaults to False.
+
+        Returns:
+            List[QueueStream] | None: QueueStreams fetched, None if source is not supported.
+        """
+
+        _takeAfter = takeAfter if(not takeNewOnly) else source.lastSuccessfulFetched
+        
+        if(source.isWeb):
+            # if(source.streamSourceTypeId == StreamSourceType.YOUTUBE.value):
+            #     return self.fetchYoutube(source, batchSize, _takeAfter, takeBefore, takeNewOnly)
+            if(source.streamSourceTypeId == StreamSourceType.YOUTUBE.value):
+                printS(f"Fetching videos from {source.name}...")
+                channelId, channelPage = self.getYoutubeChannelId(source, takeNewOnly)
+                if(channelId != None):
+                    fetchedStreams = self.fetchYoutubeFeed(source, channelId, batchSize, _takeAfter, takeBefore, takeNewOnly)
+                    if(fetchedStreams != None):
+                        return fetchedStreams
+
+                printD("YouTube feed for \"", source.name, "\" could not be fetched, using fetchYoutubeHtml.", color = BashColor.WARNING, debug = self.settings.debug)
+                if(_takeAfter != None or takeBefore != None):
+                    printS("Arguments takeAfter and takeBefore are not supported by fetchYoutubeHtml, they will be ignored.", color = BashColor.WARNING)
+
+                return self.fetchYoutubeHtml(source, batchSize, takeNewOnly, channelPage)
+            elif(source.streamSourceTypeId == StreamSourceType.ODYSEE.value):
+                return self.fetchOdysee(source, batchSize, _takeAfter, takeBefore, takeNewOnly)
+            elif(source.streamSourceTypeId == StreamSourceType.RUMBLE.value):
+                return self.fetchRumble(source, batchSize, _takeAfter, takeBefore, takeNewOnly)
             else:
-                printS("Could not update StreamSource \"", source.name, "\" (ID: ", source.id, "), streams could not be added: \n", fetchedStreams, color = BashColor.WARNING)
-                
-            if(source.alwaysDownload):
-                printD("\tDownloading due to alwaysDownload flag on source...")
-                for fetchedStream in fetchedStreams:
-                    downloadPath = self.downloadService.download(fetchedStream.uri, source.name)
-                    printS("\tDownloaded due to alwaysDownload flag on source, path: ", downloadPath, color = BashColor.OKGREEN, doPrint = (downloadPath != None))
-                    printS("\tDownloaded due to alwaysDownload flag on source failed.", color = BashColor.FAIL, doPrint = (downloadPath == None))
-
-        if(len(newStreams) > 0):
-            return len(newStreams)
+                printS("\t Source \"", source.name, "\" could not be fetched as it is not implemented for this source.", color = BashColor.WARNING)
+                return None
+        else:
+            return self.fetchDirectory(source, batchSize, _takeAfter, takeBefore, takeNewOnly)
+
+    def getSourceResponse(self, streamSource: StreamSource, url: str, takeNewOnly: bool, stream: bool = False):
+        """
+        Get url for streamSource. When only new streams are wanted, the request is conditional on validators in HttpCache, see HttpCache.isNotModified.
+
+        Args:
+            streamSource (StreamSource): StreamSource being fetched.
+            url (str): URL to get.
+            takeNewOnly (bool): Only take streams marked as new.
+            stream (bool): Should defer reading the body. Defaults to False.
+
+        Returns:
+            requests.Response: Response.
+        """
+
+        cacheKey = HttpCache.getKey(streamSource.id, url) if(takeNewOnly and streamSource.id != None) else None
+        return self.httpService.get(url, stream = stream, cacheKey = cacheKey)
+
+    def applyFetched(self, playlistId: str, source: StreamSource, fetchedStreams: List[QueueStream], batchSize: int) -> Tuple[List[QueueStream], bool]:
+        """
+        Update fetch status of StreamSource and add fetched QueueStreams to Playlist.
+
+        Args:
+            playlistId (str): ID of Playlist to add to.
+            source (StreamSource): StreamSource the QueueStreams were fetched from.
+            fetchedStreams (List[QueueStream]): QueueStreams fetched.
+            batchSize (int): Number of videos checked at a time, number of recent IDs kept in lastFetchedIds.
+
+        Returns:
+            Tuple[List[QueueStream], bool]: QueueStreams added, and if StreamSource was updated.
+        """
+
+        added = []
+        if(len(fetchedStreams) > 0):
+            source.lastSuccessfulFetched = getDateTime()
+        
+        # YouTube fetchers return newest first, others oldest first
+        fetchedIds = [_.remoteId for _ in fetchedStreams if(_.remoteId != None)]
+        fetchedIds = list(reversed(fetchedIds)) if(source.streamSourceTypeId == StreamSourceType.YOUTUBE.value) else fetchedIds
+        seenIds = self.getSeenIds(source)
+        seenIds.addMany(fetchedIds)
+        source.seenIds = seenIds.serialize()
+        source.lastFetchedIds = (source.lastFetchedIds + fetchedIds)[-batchSize:]
+        
+        source.lastFetched = getDateTime()
+        updateSuccess = self.streamSourceService.update(source)
+        if(updateSuccess):
+            newStreamsToAdd = self.getNewStreams(playlistId, fetchedStreams)
+            if(len(newStreamsToAdd) > 0):
+                added = self.playlistService.addStreams(playlistId, newStreamsToAdd)
+
+            for stream in newStreamsToAdd:
+                printS("\tAdding \"", stream.name, "\".")
         else:
-            return 0
+            printS("Could not update StreamSource \"", source.name, "\" (ID: ", source.id, "), streams could not be added: \n", fetchedStreams, color = BashColor.WARNING)
+            
+        if(source.alwaysDownload):
+            printD("\tQueueing downloads due to alwaysDownload flag on source...")
+            playlist = self.playlistService.get(playlistId)
+            priorities = self.downloadJobService.getPriorities(playlist) if(playlist != None) else {}
+            for addedStream in added:
+                job = self.downloadJobService.enqueue(addedStream.uri, source.name, priority = priorities.get(addedStream.id, 0), queueStreamId = addedStream.id, playlistId = playlistId)
+                if(job != None and job.stateId == DownloadJobState.QUEUED.value):
+                    self.downloadJobService.start(job).add_done_callback(self.printAlwaysDownloadResult)
+
+        return added, updateSuccess != None
+
+    def printAlwaysDownloadResult(self, future: Future) -> None:
+        """
+        Print result of a download queued due to alwaysDownload flag on source. Used as callback of DownloadJobService.start.
+
+        Args:
+            future (Future): Future of download.
+        """
+
+        downloadPath = future.result() if(future.exception() == None) else None
+        printS("\tDownloaded due to alwaysDownload flag on source, path: ", downloadPath, color = BashColor.OKGREEN, doPrint = (downloadPath != None))
+        printS("\tDownloaded due to alwaysDownload flag on source failed.", color = BashColor.FAIL, doPrint = (downloadPath == None))
+
+    def getNewStreams(self, playlistId: str, fetchedStreams: List[QueueStream]) -> List[QueueStream]:
+        """
+        Get fetched QueueStreams not already in Playlist, see PlaylistService.isDuplicate. QueueStreams already in other Playlists are still new to this one.
+
+        Args:
+            playlistId (str): ID of Playlist to add to.
+            fetchedStreams (List[QueueStream]): QueueStreams fetched.
+
+        Returns:
+            List[QueueStream]: QueueStreams to add.
+        """
+
+        playlist = self.playlistService.get(playlistId)
+        if(playlist == None or playlist.allowDuplicates or len(fetchedStreams) == 0):
+            return fetchedStreams
+
+        result = []
+        playlistStreamIds = set(playlist.streamIds)
+        for stream in fetchedStreams:
+            if(self.playlistService.isDuplicate(playlist, stream, playlistStreamIds)):
+                printD("\t\"", stream.name, "\" is already in Playlist \"", playlist.name, "\", skipped.", debug = self.settings.debug)
+                continue
+
+            otherPlaylistIds = set([_ for id in StreamIndex.find(stream) for _ in StreamIndex.getPlaylistIds(id) if(_ != playlistId)])
+            if(len(otherPlaylistIds) > 0):
+                printD("\t\"", stream.name, "\" is also in ", len(otherPlaylistIds), " other Playlist(s).", debug = self.settings.debug)
+
+            result.append(stream)
+
+        return result
 
     def fetchDirectory(self, streamSource: StreamSource, batchSize: int = 10, takeAfter: datetime = None, takeBefore: datetime = None, takeNewOnly: bool = False) -> List[QueueStream]:
         """
@@ -181,17 +531,18 @@ class FetchService():
 
         newStreams = []
         newQueueStreams = []
+        seenIds = self.getSeenIds(streamSource)
         streams = List(channel.videos)
         lastStreamId = streams[0].video_id
-        if(takeNewOnly and takeAfter == None and lastStreamId in streamSource.lastFetchedIds):
+        if(takeNewOnly and takeAfter == None and lastStreamId in seenIds):
             printD("Last video fetched: \"", sanitize(streams[0].title), "\", YouTube ID \"", lastStreamId, "\"", color = BashColor.WARNING, debug = self.settings.debug)
-            printD("Return due to takeNewOnly and takeAfter == None and lastStreamId in streamSource.lastFetchedIds", color = BashColor.WARNING, debug = self.settings.debug)
+            printD("Return due to takeNewOnly and takeAfter == None and lastStreamId in seenIds", color = BashColor.WARNING, debug = self.settings.debug)
             return emptyReturn
             
         for i, stream in enumerate(streams):
-            if(takeNewOnly and stream.video_id in streamSource.lastFetchedIds):
+            if(takeNewOnly and stream.video_id in seenIds):
                 printD("Name \"", sanitize(stream.title), "\", YouTube ID \"", stream.video_id, "\"", color = BashColor.WARNING, debug = self.settings.debug)
-                printD("Break due to takeNewOnly and stream.video_id in streamSource.lastFetchedIds", color = BashColor.WARNING, debug = self.settings.debug)
+                printD("Break due to takeNewOnly and stream.video_id in seenIds", color = BashColor.WARNING, debug = self.settings.debug)
                 break
             elif(not takeNewOnly and takeAfter != None and stream.publish_date < takeAfter):
                 printD("Break due to not takeNewOnly and takeAfter != None and stream.publish_date < takeAfter", color = BashColor.WARNING, debug = self.settings.debug)
@@ -224,7 +575,64 @@ class FetchService():
         
         return newQueueStreams
 
-    def fetchYoutubeHtml(self, streamSource: StreamSource, batchSize: int = 10, takeNewOnly: bool = False) -> List[QueueStream]:
+    def fetchYoutubeFeed(self, streamSource: StreamSource, channelId: str, batchSize: int = 10, takeAfter: datetime = None, takeBefore: datetime = None, takeNewOnly: bool = False) -> List[QueueStream]:
+        """
+        Fetch videos from the YouTube channel feed (feeds/videos.xml), a few KB with publish dates, unlike the channel page.
+
+        Args:
+            channelId (str): YouTube channel ID of streamSource, see getYoutubeChannelId.
+            batchSize (int): Number of videos to check at a time, unrelated to max videos that will be read. Defaults to 10.
+            takeAfter (datetime): Limit to take video after. Defaults to None.
+            takeBefore (datetime): Limit to take video before. Defaults to None.
+            takeNewOnly (bool): Only take streams marked as new. Disables takeAfter and takeBefore-checks. To use takeAfter and/or takeBefore, set this to False. Defaults to False.
+
+        Returns:
+            List[QueueStream] | None: List of QueueStream, None if the feed could not be fetched, use fetchYoutubeHtml instead.
+        """
+
+        if(streamSource == None):
+            raise ArgumentException("fetchYoutubeFeed - streamSource was None.")
+
+        feedUri = f"https://www.youtube.com/feeds/videos.xml?channel_id={channelId}"
+        # entry -> yt:video:<videoId>
+        return self.fetchFeed(streamSource, feedUri, batchSize, takeAfter, takeBefore, takeNewOnly, lambda item: item.guid.split(":")[-1])
+
+    def getYoutubeChannelId(self, streamSource: StreamSource, takeNewOnly: bool = False) -> Tuple[str, requests.Response]:
+        """
+        Get YouTube channel ID of streamSource. Resolved from the URL, or from the channel page for handles (/@name, /c/name, /user/name), only once: the ID is cached in streamSource.remoteId, which is saved with the StreamSource after fetch. If the channel page has no ID, the time is saved in streamSource.remoteIdFailed and the page is not looked up again for channelIdRetryInterval seconds.
+
+        Args:
+            streamSource (StreamSource): YouTube StreamSource.
+            takeNewOnly (bool): Only take streams marked as new, the channel page is requested as in getSourceResponse. Defaults to False.
+
+        Returns:
+            Tuple[str, requests.Response]: Tuple of (channel ID, None if it could not be resolved; channel page if it was fetched, to give fetchYoutubeHtml, else None).
+        """
+
+        if(streamSource.remoteId != None):
+            return streamSource.remoteId, None
+
+        channelId = self.parseService.getYoutubeChannelIdFromUri(streamSource.uri)
+        if(channelId != None):
+            streamSource.remoteId = channelId
+            return channelId, None
+
+        if(streamSource.remoteIdFailed != None and time.time() - streamSource.remoteIdFailed < self.channelIdRetryInterval):
+            return None, None
+
+        httpRequest = None
+        try:
+            httpRequest = self.getSourceResponse(streamSource, streamSource.uri, takeNewOnly)
+            if(httpRequest.status_code == 200 and not self.parseService.isYoutubeConsentPage(httpRequest.content)):
+                channelId = self.parseService.getYoutubeChannelIdFromPage(httpRequest.content)
+                streamSource.remoteIdFailed = time.time() if(channelId == None) else None
+        except Exception as e:
+            printD("Channel ID of \"", streamSource.name, "\" could not be resolved: ", e, color = BashColor.WARNING, debug = self.settings.debug)
+
+        streamSource.remoteId = channelId
+        return channelId, httpRequest
+
+    def fetchYoutubeHtml(self, streamSource: StreamSource, batchSize: int = 10, takeNewOnly: bool = False, response: requests.Response = None) -> List[QueueStream]:
         """
         Fetch videos from YouTube using a scraper to get HTML.
 
@@ -233,6 +641,7 @@ class FetchService():
         Args:
             batchSize (int): Number of videos to check at a time, unrelated to max videos that will be read. Defaults to 10.
             takeNewOnly (bool): Only take streams marked as new. Disables takeAfter and takeBefore-checks. To use takeAfter and/or takeBefore, set this to False. Defaults to False.
+            response (requests.Response): Channel page already fetched with getSourceResponse, to not fetch it again. Defaults to None.
 
         Returns:
             List[QueueStream]: List of QueueStream
@@ -243,72 +652,50 @@ class FetchService():
 
         emptyReturn = []
         requestUrl = streamSource.uri
-        httpRequest = requests.get(requestUrl)
-        br = mechanize.Browser()
-        document = None
 
-        if(httpRequest.status_code != 200):
-            printS("Channel \"", streamSource.name, "\" (URL: ", streamSource.uri, ") could not be fetched, the connection likely timed out. Try again later", color = BashColor.WARNING)
+        httpRequest = response
+        if(httpRequest == None):
+            try:
+                httpRequest = self.getSourceResponse(streamSource, requestUrl, takeNewOnly)
+            except Exception:
+                httpRequest = None
+
+        if(HttpCache.isNotModified(streamSource.id)):
+            printD("Channel \"", streamSource.name, "\" has not changed since last fetch.", debug = self.settings.debug)
             return emptyReturn
 
-        try:
-            br.open(requestUrl)
-            html = br.response().read()
-            document = BeautifulSoup(html, 'html.parser')
-        except:
-            printS("Channel \"", streamSource.name, "\" (URL: ", streamSource.uri, ") could not be found or is not valid. Please remove it and add it back.", color = BashColor.FAIL)
+        if(httpRequest == None or httpRequest.status_code != 200):
+            printS("Channel \"", streamSource.name, "\" (URL: ", streamSource.uri, ") could not be fetched, the connection likely timed out. Try again later", color = BashColor.WARNING)
             return emptyReturn
 
+        html = httpRequest.content
+
         # Privacy statement, can't continue
-        if(document.find_all("form", {"action": "https://consent.youtube.com/save"})):
+        if(self.parseService.isYoutubeConsentPage(html)):
             printS("Google/YouTube wants to use cookies and trackers. This was not an expected outcome.", color = BashColor.WARNING)
             return emptyReturn
 
-        printS(f"Fetching videos from {streamSource.name}...")
-        streams = None
-        videosScript = document.find(lambda tag:tag.name=="script" and "ytInitialData" in tag.text).text
-        
-        # scripts -> var ytInitialData = {} -> videoRenderer -> videoId / title.runs[0].text
-        videoRenderer = parse("contents..videoRenderer")
-        videoId = parse("contents..videoRenderer.videoId")
-        title = parse("contents..title.runs[0].text")
-        # length = parse("ytp-time-duration")
-        try:
-            videosScriptJson = videosScript.split("ytInitialData = ")[1].split(";")[0]
-            videosJson = json.loads(videosScriptJson)
-            jsonMatches = videoRenderer.find(videosJson)
-            streams = [_.value for _ in jsonMatches][0:batchSize]
-        except:
+        # scripts -> var ytInitialData = {} -> videoRenderer -> videoId / title / lengthText / publishedTimeText
+        videosJson = self.parseService.extractYtInitialData(html)
+        if(videosJson == None):
+            printD("ytInitialData not found in raw page, parsing full document.", color = BashColor.WARNING, debug = self.settings.debug)
+            try:
+                videosJson = self.parseService.extractYtInitialDataFromDocument(html)
+            except:
+                printS("Channel \"", streamSource.name, "\" (URL: ", streamSource.uri, ") could not be found or is not valid. Please remove it and add it back.", color = BashColor.FAIL)
+                return emptyReturn
+
+        if(videosJson == None):
             printS(f"Could not find any videos for channel {streamSource.name}.", color = BashColor.WARNING)
             return emptyReturn
 
-        if(len(streams) < 1):
-            printS(f"Channel {streamSource.name} has no videos.", color = BashColor.FAIL)
-            return emptyReturn
-
         newStreams = []
-        lastStreamId = videoId.find(videosJson)[0].value
-        if(takeNewOnly and lastStreamId in streamSource.lastFetchedIds):
-            lastStreamTitle = sanitize(title.find(videosJson)[0].value)
-            printD("Last video fetched: \"", lastStreamTitle, "\", YouTube ID \"", lastStreamId, "\"", color = BashColor.WARNING, debug = self.settings.debug)
-            printD("Return due to takeNewOnly and takeAfter == None and lastStreamId in streamSource.lastFetchedIds", color = BashColor.WARNING, debug = self.settings.debug)
-            return emptyReturn
-        
-        for i, stream in enumerate(streams):
-            id = videoId.find(videosJson)[i].value
-            sanitizedTitle = sanitize(title.find(videosJson)[i].value)
+        stopIds = self.getSeenIds(streamSource) if(takeNewOnly) else None
+        for id, sanitizedTitle, length, published in islice(self.parseService.iterYoutubeVideos(videosJson, stopIds), batchSize):
             link = "https://www.youtube.com/watch?v=" + id
-            
-            if(takeNewOnly and id in streamSource.lastFetchedIds):
-                printD("Name \"", sanitizedTitle, "\", YouTube ID \"", id, "\"", color = BashColor.WARNING, debug = self.settings.debug)
-                printD("Break due to takeNewOnly and id in streamSource.lastFetchedIds", color = BashColor.WARNING, debug = self.settings.debug)
-                break
-            elif(i > batchSize):
-                printD("Beak due to i > batchSize", color = BashColor.WARNING, debug = self.settings.debug)
-                break
-
+            playtimeSeconds = self.timestampToSeconds(length) if(length != None and length.replace(":", "").isdigit()) else None
             queueStream = QueueStream(name = sanitizedTitle, 
-                # playtimeSeconds = length,
+                playtimeSeconds = playtimeSeconds,
                 uri = link, 
                 isWeb = True,
                 streamSourceId = streamSource.id,
@@ -319,6 +706,11 @@ class FetchService():
             
             newStreams.append(queueStream)
 
+        if(len(newStreams) == 0 and takeNewOnly):
+            printD("No videos newer than seen IDs for channel ", streamSource.name, color = BashColor.WARNING, debug = self.settings.debug)
+        elif(len(newStreams) == 0):
+            printS(f"Channel {streamSource.name} has no videos.", color = BashColor.FAIL)
+
         return newStreams
     
     def fetchOdysee(self, streamSource: StreamSource, batchSize: int = 10, takeAfter: datetime = None, takeBefore: datetime = None, takeNewOnly: bool = False) -> List[QueueStream]:
@@ -341,68 +733,85 @@ class FetchService():
         emptyReturn = []
         channelName = "".join(["@", streamSource.uri.split("@")[-1]])
         rssUri = f"https://odysee.com/$/rss/{channelName}"
-        rssRequest = requests.get(rssUri)
-        xml = rssRequest.content
-        document = None
-        
-        if(rssRequest.status_code != 200): # TODO code might be 200 with empty content or "oops nothing here". Test when Odysee is down next and update this
-            printS("Channel \"", streamSource.name, "\" (URL: ", streamSource.uri, ") could not be fetched, the connection likely timed out. Try again later", color = BashColor.FAIL)
-            return emptyReturn
-        
-        try:
-            document = parseString(xml)
-        except:
-            printS("Channel \"", streamSource.name, "\" (URL: ", streamSource.uri, ") could not be found or is not valid. Please remove it and add it back.", color = BashColor.FAIL)
-            return emptyReturn
-
-        streams = document.getElementsByTagName("item")
         printS(f"Fetching videos from {streamSource.name}...")
-        if(len(streams) < 1):
-            printS(f"Channel {streamSource.name} has no videos.", color = BashColor.FAIL)
+        newStreams = self.fetchFeed(streamSource, rssUri, batchSize, takeAfter, takeBefore, takeNewOnly, lambda item: item.link.split(":")[-1])
+        if(newStreams == None): # TODO code might be 200 with empty content or "oops nothing here". Test when Odysee is down next and update this
+            printS("Channel \"", streamSource.name, "\" (URL: ", streamSource.uri, ") could not be fetched or is not valid. Try again later, or remove it and add it back.", color = BashColor.FAIL)
             return emptyReturn
 
-        newStreams = []
-        lastStreamTitle = sanitize(streams[0].getElementsByTagName("title")[0].firstChild.nodeValue)
-        lastStreamId = streams[0].getElementsByTagName("link")[0].firstChild.nodeValue.split(":")[-1]
-        if(takeNewOnly and takeAfter == None and lastStreamId in streamSource.lastFetchedIds):
-            printD("Last video fetched: \"", lastStreamTitle, "\", Odysee ID \"", lastStreamId, "\"", color = BashColor.WARNING, debug = self.settings.debug)
-            printD("Return due to takeNewOnly and takeAfter == None and lastStreamId in streamSource.lastFetchedIds", color = BashColor.WARNING, debug = self.settings.debug)
-            return emptyReturn
-        
-        for i, stream in enumerate(streams):
-            title = sanitize(stream.getElementsByTagName("title")[0].firstChild.nodeValue)
-            pubDateRaw = stream.getElementsByTagName("pubDate")[0].firstChild.nodeValue
-            pubDate = stringToDatetime(pubDateRaw, "%a, %d %b %Y %H:%M:%S %Z") #Mon, 07 Jun 2021 04:57:59 GMT
-            link = stream.getElementsByTagName("link")[0].firstChild.nodeValue
-            videoGuid = link.split(":")[-1]
+        newStreams.reverse()
             
-            if(takeNewOnly and videoGuid in streamSource.lastFetchedIds):
-                printD("Name \"", title, "\", Odysee ID \"", videoGuid, "\"", color = BashColor.WARNING, debug = self.settings.debug)
-                printD("Break due to takeNewOnly and videoGuid in streamSource.lastFetchedIds", color = BashColor.WARNING, debug = self.settings.debug)
-                break
-            elif(not takeNewOnly and takeAfter != None and pubDate < takeAfter):
-                printD("Break due to not takeNewOnly and takeAfter != None and pubDate < takeAfter", color = BashColor.WARNING, debug = self.settings.debug)
-                break
-            elif(not takeNewOnly and takeBefore != None and pubDate > takeBefore):
-                printD("Continue due to not takeNewOnly and takeBefore != None and pubDate > takeBefore", color = BashColor.WARNING, debug = self.settings.debug)
-                continue
-            elif(i > batchSize):
-                printD("Beak due to i > batchSize", color = BashColor.WARNING, debug = self.settings.debug)
-                break
+        return newStreams
+    
+    def fetchFeed(self, streamSource: StreamSource, feedUri: str, batchSize: int, takeAfter: datetime, takeBefore: datetime, takeNewOnly: bool, getRemoteId: Callable[[FeedItem], str]) -> List[QueueStream]:
+        """
+        Fetch videos from an RSS or Atom feed. The feed is downloaded and parsed incrementally, and reading stops at the first video already fetched (takeNewOnly) or published before takeAfter, so the rest of the feed is never read.
 
-            queueStream = QueueStream(name = title, 
-                uri = link, 
-                isWeb = True,
-                streamSourceId = streamSource.id,
-                watched = None,
-                backgroundContent = streamSource.backgroundContent,
-                added = getDateTime(),
-                remoteId = videoGuid)
-            
-            newStreams.append(queueStream)
+        Args:
+            streamSource (StreamSource): StreamSource the feed belongs to.
+            feedUri (str): URL of feed.
+            batchSize (int): Number of videos to check at a time, unrelated to max videos that will be read.
+            takeAfter (datetime): Limit to take video after.
+            takeBefore (datetime): Limit to take video before.
+            takeNewOnly (bool): Only take streams marked as new. Disables takeAfter and takeBefore-checks.
+            getRemoteId (Callable[[FeedItem], str]): Function getting the ID used in lastFetchedIds and seenIds from an item.
+
+        Returns:
+            List[QueueStream] | None: QueueStreams in feed order, None if the feed could not be fetched or parsed.
+        """
+
+        try:
+            response = self.getSourceResponse(streamSource, feedUri, takeNewOnly, stream = True)
+        except Exception as e:
+            printD("Feed ", feedUri, " could not be fetched: ", e, color = BashColor.WARNING, debug = self.settings.debug)
+            return None
+
+        newStreams = []
+        seenIds = self.getSeenIds(streamSource)
+        with response:
+            if(HttpCache.isNotModified(streamSource.id)):
+                printD("Feed ", feedUri, " has not changed since last fetch.", debug = self.settings.debug)
+                return newStreams
+
+            if(response.status_code != 200):
+                printD("Feed ", feedUri, " returned status code ", response.status_code, color = BashColor.WARNING, debug = self.settings.debug)
+                return None
+
+            try:
+                for i, item in enumerate(self.parseService.iterFeedItems(self.httpService.iterContent(response, 16 * 1024))):
+                    title = sanitize(item.title or "")
+                    remoteId = getRemoteId(item)
                     
-        newStreams.reverse()
-            
+                    if(takeNewOnly and remoteId in seenIds):
+                        printD("Name \"", title, "\", ID \"", remoteId, "\"", color = BashColor.WARNING, debug = self.settings.debug)
+                        printD("Break due to takeNewOnly and remoteId in seenIds", color = BashColor.WARNING, debug = self.settings.debug)
+                        break
+                    elif(not takeNewOnly and takeAfter != None and item.published != None and item.published < takeAfter):
+                        printD("Break due to not takeNewOnly and takeAfter != None and published < takeAfter", color = BashColor.WARNING, debug = self.settings.debug)
+                        break
+                    elif(not takeNewOnly and takeBefore != None and item.published != None and item.published > takeBefore):
+                        printD("Continue due to not takeNewOnly and takeBefore != None and published > takeBefore", color = BashColor.WARNING, debug = self.settings.debug)
+                        continue
+                    elif(i > batchSize):
+                        printD("Beak due to i > batchSize", color = BashColor.WARNING, debug = self.settings.debug)
+                        break
+
+                    playtimeSeconds = self.timestampToSeconds(item.duration) if(item.duration != None and item.duration.replace(":", "").isdigit()) else None
+                    queueStream = QueueStream(name = title, 
+                        uri = item.link, 
+                        isWeb = True,
+                        streamSourceId = streamSource.id,
+                        watched = None,
+                        backgroundContent = streamSource.backgroundContent,
+                        playtimeSeconds = playtimeSeconds,
+                        added = getDateTime(),
+                        remoteId = remoteId)
+                    
+                    newStreams.append(queueStream)
+            except ParseError as e:
+                printD("Feed ", feedUri, " is not valid: ", e, color = BashColor.WARNING, debug = self.settings.debug)
+                return None
+
         return newStreams
     
     def fetchRumble(self, streamSource: StreamSource, batchSize: int = 10, takeAfter: datetime = None, takeBefore: datetime = None, takeNewOnly: bool = False) -> List[QueueStream]:
@@ -424,20 +833,22 @@ class FetchService():
         
         emptyReturn = []
         requestUrl = streamSource.uri
-        br = mechanize.Browser()
-        document = None
+        entries = None
 
         try:
-            br.open(requestUrl)
-            html = br.response().read()
-            document = BeautifulSoup(html, 'html.parser')
+            httpRequest = self.getSourceResponse(streamSource, requestUrl, takeNewOnly)
+            httpRequest.raise_for_status()
+            if(HttpCache.isNotModified(streamSource.id)):
+                printD("Channel \"", streamSource.name, "\" has not changed since last fetch.", debug = self.settings.debug)
+                return emptyReturn
+
+            # video-listing-entry -> video-item--a -> href + video-item--duration / video-item--info -> video-item--title
+            entries = self.parseService.getRumbleListingEntries(httpRequest.content)
         except:
             printS("Channel \"", streamSource.name, "\" (URL: ", streamSource.uri, ") could not be found or is not valid. Please remove it and add it back.", color = BashColor.FAIL)
             return emptyReturn
 
-        # video-listing-entry -> video-item--a -> href + video-item--duration / video-item--info -> video-item--title
         printS(f"Fetching videos from {streamSource.name}...")
-        entries = document.select(".video-listing-entry")
         if(len(entries) == 0):
             printS(f"Could not find any videos for channel {streamSource.name}.", color = BashColor.WARNING)
             return emptyReturn
@@ -447,13 +858,14 @@ class FetchService():
             return emptyReturn
 
         newStreams = []
+        seenIds = self.getSeenIds(streamSource)
         lastStream = entries[0]
         lastStreamId = lastStream.select_one(".video-item--a")["href"]
-        if(takeNewOnly and lastStreamId in streamSource.lastFetchedIds):
+        if(takeNewOnly and lastStreamId in seenIds):
             title = lastStream.find("h3", {"class": "video-item--title"}).text
             sanitizedTitle = sanitize(title)
             printD("Last video fetched: \"", sanitizedTitle, "\", YouTube ID \"", lastStreamId, "\"", color = BashColor.WARNING, debug = self.settings.debug)
-            printD("Return due to takeNewOnly and takeAfter == None and lastStreamId in streamSource.lastFetchedIds", color = BashColor.WARNING, debug = self.settings.debug)
+            printD("Return due to takeNewOnly and takeAfter == None and lastStreamId in seenIds", color = BashColor.WARNING, debug = self.settings.debug)
             return emptyReturn
                 
         entries.reverse()
@@ -465,9 +877,9 @@ class FetchService():
             playtimeSeconds = self.timestampToSeconds(playtime)
             link = "https://rumble.com" + id
             
-            if(takeNewOnly and id in streamSource.lastFetchedIds):
+            if(takeNewOnly and id in seenIds):
                 printD("Name \"", sanitizedTitle, "\", Rumble ID \"", id, "\"", color = BashColor.WARNING, debug = self.settings.debug)
-                printD("Break due to takeNewOnly and id in streamSource.lastFetchedIds", color = BashColor.WARNING, debug = self.settings.debug)
+                printD("Break due to takeNewOnly and id in seenIds", color = BashColor.WARNING, debug = self.settings.debug)
                 break
             elif(i > batchSize):
                 printD("Beak due to i > batchSize", color = BashColor.WARNING, debug = self.settings.debug)
@@ -499,12 +911,14 @@ class FetchService():
         """
         
         result = 0
+        self.playlistService.loadStreamIndex()
         for playlistId in playlistIds:            
             playlist = self.playlistService.get(playlistId)
             deleteUpdateResult = True
             
             for queueStreamId in playlist.streamIds:
                 deleteStreamResult = self.queueStreamService.delete(queueStreamId)
+                StreamIndex.removeMembership(queueStreamId, playlist.id)
                 deleteUpdateResult = deleteUpdateResult and deleteStreamResult != None
             
             playlist.streamIds = []
@@ -514,12 +928,14 @@ class FetchService():
             for streamSourceId in playlist.streamSourceIds:
                 streamSource = self.streamSourceService.get(streamSourceId)
                 streamSource.lastFetched = None
+                HttpCache.removeSource(streamSource.id)
                 updateStreamResult = self.streamSourceService.update(streamSource)
                 deleteUpdateResult = deleteUpdateResult and updateStreamResult != None
             
             if(deleteUpdateResult):
                 result += 1
                 
+        HttpCache.save()
         return result
     
     def prepareReset(self, playlistId: str, includeSoftDeleted: bool = False, permanentlyDelete: bool = False) -> PlaylistDetailed:
@@ -570,10 +986,13 @@ class FetchService():
             entity = self.streamSourceService.get(id, includeSoftDeleted)
             entity.lastFetched = None
             entity.lastFetchedIds = []
+            entity.seenIds = None
+            HttpCache.removeSource(entity.id)
             updateResult = self.streamSourceService.update(entity)
             if(not updateResult):
                 raise DatabaseException(f"doReset - failed to update StreamSource {entity.name} with id {entity.id}.")
         
+        HttpCache.save()
         return self.playlistService.get(playlist.id, includeSoftDeleted)   
 
     def timestampToSeconds(self, timestamp: str) -> int:
@@ -0,0 +1,335 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from model.DownloadResult import DownloadResult
+from repositories.HttpCache import HttpCache
+from services.RequestGovernorService import RequestGovernorService
+from Settings import Settings
+
+
+class HttpService():
+    """
+    Pooled HTTP client shared by all fetchers and downloaders. One requests.Session per process keeps connections (and TLS sessions) alive per host, sends the same User-Agent, and applies connect/read timeouts from settings.
+    """
+
+    userAgent: str = "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0"
+    session: requests.Session = None
+    sessionLock: threading.Lock = threading.Lock()
+    statsLock: threading.Lock = threading.Lock()
+    requestCount: int = 0
+    byteCount: int = 0
+    requestGovernorService: RequestGovernorService = None
+    settings: Settings = None
+
+    def __init__(self):
+        self.requestGovernorService = RequestGovernorService()
+        self.settings = Settings()
+
+    def getSession(self) -> requests.Session:
+        """
+        Get the process-wide session, creating it with connection pools sized by HTTP_POOL_SIZE if needed.
+
+        Returns:
+            requests.Session: Shared session.
+        """
+
+        with HttpService.sessionLock:
+            if(HttpService.session == None):
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections = self.settings.httpPoolSize, pool_maxsize = self.settings.httpPoolSize)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"User-Agent": HttpService.userAgent})
+                HttpService.session = session
+
+            return HttpService.session
+
+    def get(self, url: str, stream: bool = False, headers: Dict[str, str] = None, cacheKey: str = None) -> requests.Response:
+        """
+        Send a GET request using the shared session. The body is read once and kept on the response, unless stream is True. Requests are limited and retried by RequestGovernorService.
+
+        Args:
+            url (str): URL to get.
+            stream (bool): Should defer reading the body, for large downloads. Use iterContent to read it. Defaults to False.
+            headers (Dict[str, str]): Additional headers. Defaults to None.
+            cacheKey (str): Key in HttpCache (HttpCache.getKey). If set, the request is conditional on cached validators, and validators of the response are staged in HttpCache. Use HttpCache.isNotModified to check the result. Defaults to None.
+
+        Returns:
+            requests.Response: Response, which may be 429 or 5xx if retries ran out.
+
+        Raises:
+            requests.exceptions.ConnectionError: Host did not answer after retries, or its circuit breaker is open.
+            requests.exceptions.Timeout: Host timed out after retries.
+        """
+
+        _headers = dict(headers) if(headers != None) else {}
+        if(cacheKey != None):
+            _headers.update(HttpCache.getConditionalHeaders(cacheKey))
+
+        host = self.requestGovernorService.getHost(url)
+        if(self.requestGovernorService.isOpen(host)):
+            raise requests.exceptions.ConnectionError(f"{host} failed repeatedly, requests are paused until {datetime.fromtimestamp(self.requestGovernorService.getOpenUntil(host)).strftime('%H:%M')}.")
+
+        attempt = 0
+        while(True):
+            self.requestGovernorService.acquire(host)
+            try:
+                response = self.getSession().get(url, headers = _headers, stream = stream, timeout = (self.settings.httpConnectTimeout, self.settings.httpReadTimeout))
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                HttpService.count(0)
+                if(attempt >= self.settings.httpRetries):
+                    self.requestGovernorService.recordFailure(host)
+                    raise
+
+                time.sleep(self.requestGovernorService.getBackoff(attempt))
+                self.requestGovernorService.countRetry()
+                attempt += 1
+                continue
+
+            if(self.requestGovernorService.isRetryable(response.status_code) and attempt < self.settings.httpRetries):
+                HttpService.count(0)
+                response.close()
+                time.sleep(self.requestGovernorService.getBackoff(attempt, response.headers.get("Retry-After")))
+                self.requestGovernorService.countRetry()
+                attempt += 1
+                continue
+
+            break
+
+        if(self.requestGovernorService.isRetryable(response.status_code)):
+            self.requestGovernorService.recordFailure(host)
+        else:
+            self.requestGovernorService.recordSuccess(host)
+
+        HttpService.count(0 if(stream) else len(response.content))
+        if(cacheKey != None and response.status_code in [200, 304]):
+            self.stageValidators(cacheKey, response, stream)
+
+        return response
+
+    def stageValidators(self, cacheKey: str, response: requests.Response, stream: bool) -> None:
+        """
+        Stage ETag, Last-Modified and body hash of response in HttpCache. A response is not modified if it was 304, or if the body hash equals the cached one.
+
+        Args:
+            cacheKey (str): Key in HttpCache.
+            response (requests.Response): Response.
+            stream (bool): Response was streamed, body is not read and can not be hashed.
+        """
+
+        notModified = response.status_code == 304
+        bodyHash = None
+        if(not notModified and not stream):
+            bodyHash = hashlib.sha256(response.content).hexdigest()
+            notModified = bodyHash == HttpCache.getBodyHash(cacheKey)
+
+        HttpCache.stage(cacheKey, response.headers.get("ETag"), response.headers.get("Last-Modified"), bodyHash, notModified)
+
+    def iterContent(self, response: requests.Response, chunkSize: int = 1024 * 1024):
+        """
+        Iterate over body of a streamed response, counting bytes read.
+
+        Args:
+            response (requests.Response): Response from get with stream = True.
+            chunkSize (int): Bytes per chunk. Defaults to 1 MiB.
+
+        Returns:
+            Iterator[bytes]: Chunks of body.
+        """
+
+        for chunk in response.iter_content(chunk_size = chunkSize):
+            HttpService.count(len(chunk), 0)
+            yield chunk
+
+    def downloadFile(self, url: str, path: str, partKey: str = None, expectedSize: int = None) -> DownloadResult:
+        """
+        Download URL to file in path, in chunks of DOWNLOAD_CHUNK_SIZE to a .part file next to it, which is renamed to path when complete and verified. Transfers that fail midway are resumed with Range requests, also by later calls with the same partKey, for example after a restart. If-Range makes sure the resumed bytes are from the same file, the server sends all of it otherwise.
+
+        Args:
+            url (str): URL to download.
+            path (str): Absolute path of file to write.
+            partKey (str): Key identifying the download between calls, when url changes between them (like signed URLs). Defaults to None, which uses url.
+            expectedSize (int): Size of file in bytes, if known beforehand. Defaults to None.
+
+        Returns:
+            DownloadResult: Path, bytes transferred, time and number of resumes.
+
+        Raises:
+            requests.exceptions.HTTPError: Host answered with an error.
+            requests.exceptions.RequestException: Transfer failed more than HTTP_RETRIES times in a row without progress.
+            IOError: Downloaded file does not have the expected size.
+        """
+
+        partPath = self.getPartPath(path, partKey if(partKey != None) else url)
+        statePath = f"{partPath}.json"
+        result = DownloadResult(path)
+        started = time.monotonic()
+        failures = 0
+        while(True):
+            offset = os.path.getsize(partPath) if(os.path.isfile(partPath)) else 0
+            state = self.loadPartState(statePath) if(offset > 0) else {}
+            headers = {}
+            if(offset > 0):
+                headers["Range"] = f"bytes={offset}-"
+                if(state.get("validator") != None):
+                    headers["If-Range"] = state["validator"]
+
+                result.resumes += 1
+
+            try:
+                with self.get(url, stream = True, headers = headers) as response:
+                    if(response.status_code == 416 and offset > 0 and offset == state.get("total")):
+                        break
+
+                    total = self.getTotalSize(response, offset)
+                    if(offset > 0 and (response.status_code == 416 or (response.status_code == 206 and total == None))):
+                        os.remove(partPath)
+                        raise requests.exceptions.RequestException(f"{url} did not answer range request as expected, restarting download.")
+
+                    response.raise_for_status()
+                    if(response.status_code != 206):
+                        offset = 0
+
+                    if(expectedSize != None and total != None and total != expectedSize):
+                        raise IOError(f"{url} has {total} bytes, expected {expectedSize}.")
+
+                    self.savePartState(statePath, {"validator": response.headers.get("ETag") or response.headers.get("Last-Modified"), "total": total})
+                    with open(partPath, "ab" if(offset > 0) else "wb") as file:
+                        for chunk in self.iterContent(response, self.settings.downloadChunkSize * 1024):
+                            file.write(chunk)
+                            result.byteCount += len(chunk)
+                            failures = 0
+                            self.requestGovernorService.acquireBandwidth(len(chunk))
+
+                size = os.path.getsize(partPath)
+                total = total if(total != None) else expectedSize
+                if(total == None or size == total):
+                    break
+                if(size > total):
+                    os.remove(partPath)
+                    raise IOError(f"{url} gave {size} bytes, expected {total}.")
+
+                raise requests.exceptions.ChunkedEncodingError(f"{url} ended after {size} of {total} bytes.")
+            except requests.exceptions.HTTPError:
+                raise
+            except requests.exceptions.RequestException:
+                failures += 1
+                if(failures > self.settings.httpRetries):
+                    raise
+
+                time.sleep(self.requestGovernorService.getBackoff(failures - 1))
+
+        os.replace(partPath, path)
+        if(os.path.isfile(statePath)):
+            os.remove(statePath)
+
+        result.seconds = time.monotonic() - started
+        return result
+
+    def getPartPath(self, path: str, partKey: str) -> str:
+        """
+        Get path of the partial file of a download, in the directory of path and named by partKey, so it is found again when the final name differs between calls.
+
+        Args:
+            path (str): Absolute path of file to write.
+            partKey (str): Key identifying the download.
+
+        Returns:
+            str: Absolute path.
+        """
+
+        return os.path.join(os.path.dirname(path), f".{hashlib.sha256(partKey.encode('utf-8')).hexdigest()[:16]}.part")
+
+    def getTotalSize(self, response: requests.Response, offset: int) -> int:
+        """
+        Get size of the whole file from a download response, from Content-Range of partial responses or Content-Length of full ones.
+
+        Args:
+            response (requests.Response): Response, 200 or 206.
+            offset (int): First byte requested.
+
+        Returns:
+            int | None: Bytes, None if unknown or if a partial response does not start at offset.
+        """
+
+        if(response.status_code == 206):
+            match = re.match(r"bytes (\d+)-\d+/(\d+)", response.headers.get("Content-Range", ""))
+            if(match == None or int(match.group(1)) != offset):
+                return None
+
+            return int(match.group(2))
+
+        contentLength = response.headers.get("Content-Length")
+        return int(contentLength) if(contentLength != None and contentLength.isdigit() and "Content-Encoding" not in response.headers) else None
+
+    def loadPartState(self, statePath: str) -> dict:
+        """
+        Load validator (ETag or Last-Modified) and total size of a partial download.
+
+        Args:
+            statePath (str): Absolute path of JSON file.
+
+        Returns:
+            dict: State, empty if missing or unreadable.
+        """
+
+        try:
+            with open(statePath, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def savePartState(self, statePath: str, state: dict) -> None:
+        """
+        Save validator and total size of a partial download.
+
+        Args:
+            statePath (str): Absolute path of JSON file.
+            state (dict): State.
+        """
+
+        with open(statePath, "w") as file:
+            json.dump(state, file)
+
+    def count(byteCount: int, requestCount: int = 1) -> None:
+        """
+        Add to request and byte counters.
+
+        Args:
+            byteCount (int): Bytes read.
+            requestCount (int): Requests sent. Defaults to 1.
+        """
+
+        with HttpService.statsLock:
+            HttpService.requestCount += requestCount
+            HttpService.byteCount += byteCount
+
+    def getStats() -> Dict[str, int]:
+        """
+        Get number of requests sent and body bytes read by all HttpServices.
+
+        Returns:
+            Dict[str, int]: Counters by name.
+        """
+
+        with HttpService.statsLock:
+            return {"requests": HttpService.requestCount,
+                "bytes": HttpService.byteCount}
+
+    def resetStats() -> None:
+        """
+        Reset request and byte counters.
+        """
+
+        with HttpService.statsLock:
+            HttpService.requestCount = 0
+            HttpService.byteCount = 0
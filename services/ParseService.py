@@ -0,0 +1,306 @@
+import json
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Container, Iterable, Iterator, List, Tuple
+from xml.etree.ElementTree import Element, XMLPullParser
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.element import Tag
+from grdUtil.InputUtil import sanitize
+
+from model.FeedItem import FeedItem
+
+
+class ParseService():
+    """
+    Extraction of streams from pages and documents fetched by FetchService, without network or storage access.
+    """
+
+    ytInitialDataRegex: re.Pattern = re.compile(rb"ytInitialData\"?\]?\s*=\s*")
+    youtubeChannelIdUriRegex: re.Pattern = re.compile(r"/channel/(UC[\w-]{22})")
+    youtubeChannelIdPageRegexes: List[re.Pattern] = [re.compile(rb"<meta itemprop=\"(?:channelId|identifier)\" content=\"(UC[\w-]{22})\""),
+        re.compile(rb"<link rel=\"canonical\" href=\"https://www\.youtube\.com/channel/(UC[\w-]{22})\""),
+        re.compile(rb"\"externalId\":\"(UC[\w-]{22})\""),
+        re.compile(rb"\"channelId\":\"(UC[\w-]{22})\"")]
+    jsonDecoder: json.JSONDecoder = json.JSONDecoder()
+
+    def extractYtInitialData(self, html: bytes) -> object:
+        """
+        Get ytInitialData from a YouTube page by scanning the raw bytes for the assignment and decoding only the JSON object that follows, without building a DOM.
+
+        Args:
+            html (bytes): Page content.
+
+        Returns:
+            object | None: Parsed ytInitialData, None if it could not be found or decoded.
+        """
+
+        match = ParseService.ytInitialDataRegex.search(html)
+        if(match == None):
+            return None
+
+        start = match.end()
+        end = html.find(b"</script>", start)
+        try:
+            text = html[start:end if(end != -1) else len(html)].decode("utf-8")
+            return ParseService.jsonDecoder.raw_decode(text)[0]
+        except ValueError:
+            return None
+
+    def extractYtInitialDataFromDocument(self, html: bytes) -> object:
+        """
+        Get ytInitialData from a YouTube page by parsing the full DOM. Slower fallback for extractYtInitialData.
+
+        Args:
+            html (bytes): Page content.
+
+        Returns:
+            object | None: Parsed ytInitialData, None if it could not be found or decoded.
+        """
+
+        document = BeautifulSoup(html, "html.parser")
+        script = document.find(lambda tag: tag.name == "script" and "ytInitialData" in tag.text)
+        if(script == None):
+            return None
+
+        return self.extractYtInitialData(script.text.encode("utf-8"))
+
+    def getYoutubeChannelIdFromUri(self, uri: str) -> str:
+        """
+        Get YouTube channel ID (UC...) from channel URLs like https://www.youtube.com/channel/UC....
+
+        Args:
+            uri (str): Channel URL.
+
+        Returns:
+            str | None: Channel ID, None if uri does not contain one (handles like /@name, /c/name, /user/name).
+        """
+
+        match = ParseService.youtubeChannelIdUriRegex.search(uri)
+        return match.group(1) if(match != None) else None
+
+    def getYoutubeChannelIdFromPage(self, html: bytes) -> str:
+        """
+        Get YouTube channel ID (UC...) of a channel page, from its metadata.
+
+        Args:
+            html (bytes): Channel page content.
+
+        Returns:
+            str | None: Channel ID, None if not found.
+        """
+
+        for regex in ParseService.youtubeChannelIdPageRegexes:
+            match = regex.search(html)
+            if(match != None):
+                return match.group(1).decode("ascii")
+
+        return None
+
+    def isYoutubeConsentPage(self, html: bytes) -> bool:
+        """
+        Check if page is the Google/YouTube cookie consent form rather than the requested page.
+
+        Args:
+            html (bytes): Page content.
+
+        Returns:
+            bool: Result.
+        """
+
+        return b"https://consent.youtube.com/save" in html
+
+    def getRumbleListingEntries(self, html: bytes) -> List[Tag]:
+        """
+        Get video entries (.video-listing-entry) from a Rumble channel page, building only those elements. Falls back to parsing the full DOM if none are found.
+
+        Args:
+            html (bytes): Page content.
+
+        Returns:
+            List[Tag]: Video entries in page order.
+        """
+
+        entries = BeautifulSoup(html, "html.parser", parse_only = SoupStrainer(class_ = "video-listing-entry")).select(".video-listing-entry")
+        if(len(entries) > 0):
+            return entries
+
+        return BeautifulSoup(html, "html.parser").select(".video-listing-entry")
+
+    def iterVideoRenderers(self, data: object) -> Iterator[dict]:
+        """
+        Walk JSON data (ytInitialData) once in document order, yielding each videoRenderer node. Children of videoRenderers are not walked.
+
+        Args:
+            data (object): Parsed JSON.
+
+        Returns:
+            Iterator[dict]: videoRenderer nodes.
+        """
+
+        stack = [data]
+        while(len(stack) > 0):
+            node = stack.pop()
+            if(isinstance(node, dict)):
+                renderer = node.get("videoRenderer")
+                if(isinstance(renderer, dict)):
+                    yield renderer
+                    continue
+
+                stack.extend(reversed(list(node.values())))
+            elif(isinstance(node, list)):
+                stack.extend(reversed(node))
+
+    def iterYoutubeVideos(self, data: object, stopIds: Container[str] = None) -> Iterator[Tuple[str, str, str, str]]:
+        """
+        Yield videos from ytInitialData lazily, stopping at the first video with an ID in stopIds.
+
+        Args:
+            data (object): Parsed ytInitialData.
+            stopIds (Container[str]): IDs of videos already fetched, anything supporting "in", for example a SeenSet from FetchService.getSeenIds. Defaults to None.
+
+        Returns:
+            Iterator[Tuple[str, str, str, str]]: Tuples of (videoId, sanitized title, duration like 12:34 or None, published text like "2 days ago" or None).
+        """
+
+        _stopIds = stopIds if(stopIds != None) else ()
+        for renderer in self.iterVideoRenderers(data):
+            videoId = renderer.get("videoId")
+            if(videoId == None):
+                continue
+
+            if(videoId in _stopIds):
+                return
+
+            yield (videoId, sanitize(self.getText(renderer.get("title"))), self.getText(renderer.get("lengthText")), self.getText(renderer.get("publishedTimeText")))
+
+    def getText(self, textNode: dict) -> str:
+        """
+        Get text of a YouTube text node, which is either {"simpleText": ...} or {"runs": [{"text": ...}, ...]}.
+
+        Args:
+            textNode (dict): Text node.
+
+        Returns:
+            str | None: Text, None if textNode has no text.
+        """
+
+        if(not isinstance(textNode, dict)):
+            return None
+
+        if("simpleText" in textNode):
+            return textNode["simpleText"]
+
+        runs = textNode.get("runs")
+        if(isinstance(runs, list) and len(runs) > 0):
+            return "".join([_.get("text", "") for _ in runs])
+
+        return None
+
+    def iterFeedItems(self, chunks: Iterable[bytes]) -> Iterator[FeedItem]:
+        """
+        Parse an RSS or Atom feed incrementally, yielding each item/entry as soon as it has been read. Stop iterating to avoid reading (and downloading, if chunks is a streamed response) the rest of the feed.
+
+        Args:
+            chunks (Iterable[bytes]): Feed content in chunks, for example HttpService.iterContent.
+
+        Returns:
+            Iterator[FeedItem]: Items in feed order.
+
+        Raises:
+            xml.etree.ElementTree.ParseError: Feed is not valid XML.
+        """
+
+        parser = XMLPullParser(events = ("end",))
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from self.readFeedEvents(parser)
+
+        parser.close()
+        yield from self.readFeedEvents(parser)
+
+    def readFeedEvents(self, parser: XMLPullParser) -> Iterator[FeedItem]:
+        """
+        Get items completed since last read from parser, clearing them to keep memory flat.
+
+        Args:
+            parser (XMLPullParser): Parser fed with feed content.
+
+        Returns:
+            Iterator[FeedItem]: Items completed.
+        """
+
+        for _, element in parser.read_events():
+            if(self.getLocalName(element.tag) in ["item", "entry"]):
+                item = self.getFeedItem(element)
+                element.clear()
+                yield item
+
+    def getFeedItem(self, element: Element) -> FeedItem:
+        """
+        Get FeedItem from RSS item or Atom entry element.
+
+        Args:
+            element (Element): item or entry element.
+
+        Returns:
+            FeedItem: Item.
+        """
+
+        item = FeedItem()
+        for child in element:
+            name = self.getLocalName(child.tag)
+            text = (child.text or "").strip()
+            if(name == "title"):
+                item.title = text
+            elif(name == "link" and item.link == None):
+                item.link = child.get("href") or text
+            elif(name in ["guid", "id"]):
+                item.guid = text
+            elif(name in ["pubDate", "published"]):
+                item.published = self.parseFeedDate(text)
+            elif(name == "duration"):
+                item.duration = text
+
+        if(item.guid == None):
+            item.guid = item.link
+
+        return item
+
+    def getLocalName(self, tag: str) -> str:
+        """
+        Get tag name without namespace, "{http://www.w3.org/2005/Atom}entry" -> "entry".
+
+        Args:
+            tag (str): Tag.
+
+        Returns:
+            str: Local name.
+        """
+
+        return tag.rsplit("}", 1)[-1]
+
+    def parseFeedDate(self, value: str) -> datetime:
+        """
+        Parse RSS (RFC 822, "Mon, 07 Jun 2021 04:57:59 GMT") or Atom (ISO 8601, "2021-06-07T04:57:59+00:00") dates, normalized to naive UTC.
+
+        Args:
+            value (str): Date string.
+
+        Returns:
+            datetime | None: Date, None if value could not be parsed.
+        """
+
+        try:
+            result = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            try:
+                result = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except ValueError:
+                return None
+
+        if(result.tzinfo != None):
+            result = result.astimezone(timezone.utc).replace(tzinfo = None)
+
+        return result
@@ -1,5 +1,4 @@
 import random
-import re
 import subprocess
 import uuid
 from copy import copy
@@ -13,12 +12,18 @@ from psutil import Popen
 
 from Commands import Commands
 from enums.StreamSourceType import StreamSourceType, StreamSourceTypeUtil
+from model.PlaybackCursor import PlaybackCursor
 from model.PlaybackInput import PlaybackInput
+from model.PlaybackSession import PlaybackSession
 from model.Playlist import Playlist
 from model.QueueStream import QueueStream
+from services.PlaybackSessionService import PlaybackSessionService
 from services.PlaylistService import PlaylistService
+from services.PrefetchService import PrefetchService
 from services.QueueStreamService import QueueStreamService
 from services.StreamSourceService import StreamSourceService
+from services.UrlService import UrlService
+from services.WatchedWriterService import WatchedWriterService
 from Settings import Settings
 
 
@@ -29,12 +34,16 @@ class PlaybackService():
     playlistService: PlaylistService = None
     queueStreamService: QueueStreamService = None
     streamSourceService: StreamSourceService = None
+    playbackSessionService: PlaybackSessionService = None
+    prefetchService: PrefetchService = None
+    watchedWriterService: WatchedWriterService = None
     quitInputs: List[str] = None
     quitWatchedInputs: List[str] = None
     skipInputs: List[str] = None
     addToInputs: List[str] = None
     circumventRestricted: List[str] = None
     printDetailsInputs: List[str] = None
+    windowSize: int = 20
 
     def __init__(self):
         self.commands = Commands()
@@ -43,6 +52,9 @@ class PlaybackService():
         self.playlistService = PlaylistService()
         self.queueStreamService = QueueStreamService()
         self.streamSourceService = StreamSourceService()
+        self.playbackSessionService = PlaybackSessionService()
+        self.prefetchService = PrefetchService()
+        self.watchedWriterService = WatchedWriterService()
         self.quitInputs = self.commands.quitArguments
         self.quitWatchedInputs = self.commands.quitWatchedArguments
         self.skipInputs = self.commands.skipArguments
@@ -54,13 +66,13 @@ class PlaybackService():
         self.nextInputs = self.commands.nextArguments
         self.printHelpInputs = self.commands.printPlaybackHelpArguments
 
-    def play(self, playlistId: str, startIndex: int = 0, shuffle: bool = False, repeatPlaylist: bool = False) -> bool:
+    def play(self, playlistId: str, startIndex: int = None, shuffle: bool = False, repeatPlaylist: bool = False) -> bool:
         """
         Start playing streams from this playlist.
 
         Args:
             playlistId (str): ID of playlist to play from.
-            startIndex (int): Index to start playing from.
+            startIndex (int): Index to start playing from. Defaults to None, resuming where playback of this playlist stopped.
             shuffle (bool): Shuffle videos.
             repeatPlaylist (bool): repeat playlist once it reaches the end.
 
@@ -77,26 +89,28 @@ class PlaybackService():
             printS("No streams found in \"", playlist.name, "\". Ending playback.")
             return False
 
-        streams = []
-        rawStreams = self.playlistService.getStreamsByPlaylistId(playlist.id)
-
-        if(len(rawStreams) == 0):
-            printS("Playlist \"", playlist.name, "\" has ", len(streams), " streams, but they could not be found in database (they may have been removed). Ending playback.")
+        session = self.getSession(playlist, startIndex, shuffle)
+        cursor = self.playbackSessionService.getCursor(session, playlist.streamIds, self.queueStreamService.getMany, self.windowSize)
+        firstWindow = cursor.peek(self.windowSize)
+        if(len(firstWindow) > 0 and all([stream == None for _, stream in firstWindow])):
+            printS("Playlist \"", playlist.name, "\" has ", len(playlist.streamIds), " streams, but the next ", len(firstWindow), " could not be found in database (they may have been removed). Ending playback.")
             return False
 
-        streams = rawStreams[startIndex:]
-        if(shuffle):
-            random.shuffle(streams)
-
-        printS("Playing ", playlist.name, " (", len(streams),  " streams total).")
-        printS("Starting at stream number: ", (startIndex + 1), ", shuffle is ", ("on" if shuffle else "off"), ", repeat playlist is ", ("on" if repeatPlaylist else "off"), ", played videos set to watched is ", ("on" if self.settings.playedAlwaysWatched else "off"), ".")
+        lastWatchedIndex = playlist.lastWatchedIndex
+        printS("Playing ", playlist.name, " (", len(cursor),  " streams total).")
+        printS("Starting at stream number: ", (firstWindow[0][0] + 1) if(len(firstWindow) > 0) else (session.startIndex + 1), ", shuffle is ", ("on" if shuffle else "off"), ", repeat playlist is ", ("on" if repeatPlaylist else "off"), ", played videos set to watched is ", ("on" if self.settings.playedAlwaysWatched else "off"), ".")
 
         playResult = 0
         try:
             if(True): # Play in CLI mode
-                playResult = self.playCli(playlist, streams)
+                playResult = self.playCli(playlist, cursor, session)
         except:
             printStack(doPrint = self.settings.debug)
+        finally:
+            self.watchedWriterService.flush()
+            self.saveLastWatchedIndex(playlist.id, lastWatchedIndex, playlist.lastWatchedIndex)
+            if(self.playbackSessionService.isFinished(session, cursor)):
+                self.playbackSessionService.remove(session.id)
             
         resultPrint = ""
         if(self.settings.playedAlwaysWatched):
@@ -109,38 +123,83 @@ class PlaybackService():
 
         return True
     
-    def playCli(self, playlist: Playlist, streams: List[QueueStream]) -> int:
+    def getSession(self, playlist: Playlist, startIndex: int = None, shuffle: bool = False) -> PlaybackSession:
+        """
+        Get PlaybackSession to play playlist with, resuming the last if startIndex is None and it can be resumed, else starting a new one. New sessions that are not shuffled start after Playlist.lastWatchedIndex if startIndex is None.
+
+        Args:
+            playlist (Playlist): Playlist to play from.
+            startIndex (int): Index in streamIds to start playing from, None to resume. Defaults to None.
+            shuffle (bool): Shuffle QueueStreams, as a random permutation of streamIds. Defaults to False.
+
+        Returns:
+            PlaybackSession: PlaybackSession at the first QueueStream to play.
+        """
+
+        if(startIndex == None):
+            session = self.playbackSessionService.resume(playlist, shuffle)
+            if(session != None):
+                printS("Resuming at ", session.summaryString(), ".", color = BashColor.OKGREEN)
+                return session
+
+            startIndex = 0
+            if(not shuffle and playlist.lastWatchedIndex != None and playlist.lastWatchedIndex + 1 < len(playlist.streamIds)):
+                startIndex = playlist.lastWatchedIndex + 1
+
+        shuffleSeed = random.randrange(2 ** 32) if(shuffle) else None
+        return self.playbackSessionService.start(playlist, startIndex, shuffleSeed)
+
+    def saveLastWatchedIndex(self, playlistId: str, oldIndex: int, newIndex: int) -> None:
+        """
+        Save Playlist.lastWatchedIndex if changed during playback, on the stored Playlist as it may have changed since playback started.
+
+        Args:
+            playlistId (str): ID of Playlist.
+            oldIndex (int): lastWatchedIndex when playback started.
+            newIndex (int): lastWatchedIndex after playback.
+        """
+
+        if(oldIndex == newIndex):
+            return
+
+        playlist = self.playlistService.get(playlistId)
+        if(playlist == None):
+            return
+
+        playlist.lastWatchedIndex = newIndex
+        self.playlistService.update(playlist)
+
+    def playCli(self, playlist: Playlist, cursor: PlaybackCursor, session: PlaybackSession = None) -> int:
         """
         Use CLI when playing from playback.
 
         Args:
             playlist (Playlist): Playlist which is currently playing.
-            streams (List[QueueStream]): QueueStreams to play from Playlist playlist.
+            cursor (PlaybackCursor): Cursor over QueueStreams to play from Playlist playlist.
+            session (PlaybackSession): PlaybackSession of cursor, saved as playback advances. Defaults to None.
 
         Returns:
             int: Number of streams watched.
         """
         
         nWatched = 0
-        if(len(streams) == 0):
+        if(cursor.remaining() == 0):
             printS("Stream queue is empty.", color = BashColor.OKGREEN)
             return nWatched
         
-        streamsToSkip = 0
-        streamsIndex = playlist.streamIds.index(streams[0].id)
-        for i, stream in enumerate(streams):
+        stopped = False
+        for streamsIndex, stream in cursor:
             streamsIndex += 1
             
-            if(streamsToSkip > 0):
-                streamsToSkip = streamsToSkip - 1
-                printS("Skipping \"", stream.name, "\".", color = BashColor.OKGREEN)
-                continue
-            
             if(stream.watched != None and not playlist.playWatchedStreams):
                 checkLogsMessage = " Check your logs (" + self.settings.watchedLogFilepath + ") for date/time watched." if self.settings.logWatched else " Logging is disabled and date/time watched is not available."
                 printS("Stream \"", stream.name, "\" (ID: ", stream.id, ") has been marked as watched.", checkLogsMessage, color = BashColor.WARNING)
                 continue
 
+            if(not self.prefetchService.isAvailable(stream)):
+                printS("Stream \"", stream.name, "\" (ID: ", stream.id, ") is no longer available (removed from site), skipping.", color = BashColor.WARNING)
+                continue
+
             subprocessStream = None
             if(stream.isWeb):
                 subprocessStream = self.openQueueStreamBrowser(stream.uri)
@@ -149,9 +208,14 @@ class PlaybackService():
                 printS("Non-web streams currently not supported, skipping video ", stream.name, color = BashColor.FAIL)
                 continue
 
+            # Saved only for streams shown, streams passed without input are covered by the next save
+            self.playbackSessionService.advance(session, cursor, cursor.position - 1)
             padI = str(streamsIndex).rjust(4, " ")
             printS(padI, " - Now playing \"", stream.name, "\"...", color = BashColor.BOLD)
-            printS("\tThis is the last stream in this playback, press enter to finish.", color = BashColor.WARNING, doPrint = ((i + 1) >= len(streams)))
+            printS("\tThis is the last stream in this playback, press enter to finish.", color = BashColor.WARNING, doPrint = (cursor.remaining() == 0))
+            if(self.settings.prefetchStreams > 0):
+                self.prefetchService.prefetch(playlist, [nextStream for _, nextStream in cursor.peek(self.settings.prefetchStreams)])
+            
             inputHandling = self.handlePlaybackInput(playlist, stream)
             if(inputHandling == 0):
                 printS("An error occurred while parsing inputs.", color = BashColor.FAIL)
@@ -159,31 +223,39 @@ class PlaybackService():
             elif(inputHandling.code == 1):
                 pass
             elif(inputHandling.code == 2):
-                streamsToSkip = inputHandling.nSkip
+                skipped = cursor.skip(inputHandling.nSkip)
+                for skippedIndex in skipped:
+                    printS("Skipping stream number ", skippedIndex + 1, ".", color = BashColor.OKGREEN)
+                self.playbackSessionService.advance(session, cursor, cursor.position, [streamsIndex - 1] + skipped)
                 continue
             elif(inputHandling.code == 3):
+                stopped = True
                 break
             
             # subprocessStream.terminate() # TODO Doesn't seem to work with browser, at least not new tabs
             
             now = getDateTime()
+            logLine = None
             if(self.settings.logWatched and len(self.settings.watchedLogFilepath) > 0):
                 logLine = f"{str(now)} - Playlist \"{playlist.name}\" (ID: {playlist.id}), watched video \"{stream.name}\" (ID: {stream.id})\n" 
-                with open(self.settings.watchedLogFilepath, "a") as file:
-                    file.write(logLine)
                     
             if(self.settings.playedAlwaysWatched):
                 stream.watched = now
-                
-                updateSuccess = self.queueStreamService.update(stream)
-                if(updateSuccess):
-                    nWatched += 1
-                else:
-                    printS("\"", stream.name, "\" could not be updated as watched.", color=BashColor.ERROR)
+                nWatched += 1
+            
+            if(cursor.shuffleSeed == None):
+                playlist.lastWatchedIndex = streamsIndex - 1
+            
+            if(logLine != None or self.settings.playedAlwaysWatched):
+                self.watchedWriterService.add(stream.id if(self.settings.playedAlwaysWatched) else None, str(now), logLine)
             
             if(inputHandling.code == 4):
                 break
             
+        if(not stopped and session != None and session.position != cursor.position):
+            self.playbackSessionService.advance(session, cursor, cursor.position)
+        
+        printS(len(cursor.missingIds), " QueueStream(s) listed in Playlist \"", playlist.name, "\" were not found in the database. Consider removing them by running the purge command.", color = BashColor.WARNING, doPrint = (len(cursor.missingIds) > 0))
         return nWatched
     
     def openQueueStreamBrowser(self, url: str) -> Popen:
@@ -256,7 +328,7 @@ class PlaybackService():
             
             elif(len(self.repeatInputs) > 0 and inputArgs in self.repeatInputs):
                 printS("Repeating.", color = BashColor.OKGREEN)
-                self.playCli(playlist, [stream]) # A little weird with prints and continuing but it works
+                self.playCli(playlist, PlaybackCursor(playlist.streamIds, lambda _: [stream], order = [playlist.streamIds.index(stream.id)])) # A little weird with prints and continuing but it works
             
             elif(len(self.listPlaylistInputs) > 0 and inputArgs in self.listPlaylistInputs):
                 result = self.playlistService.getAllSorted()
@@ -370,10 +442,5 @@ class PlaybackService():
             str | None: ID if URL is valid format.
         """
         
-        if("youtu.be/" in url):
-            return re.search(r"youtu\.be\/(\w+)", url).group(1)
-        elif("youtube.com/watch?v=" in url):
-            return re.search(r"\/watch\?v=(\w+)", url).group(1)
-        else:
-            return None
+        return UrlService.getYoutubeVideoId(url)
         
\ No newline at end of file
@@ -0,0 +1,124 @@
+import os
+import time
+from typing import Callable, List
+
+from model.PlaybackCursor import PlaybackCursor
+from model.PlaybackSession import PlaybackSession
+from model.Playlist import Playlist
+from model.QueueStream import QueueStream
+from services.EntityService import EntityService
+from Settings import Settings
+
+T = PlaybackSession
+
+class PlaybackSessionService(EntityService[T]):
+    """
+    Playback position of each Playlist, stored as one small PlaybackSession per Playlist (ID of the Playlist) and saved on every advance, so playback resumes at the QueueStream it stopped at, also after a crash, without loading the QueueStreams before it. A shuffled session keeps its seed, so it resumes in the same order.
+    """
+
+    maxSkipped: int = 100
+    settings: Settings = None
+
+    def __init__(self):
+        self.settings = Settings()
+        EntityService.__init__(self, T, self.settings.debug, os.path.join(self.settings.localStoragePath, "PlaybackSession"))
+
+    def start(self, playlist: Playlist, startIndex: int = 0, shuffleSeed: int = None) -> T:
+        """
+        Start a new PlaybackSession for playlist, replacing any.
+
+        Args:
+            playlist (Playlist): Playlist to play.
+            startIndex (int): Index in streamIds to start from. Defaults to 0.
+            shuffleSeed (int): Seed of shuffle, None to not shuffle. Defaults to None.
+
+        Returns:
+            PlaybackSession: PlaybackSession at first QueueStream to play.
+        """
+
+        session = PlaybackSession(playlistId = playlist.id, startIndex = startIndex, shuffleSeed = shuffleSeed, streamCount = len(playlist.streamIds), updated = time.time(), id = playlist.id)
+        if(self.exists(session.id)):
+            return self.update(session, allowSoftDeleted = True)
+
+        return self.add(session)
+
+    def resume(self, playlist: Playlist, shuffle: bool) -> T:
+        """
+        Get PlaybackSession of playlist if it can be resumed: shuffled if shuffle and the QueueStream it stopped at is still where it was, or for a session not shuffled, still in playlist.
+
+        Args:
+            playlist (Playlist): Playlist to play.
+            shuffle (bool): Playback is shuffled.
+
+        Returns:
+            PlaybackSession | None: PlaybackSession, None if there is none or it cannot be resumed.
+        """
+
+        session = self.get(playlist.id)
+        if(session == None or (session.shuffleSeed != None) != shuffle or session.streamId == None):
+            return None
+
+        cursor = self.getCursor(session, playlist.streamIds, lambda _: [])
+        if(cursor.getStreamId(session.position) == session.streamId):
+            return session
+
+        if(shuffle or session.streamId not in playlist.streamIds):
+            return None
+
+        session.startIndex = playlist.streamIds.index(session.streamId)
+        session.position = 0
+        session.streamCount = len(playlist.streamIds)
+        return self.update(session)
+
+    def getCursor(self, session: T, streamIds: List[str], loadMany: Callable[[List[str]], List[QueueStream]], windowSize: int = 20) -> PlaybackCursor:
+        """
+        Get cursor over streamIds at position of session.
+
+        Args:
+            session (PlaybackSession): PlaybackSession.
+            streamIds (List[str]): streamIds of Playlist of session.
+            loadMany (Callable[[List[str]], List[QueueStream]]): Function loading QueueStreams by IDs, like QueueStreamService.getMany.
+            windowSize (int): Number of QueueStreams to load at a time. Defaults to 20.
+
+        Returns:
+            PlaybackCursor: Cursor.
+        """
+
+        return PlaybackCursor(streamIds, loadMany, windowSize, session.startIndex, session.shuffleSeed, position = session.position, streamCount = session.streamCount)
+
+    def advance(self, session: T, cursor: PlaybackCursor, position: int, skipped: List[int] = []) -> T:
+        """
+        Save position of session, and QueueStreams skipped to get there.
+
+        Args:
+            session (PlaybackSession): PlaybackSession, None to do nothing.
+            cursor (PlaybackCursor): Cursor of session.
+            position (int): Position in order of cursor of the QueueStream playing, or next to play.
+            skipped (List[int]): Indices in streamIds of QueueStreams skipped. Defaults to [].
+
+        Returns:
+            PlaybackSession | None: PlaybackSession if saved, else None.
+        """
+
+        if(session == None):
+            return None
+
+        session.position = position
+        session.streamId = cursor.getStreamId(position)
+        session.skipped = (session.skipped + skipped)[-self.maxSkipped:]
+        session.updated = time.time()
+        return self.update(session)
+
+    def isFinished(self, session: T, cursor: PlaybackCursor) -> bool:
+        """
+        Get if session has played to the end of its cursor.
+
+        Args:
+            session (PlaybackSession): PlaybackSession.
+            cursor (PlaybackCursor): Cursor of session.
+
+        Returns:
+            bool: True if finished.
+        """
+
+        return session.position >= len(cursor)
@@ -1,12 +1,11 @@
 import os
-from typing import List
+from typing import Dict, List, Set
 
 import pytube
 import validators
 from grdException.ArgumentException import ArgumentException
 from grdException.DatabaseException import DatabaseException
 from grdException.NotFoundException import NotFoundException
-from grdService.BaseService import BaseService
 from grdUtil.BashColor import BashColor
 from grdUtil.DateTimeUtil import getDateTime, getDateTimeAsNumber
 from grdUtil.InputUtil import sanitize
@@ -21,13 +20,15 @@ from datetime import timedelta
 from model.Playlist import Playlist
 from model.QueueStream import QueueStream
 from model.StreamSource import StreamSource
+from repositories.StreamIndex import StreamIndex
+from services.EntityService import EntityService
 from services.QueueStreamService import QueueStreamService
 from services.StreamSourceService import StreamSourceService
 from Settings import Settings
 
 T = Playlist
 
-class PlaylistService(BaseService[T]):
+class PlaylistService(EntityService[T]):
     settings: Settings = None
     playlistRepository: LocalJsonRepository = None
     queueStreamService: QueueStreamService = None
@@ -40,7 +41,7 @@ class PlaylistService(BaseService[T]):
         self.streamSourceService = StreamSourceService()
         self.log = LogUtil(self.settings.logDirPath, self.settings.debug, LogLevel.VERBOSE)
         
-        BaseService.__init__(self, T, self.settings.debug, os.path.join(self.settings.localStoragePath, "Playlist"))
+        EntityService.__init__(self, T, self.settings.debug, os.path.join(self.settings.localStoragePath, "Playlist"))
 
     def addStreams(self, playlistId: str, streams: List[QueueStream]) -> List[QueueStream]:
         """
@@ -54,21 +55,16 @@ class PlaylistService(BaseService[T]):
             List[QueueStream]: QueueStreams added.
         """
 
+        self.loadStreamIndex()
         playlist = self.get(playlistId)
         if(playlist == None):
             self.log.logAsText(f"addStreams - Playlist with ID {playlistId} was not found.", logLevel = LogLevel.CRITICAL)
             raise NotFoundException(f"addStreams - Playlist with ID {playlistId} was not found.")
 
-        playlistStreamUris = []
-        playlistStreamNames = []
-        if(not playlist.allowDuplicates):
-            playlistStreams = self.getStreamsByPlaylistId(playlist.id)
-            playlistStreamUris = [_.uri for _ in playlistStreams]
-            playlistStreamNames = [_.name for _ in playlistStreams]
-            
+        playlistStreamIds = set(playlist.streamIds)
         added = []
         for stream in streams:            
-            if(not playlist.allowDuplicates and (stream.uri in playlistStreamUris or stream.name in playlistStreamNames)):
+            if(not playlist.allowDuplicates and self.isDuplicate(playlist, stream, playlistStreamIds)):
                 self.log.logAsText(f"addStreams - Attempted to add stream {stream.uri} but Playlist with ID {playlistId} does not allow duplicates.", logLevel = LogLevel.VERBOSE)
                 printS("\"", stream.name, "\" / ", stream.uri, " already exists in Playlist \"", playlist.name, "\" and allow duplicates for this Playlist is disabled.", color = BashColor.WARNING)
                 continue
@@ -79,6 +75,8 @@ class PlaylistService(BaseService[T]):
                 raise DatabaseException(f"addStreams - Failed to add streams to Playlist {playlist.name}, ID: {playlist.id}.")
             
             playlist.streamIds.append(stream.id)
+            playlistStreamIds.add(stream.id)
+            StreamIndex.add(stream, playlist.id)
             added.append(addResult)
 
         playlist.updated = getDateTime()
@@ -90,9 +88,63 @@ class PlaylistService(BaseService[T]):
             # Delete added QueueStreams if update of Playlist failed
             for stream in added:
                 self.queueStreamService.remove(stream.id, includeSoftDeleted = True)
+                StreamIndex.removeStream(stream.id)
             
             return []
 
+    def isDuplicate(self, playlist: Playlist, stream: QueueStream, playlistStreamIds: Set[str] = None) -> bool:
+        """
+        Check if Playlist already has a QueueStream with the same remote ID, URI or name as stream, using StreamIndex. Candidates from the index are verified against Playlist and storage, so only QueueStreams sharing a key with stream are loaded.
+
+        Args:
+            playlist (Playlist): Playlist to check.
+            stream (QueueStream): QueueStream to check, ID not needed.
+            playlistStreamIds (Set[str]): playlist.streamIds as a set, when checking many streams. Defaults to None.
+
+        Returns:
+            bool: Result.
+        """
+
+        self.loadStreamIndex()
+        _playlistStreamIds = playlistStreamIds if(playlistStreamIds != None) else set(playlist.streamIds)
+        streamKeys = set(StreamIndex.getKeys(stream))
+        for id in StreamIndex.find(stream, playlist.id):
+            if(id not in _playlistStreamIds):
+                continue
+
+            existing = self.queueStreamService.get(id)
+            if(existing != None and len(streamKeys.intersection(StreamIndex.getKeys(existing))) > 0):
+                return True
+
+        return False
+
+    def loadStreamIndex(self) -> None:
+        """
+        Load StreamIndex, rebuilding it if it is missing or was not saved cleanly.
+        """
+
+        if(not StreamIndex.load(os.path.join(self.settings.localStoragePath, "streamIndex.json"))):
+            printS("Building index of QueueStreams...", color = BashColor.OKGREEN)
+            self.rebuildStreamIndex()
+
+    def rebuildStreamIndex(self) -> int:
+        """
+        Rebuild StreamIndex from all Playlists and their QueueStreams in storage.
+
+        Returns:
+            int: Number of QueueStreams indexed.
+        """
+
+        StreamIndex.load(os.path.join(self.settings.localStoragePath, "streamIndex.json"))
+        StreamIndex.clear()
+        for playlist in self.getAll(includeSoftDeleted = True):
+            for stream in self.queueStreamService.getMany(playlist.streamIds, includeSoftDeleted = True):
+                if(stream != None):
+                    StreamIndex.add(stream, playlist.id)
+
+        StreamIndex.save()
+        return StreamIndex.getCount()
+
     def deleteStreams(self, playlistId: str, streamIds: List[str], includeSoftDeleted: bool = False, permanentlyDelete: bool = False) -> List[QueueStream]:
         """
         (Soft) Delete/remove QueueStreams from Playlist.
@@ -107,6 +159,7 @@ class PlaylistService(BaseService[T]):
             List[QueueStream]: QueueStreams deleted/removed.
         """
 
+        self.loadStreamIndex()
         result = []
         playlist = self.get(playlistId, includeSoftDeleted)
         if(playlist == None):
@@ -128,6 +181,7 @@ class PlaylistService(BaseService[T]):
                 removeResult = self.queueStreamService.delete(id)
             if(removeResult != None):
                 playlist.streamIds.remove(stream.id)
+                StreamIndex.removeMembership(stream.id, playlist.id)
                 result.append(stream)
 
         updateResult = self.update(playlist)
@@ -149,6 +203,7 @@ class PlaylistService(BaseService[T]):
             List[QueueStream]: QueueStreams restored.
         """
 
+        self.loadStreamIndex()
         result = []
         playlist = self.get(playlistId, includeSoftDeleted = True)
         if(playlist == None):
@@ -162,6 +217,7 @@ class PlaylistService(BaseService[T]):
             restoreResult = self.queueStreamService.restore(id)
             if(restoreResult != None):
                 playlist.streamIds.append(stream.id)
+                StreamIndex.add(stream, playlist.id)
                 result.append(stream)
 
         updateResult = self.update(playlist)
@@ -336,8 +392,8 @@ class PlaylistService(BaseService[T]):
             raise NotFoundException(f"getStreamsByPlaylistId - Playlist with ID {playlistId} was not found.")
 
         playlistStreams = []
-        for id in playlist.streamIds:
-            stream = self.queueStreamService.get(id, includeSoftDeleted)
+        streams = self.queueStreamService.getMany(playlist.streamIds, includeSoftDeleted)
+        for id, stream in zip(playlist.streamIds, streams):
             if(stream == None):
                 printS("A QueueStream with ID: ", id, " was Listed in Playlist \"", playlist.name, "\", but was not found in the database. Consider removing it by running the purge command.", color = BashColor.WARNING)
                 continue
@@ -363,8 +419,8 @@ class PlaylistService(BaseService[T]):
             raise NotFoundException(f"getUnwatchedStreamsByPlaylistId - Playlist with ID {playlistId} was not found.")
 
         playlistStreams = []
-        for id in playlist.streamIds:
-            stream = self.queueStreamService.get(id, includeSoftDeleted)
+        streams = self.queueStreamService.getMany(playlist.streamIds, includeSoftDeleted)
+        for id, stream in zip(playlist.streamIds, streams):
             if(stream == None):
                 printS("A QueueStream with ID: ", id, " was Listed in Playlist \"", playlist.name, "\", but was not found in the database. Consider removing it by running the purge command.", color = BashColor.WARNING)
                 continue
@@ -391,8 +447,8 @@ class PlaylistService(BaseService[T]):
             raise NotFoundException(f"getSourcesByPlaylistId - Playlist with ID {playlistId} was not found.")
 
         playlistSources = []
-        for id in playlist.streamSourceIds:
-            source = self.streamSourceService.get(id, includeSoftDeleted)
+        sources = self.streamSourceService.getMany(playlist.streamSourceIds, includeSoftDeleted)
+        for id, source in zip(playlist.streamSourceIds, sources):
             if(source == None):
                 printS("A StreamSource with ID: ", id, " was Listed in Playlist \"", playlist.name, "\", but was not found in the database. Consider removing it by running the purge command.", color = BashColor.WARNING)
                 continue
@@ -404,6 +460,23 @@ class PlaylistService(BaseService[T]):
 
         return playlistSources
 
+    def getSourcesByStreams(self, streams: List[QueueStream], includeSoftDeleted: bool = False) -> Dict[str, StreamSource]:
+        """
+        Get StreamSources of QueueStreams in one bulk read, each StreamSource read once.
+
+        Args:
+            streams (List[QueueStream]): QueueStreams to get StreamSources for, None entries are ignored.
+            includeSoftDeleted (bool): should include soft-deleted entities.
+
+        Returns:
+            Dict[str, StreamSource]: StreamSources found, by ID.
+        """
+
+        sourceIds = list(dict.fromkeys([_.streamSourceId for _ in streams if(_ != None and _.streamSourceId != None)]))
+        sources = self.streamSourceService.getMany(sourceIds, includeSoftDeleted)
+        
+        return {id: source for id, source in zip(sourceIds, sources) if(source != None)}
+
     def addYouTubePlaylist(self, playlist: Playlist, url: str) -> T:
         """
         Create a Playlist, using a YouTube playlist as the starting point. Videos will be added as streams in the playlist TODO? and source will be the playlist.
@@ -481,8 +554,8 @@ class PlaylistService(BaseService[T]):
             if(len(playlist.streamSourceIds) == 0):
                 printS("\tNo sources added yet.")
             
-            for i, sourceId in enumerate(playlist.streamSourceIds):
-                source = self.streamSourceService.get(sourceId, includeSoftDeleted)
+            sources = self.streamSourceService.getMany(playlist.streamSourceIds, includeSoftDeleted)
+            for i, (sourceId, source) in enumerate(zip(playlist.streamSourceIds, sources)):
                 if(source == None):
                     printS("\tStreamSource not found (ID: \"", sourceId, "\").", color = BashColor.FAIL)
                     continue
@@ -496,15 +569,16 @@ class PlaylistService(BaseService[T]):
             if(len(playlist.streamIds) == 0):
                 printS("\tNo streams added yet.")
             
-            for i, streamId in enumerate(playlist.streamIds):
-                stream = self.queueStreamService.get(streamId, includeSoftDeleted)
+            streams = self.queueStreamService.getMany(playlist.streamIds, includeSoftDeleted)
+            streamSources = self.getSourcesByStreams(streams, includeSoftDeleted) if(includeSource) else {}
+            for i, (streamId, stream) in enumerate(zip(playlist.streamIds, streams)):
                 if(stream == None):
                     printS("\tQueueStream not found (ID: \"", streamId, "\").", color = BashColor.FAIL)
                     continue
                 
                 sourceString = ""
                 if(includeSource and stream.streamSourceId != None):
-                    streamSource = self.streamSourceService.get(stream.streamSourceId, includeSoftDeleted)
+                    streamSource = streamSources.get(stream.streamSourceId)
                     
                     if(streamSource == None):
                         sourceString = ", from: [missing]" 
@@ -543,15 +617,17 @@ class PlaylistService(BaseService[T]):
                 printS("\tNo streams added yet.")
             
             j = streamStartIndex
-            for i, streamId in enumerate(playlist.streamIds[streamStartIndex:]):
-                stream = self.queueStreamService.get(streamId, includeSoftDeleted)
+            streamIds = playlist.streamIds[streamStartIndex:]
+            streams = self.queueStreamService.getMany(streamIds, includeSoftDeleted)
+            streamSources = self.getSourcesByStreams(streams, includeSoftDeleted) if(includeSource) else {}
+            for i, (streamId, stream) in enumerate(zip(streamIds, streams)):
                 if(stream == None):
                     printS("\tQueueStream not found (ID: \"", streamId, "\").", color = BashColor.FAIL)
                     continue
                 
                 sourceString = ""
                 if(includeSource and stream.streamSourceId != None):
-                    streamSource = self.streamSourceService.get(stream.streamSourceId, includeSoftDeleted)
+                    streamSource = streamSources.get(stream.streamSourceId)
                     
                     if(streamSource == None):
                         sourceString = ", from [source missing]" 
@@ -588,9 +664,9 @@ class PlaylistService(BaseService[T]):
             if(len(playlist.streamIds) == 0):
                 printS("\tNo streams added yet.")
             
-            for i, streamId in enumerate(playlist.streamIds):
-                stream = self.queueStreamService.get(streamId, includeSoftDeleted)
-                
+            streams = self.queueStreamService.getMany(playlist.streamIds, includeSoftDeleted)
+            streamSources = self.getSourcesByStreams([_ for _ in streams if(_ != None and _.watched != None)], includeSoftDeleted)
+            for i, (streamId, stream) in enumerate(zip(playlist.streamIds, streams)):
                 if(stream == None):
                     printS("\tQueueStream not found (ID: \"", streamId, "\").", color = BashColor.FAIL)
                     continue
@@ -600,7 +676,7 @@ class PlaylistService(BaseService[T]):
                 
                 sourceString = "from [missing]"
                 if(stream.streamSourceId != None):
-                    streamSource = self.streamSourceService.get(stream.streamSourceId, includeSoftDeleted)
+                    streamSource = streamSources.get(stream.streamSourceId)
                     if(streamSource != None):
                         sourceString = ", from: \"" + maxLen(streamSource.name, 20) + "\""
                         
@@ -672,10 +748,8 @@ class PlaylistService(BaseService[T]):
         if(len(playlist.streamSourceIds) == 0):
             printS("\tNo sources added yet.")
         
-        sources = playlist.streamSourceIds
-        for i, sourceId in enumerate(sources):
-            source = self.streamSourceService.get(sourceId, includeSoftDeleted)
-            
+        sources = self.streamSourceService.getMany(playlist.streamSourceIds, includeSoftDeleted)
+        for i, (sourceId, source) in enumerate(zip(playlist.streamSourceIds, sources)):
             if(source == None):
                 printS("\tStreamSource not found (ID: \"", sourceId, "\").", color = BashColor.FAIL)
                 continue
@@ -696,10 +770,8 @@ class PlaylistService(BaseService[T]):
         if(len(playlist.streamIds) == 0):
             printS("\tNo streams added yet.")
         
-        streams = playlist.streamIds
-        for i, streamId in enumerate(streams):
-            stream = self.queueStreamService.get(streamId, includeSoftDeleted)
-            
+        streams = self.queueStreamService.getMany(playlist.streamIds, includeSoftDeleted)
+        for i, (streamId, stream) in enumerate(zip(playlist.streamIds, streams)):
             if(stream == None):
                 printS("\tQueueStream not found (ID: \"", streamId, "\").", color = BashColor.FAIL)
                 continue
@@ -767,6 +839,19 @@ class PlaylistService(BaseService[T]):
 
         return all
     
+    def getAllDeletedSorted(self) -> List[Playlist]:
+        """
+        Get all soft-deleted playlists sorted as getAllSorted().
+
+        Returns:
+            List[Playlist]: Soft-deleted playlists in storage, sorted.
+        """
+        
+        all = self.getAllDeleted()
+        all.sort(key = lambda e: (e.favorite * -1, e.sortOrder, e.name)) # -1 to reverse favorite property (bool = int)
+
+        return all
+    
     def getAllIdsSorted(self, includeSoftDeleted: bool = False) -> List[str]:
         """
         Get all IDs of playlists sorted after getAllSorted().
@@ -0,0 +1,190 @@
+import threading
+from copy import copy
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+from grdUtil.BashColor import BashColor
+from grdUtil.InputUtil import sanitize
+from grdUtil.PrintUtil import printD
+from pytube import YouTube
+from pytube.exceptions import VideoUnavailable
+
+from enums.DownloadJobState import DownloadJobState
+from enums.StreamSourceType import StreamSourceType, StreamSourceTypeUtil
+from model.Playlist import Playlist
+from model.QueueStream import QueueStream
+from repositories.DownloadStore import DownloadStore
+from services.DownloadJobService import DownloadJobService
+from services.HttpService import HttpService
+from services.StreamSourceService import StreamSourceService
+from services.WatchedWriterService import WatchedWriterService
+from Settings import Settings
+
+
+class PrefetchService():
+    """
+    Resolves the next PREFETCH_STREAMS QueueStreams in the background while one is playing: missing names and playtimeSeconds are filled in and saved, and QueueStreams whose video was removed are found before they are opened. With DOWNLOAD_WEB_STREAMS, or alwaysDownload on the StreamSource of a QueueStream, downloads of them are started through DownloadJobService.
+    """
+
+    unavailableStatusCodes: List[int] = [404, 410]
+    lock: threading.Lock = None
+    executor: ThreadPoolExecutor = None
+    futures: Dict[str, Future] = None
+    downloadJobService: DownloadJobService = None
+    httpService: HttpService = None
+    streamSourceService: StreamSourceService = None
+    watchedWriterService: WatchedWriterService = None
+    settings: Settings = None
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.futures = {}
+        self.downloadJobService = DownloadJobService()
+        self.httpService = HttpService()
+        self.streamSourceService = StreamSourceService()
+        self.watchedWriterService = WatchedWriterService()
+        self.settings = Settings()
+
+    def prefetch(self, playlist: Playlist, streams: List[QueueStream]) -> int:
+        """
+        Start resolving streams in the background, those not already started.
+
+        Args:
+            playlist (Playlist): Playlist streams are played from.
+            streams (List[QueueStream]): QueueStreams to play next, None where not found.
+
+        Returns:
+            int: Number of QueueStreams started.
+        """
+
+        result = 0
+        with self.lock:
+            if(self.executor == None):
+                self.executor = ThreadPoolExecutor(max_workers = 2, thread_name_prefix = "prefetch")
+
+            for stream in streams:
+                if(stream == None or not stream.isWeb or stream.id in self.futures):
+                    continue
+
+                self.futures[stream.id] = self.executor.submit(self.resolve, playlist, stream)
+                result += 1
+
+        return result
+
+    def isAvailable(self, stream: QueueStream) -> bool:
+        """
+        Get if video of stream is available, as far as known without waiting. Copies resolved name and playtimeSeconds to stream.
+
+        Args:
+            stream (QueueStream): QueueStream about to be played.
+
+        Returns:
+            bool: False if prefetching found the video removed, else True.
+        """
+
+        with self.lock:
+            future = self.futures.pop(stream.id, None)
+
+        if(future == None or not future.done() or future.exception() != None):
+            return True
+
+        resolved, available = future.result()
+        stream.name = resolved.name
+        stream.playtimeSeconds = resolved.playtimeSeconds
+        return available
+
+    def resolve(self, playlist: Playlist, stream: QueueStream) -> Tuple[QueueStream, bool]:
+        """
+        Resolve name, playtimeSeconds and availability of stream, saving name and playtimeSeconds through WatchedWriterService if they were missing, and start its download if enabled. Runs in the background.
+
+        Args:
+            playlist (Playlist): Playlist stream is played from.
+            stream (QueueStream): QueueStream to resolve.
+
+        Returns:
+            Tuple[QueueStream, bool]: Tuple of (copy of stream with name and playtimeSeconds filled in, False if the video was removed).
+        """
+
+        metadata = self.getMetadata(stream.uri)
+        resolved = copy(stream)
+        fields = {}
+        if(metadata["name"] != None and (resolved.name == None or len(resolved.name) == 0 or resolved.name == resolved.uri)):
+            resolved.name = fields["name"] = metadata["name"]
+        if(metadata["playtimeSeconds"] != None and resolved.playtimeSeconds == None):
+            resolved.playtimeSeconds = fields["playtimeSeconds"] = metadata["playtimeSeconds"]
+
+        if(len(fields) > 0):
+            self.watchedWriterService.add(resolved.id, fields = fields)
+
+        if(not metadata["available"]):
+            printD("Prefetch found \"", resolved.name, "\" (ID: ", resolved.id, ") removed.", color = BashColor.WARNING, debug = self.settings.debug)
+            return resolved, False
+
+        self.download(playlist, resolved)
+        return resolved, True
+
+    def getMetadata(self, url: str) -> dict:
+        """
+        Get name, playtimeSeconds and availability of video at url, from pytube for YouTube, else from the page.
+
+        Args:
+            url (str): URL of video.
+
+        Returns:
+            dict: Name (None if not found), playtimeSeconds (None if not found) and available (False only if the video was removed).
+        """
+
+        result = {"name": None, "playtimeSeconds": None, "available": True}
+        try:
+            if(StreamSourceTypeUtil.strToStreamSourceType(url) == StreamSourceType.YOUTUBE):
+                youtube = YouTube(url)
+                youtube.check_availability()
+                result["name"] = youtube.title
+                result["playtimeSeconds"] = youtube.length
+            else:
+                response = self.httpService.get(url)
+                if(response.status_code in self.unavailableStatusCodes):
+                    result["available"] = False
+                    return result
+
+                soup = BeautifulSoup(response.content, "html.parser", parse_only = SoupStrainer(["title", "meta"]))
+                result["name"] = soup.title.string if(soup.title != None) else None
+                duration = soup.find("meta", property = ["og:video:duration", "video:duration"])
+                if(duration != None and str(duration.get("content", "")).isdigit()):
+                    result["playtimeSeconds"] = int(duration["content"])
+        except VideoUnavailable:
+            result["available"] = False
+        except Exception as e:
+            printD("Prefetch of ", url, " failed: ", e, color = BashColor.WARNING, debug = self.settings.debug)
+
+        result["name"] = sanitize(result["name"]).strip() if(result["name"] != None) else None
+        return result
+
+    def download(self, playlist: Playlist, stream: QueueStream) -> Future:
+        """
+        Queue and start download of stream if DOWNLOAD_WEB_STREAMS is set or its StreamSource has alwaysDownload, and it is not already downloaded.
+
+        Args:
+            playlist (Playlist): Playlist stream is played from.
+            stream (QueueStream): QueueStream to download.
+
+        Returns:
+            Future | None: Future from DownloadJobService.start, None if not started.
+        """
+
+        source = self.streamSourceService.get(stream.streamSourceId) if(stream.streamSourceId != None) else None
+        if(not self.settings.downloadWebStreams and (source == None or not source.alwaysDownload)):
+            return None
+
+        storeKey = DownloadStore.getKey(stream.uri)
+        if(storeKey != None and DownloadStore.get(storeKey) != None):
+            return None
+
+        directory = source.name if(source != None) else playlist.name
+        job = self.downloadJobService.enqueue(stream.uri, directory, priority = 2, queueStreamId = stream.id, playlistId = playlist.id)
+        if(job == None or job.stateId != DownloadJobState.QUEUED.value):
+            return None
+
+        printD("Prefetch started download of \"", stream.name, "\".", debug = self.settings.debug)
+        return self.downloadJobService.start(job)
@@ -1,22 +1,23 @@
 import os
 
 import validators
-from grdService.BaseService import BaseService
 from model.QueueStream import QueueStream
+from services.EntityService import EntityService
+from services.UrlService import UrlService
 from Settings import Settings
 
 T = QueueStream
 
-class QueueStreamService(BaseService[T]):
+class QueueStreamService(EntityService[T]):
     settings: Settings = None
 
     def __init__(self):
         self.settings = Settings()
-        BaseService.__init__(self, T, self.settings.debug, os.path.join(self.settings.localStoragePath, "QueueStream"))
+        EntityService.__init__(self, T, self.settings.debug, os.path.join(self.settings.localStoragePath, "QueueStream"))
 
     def add(self, queueStream: T) -> T:
         """
-        Add a new QueueStream.
+        Add a new QueueStream. URLs of supported platforms are stored in canonical form, see UrlService.canonicalize.
 
         Args:
             queueStream (QueueStream): QueueStream to add
@@ -26,7 +27,12 @@ class QueueStreamService(BaseService[T]):
         """
 
         entity = queueStream
+        sourceType, canonicalId, canonicalUrl = UrlService.canonicalize(entity.uri)
+        if(sourceType != None and canonicalId != None):
+            entity.uri = canonicalUrl
+            entity.remoteId = entity.remoteId if(entity.remoteId != None) else canonicalId
+
         entity.isWeb = validators.url(entity.uri)
         
-        return BaseService.add(self, entity)
+        return EntityService.add(self, entity)
         
\ No newline at end of file
@@ -0,0 +1,245 @@
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+from Settings import Settings
+
+
+class RequestGovernorService():
+    """
+    Process-wide limits on requests sent by HttpService: a token bucket per host (HTTP_HOST_RATE), a bandwidth ceiling shared by downloads (DOWNLOAD_BANDWIDTH_LIMIT), exponential backoff with jitter before retrying throttled or failed requests (HTTP_RETRIES), and a circuit breaker per host that refuses requests for CIRCUIT_BREAKER_COOLDOWN minutes after CIRCUIT_BREAKER_THRESHOLD failures in a row. Breaker state is saved in LOCAL_STORAGE_PATH so later runs respect it.
+    """
+
+    maxBackoff: float = 60
+    lock: threading.Lock = threading.Lock()
+    buckets: Dict[str, list] = {}
+    bandwidthBucket: list = None
+    breakers: Dict[str, dict] = {}
+    breakerPath: str = None
+    stats: Dict[str, int] = {"throttled": 0, "retries": 0, "failures": 0, "breakerTrips": 0, "breakerSkips": 0}
+    settings: Settings = None
+
+    def __init__(self):
+        self.settings = Settings()
+        self.loadBreakers(os.path.join(self.settings.localStoragePath, "circuitBreakers.json"))
+
+    def getHost(self, url: str) -> str:
+        """
+        Get host of url, which limits and breakers are kept by.
+
+        Args:
+            url (str): URL.
+
+        Returns:
+            str: Host in lower case, empty if url has none.
+        """
+
+        return (urlparse(url).hostname or "").lower()
+
+    def acquire(self, host: str) -> None:
+        """
+        Take a token from the bucket of host, waiting until one is available. Buckets refill at HTTP_HOST_RATE tokens per second and hold at most one second worth of tokens.
+
+        Args:
+            host (str): Host from getHost.
+        """
+
+        rate = self.settings.httpHostRate
+        if(rate <= 0):
+            return
+
+        capacity = max(1.0, rate)
+        with RequestGovernorService.lock:
+            now = time.monotonic()
+            tokens, updated = RequestGovernorService.buckets.get(host, [capacity, now])
+            tokens = min(capacity, tokens + (now - updated) * rate) - 1
+            RequestGovernorService.buckets[host] = [tokens, now]
+            if(tokens < 0):
+                RequestGovernorService.stats["throttled"] += 1
+
+        # Tokens are reserved above, so waiting threads queue up instead of racing for the same token
+        if(tokens < 0):
+            time.sleep(-tokens / rate)
+
+    def acquireBandwidth(self, byteCount: int) -> None:
+        """
+        Take byteCount bytes from the download bandwidth bucket shared by all downloads, waiting until they are available. The bucket refills at DOWNLOAD_BANDWIDTH_LIMIT KiB per second and holds at most one second worth.
+
+        Args:
+            byteCount (int): Bytes read.
+        """
+
+        rate = self.settings.downloadBandwidthLimit * 1024
+        if(rate <= 0):
+            return
+
+        with RequestGovernorService.lock:
+            now = time.monotonic()
+            tokens, updated = RequestGovernorService.bandwidthBucket if(RequestGovernorService.bandwidthBucket != None) else [rate, now]
+            tokens = min(rate, tokens + (now - updated) * rate) - byteCount
+            RequestGovernorService.bandwidthBucket = [tokens, now]
+
+        if(tokens < 0):
+            time.sleep(-tokens / rate)
+
+    def getBackoff(self, attempt: int, retryAfter: str = None) -> float:
+        """
+        Get seconds to wait before retrying a request: random between 0 and HTTP_BACKOFF_BASE * 2^attempt ("full jitter"), or Retry-After from the response if it is given in seconds. At most maxBackoff.
+
+        Args:
+            attempt (int): Number of the attempt that failed, from 0.
+            retryAfter (str): Retry-After header of response. Defaults to None.
+
+        Returns:
+            float: Seconds.
+        """
+
+        if(retryAfter != None and retryAfter.strip().isdigit()):
+            return min(RequestGovernorService.maxBackoff, float(retryAfter))
+
+        return random.uniform(0, min(RequestGovernorService.maxBackoff, self.settings.httpBackoffBase * 2 ** attempt))
+
+    def isRetryable(self, statusCode: int) -> bool:
+        """
+        Check if a response with statusCode means the host is throttling or failing, and the request may be retried.
+
+        Args:
+            statusCode (int): HTTP status code.
+
+        Returns:
+            bool: Result.
+        """
+
+        return statusCode == 429 or statusCode >= 500
+
+    def countRetry(self) -> None:
+        """
+        Count a retried request.
+        """
+
+        with RequestGovernorService.lock:
+            RequestGovernorService.stats["retries"] += 1
+
+    def isOpen(self, host: str, count: bool = False) -> bool:
+        """
+        Check if circuit breaker of host is open, meaning requests to it should not be sent. After the cooldown the breaker lets requests through again, and one more failure opens it again.
+
+        Args:
+            host (str): Host from getHost.
+            count (bool): Count as a skipped source in stats, if open. Defaults to False.
+
+        Returns:
+            bool: Result.
+        """
+
+        with RequestGovernorService.lock:
+            breaker = RequestGovernorService.breakers.get(host)
+            isOpen = breaker != None and breaker["openUntil"] > time.time()
+            if(isOpen and count):
+                RequestGovernorService.stats["breakerSkips"] += 1
+
+            return isOpen
+
+    def getOpenUntil(self, host: str) -> float:
+        """
+        Get when circuit breaker of host closes.
+
+        Args:
+            host (str): Host from getHost.
+
+        Returns:
+            float: Timestamp, 0 if breaker was never opened.
+        """
+
+        with RequestGovernorService.lock:
+            return RequestGovernorService.breakers.get(host, {}).get("openUntil", 0)
+
+    def recordSuccess(self, host: str) -> None:
+        """
+        Record a request that host answered, resetting its failures.
+
+        Args:
+            host (str): Host from getHost.
+        """
+
+        with RequestGovernorService.lock:
+            if(RequestGovernorService.breakers.pop(host, None) == None):
+                return
+
+            self.saveBreakers()
+
+    def recordFailure(self, host: str) -> None:
+        """
+        Record a request that failed after all retries, opening the circuit breaker of host at CIRCUIT_BREAKER_THRESHOLD failures in a row.
+
+        Args:
+            host (str): Host from getHost.
+        """
+
+        with RequestGovernorService.lock:
+            RequestGovernorService.stats["failures"] += 1
+            breaker = RequestGovernorService.breakers.setdefault(host, {"failures": 0, "openUntil": 0})
+            breaker["failures"] += 1
+            if(breaker["failures"] >= self.settings.circuitBreakerThreshold):
+                breaker["openUntil"] = time.time() + self.settings.circuitBreakerCooldown * 60
+                RequestGovernorService.stats["breakerTrips"] += 1
+
+            self.saveBreakers()
+
+    def loadBreakers(self, path: str) -> None:
+        """
+        Load circuit breaker state from file in path, once per path.
+
+        Args:
+            path (str): Absolute path of JSON file.
+        """
+
+        with RequestGovernorService.lock:
+            if(RequestGovernorService.breakerPath == path):
+                return
+
+            RequestGovernorService.breakerPath = path
+            RequestGovernorService.breakers = {}
+            if(os.path.isfile(path)):
+                try:
+                    with open(path, "r") as file:
+                        RequestGovernorService.breakers = json.load(file)
+                except (OSError, ValueError):
+                    RequestGovernorService.breakers = {}
+
+    def saveBreakers(self) -> None:
+        """
+        Write circuit breaker state to file. Call while holding lock.
+        """
+
+        if(RequestGovernorService.breakerPath == None):
+            return
+
+        temporaryPath = f"{RequestGovernorService.breakerPath}.tmp"
+        with open(temporaryPath, "w") as file:
+            json.dump(RequestGovernorService.breakers, file)
+
+        os.replace(temporaryPath, RequestGovernorService.breakerPath)
+
+    def getStats() -> Dict[str, int]:
+        """
+        Get counters of requests delayed by rate limits (throttled), retried, failed after retries, breakers opened (breakerTrips) and sources skipped due to an open breaker (breakerSkips).
+
+        Returns:
+            Dict[str, int]: Counters by name.
+        """
+
+        with RequestGovernorService.lock:
+            return dict(RequestGovernorService.stats)
+
+    def resetStats() -> None:
+        """
+        Reset counters.
+        """
+
+        with RequestGovernorService.lock:
+            RequestGovernorService.stats = {_: 0 for _ in RequestGovernorService.stats}
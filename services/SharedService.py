@@ -2,7 +2,7 @@ import os
 import re
 from typing import Dict, List
 
-import mechanize
+from bs4 import BeautifulSoup, SoupStrainer
 from grdUtil.BashColor import BashColor
 from grdUtil.DateTimeUtil import getDateTimeAsNumber
 from grdUtil.FileUtil import mkdir
@@ -15,6 +15,8 @@ from model.Playlist import Playlist
 from model.PlaylistDetailed import PlaylistDetailed
 from model.QueueStream import QueueStream
 from model.StreamSource import StreamSource
+from repositories.StreamIndex import StreamIndex
+from services.HttpService import HttpService
 from services.PlaylistService import PlaylistService
 from services.QueueStreamService import QueueStreamService
 from services.StreamSourceService import StreamSourceService
@@ -22,12 +24,14 @@ from Settings import Settings
 
 
 class SharedService():
+    httpService: HttpService = None
     settings: Settings = None
     playlistService: PlaylistService = None
     queueStreamService: QueueStreamService = None
     streamSourceService: StreamSourceService = None
 
     def __init__(self):
+        self.httpService = HttpService()
         self.settings = Settings()
         self.playlistService = PlaylistService()
         self.queueStreamService = QueueStreamService()
@@ -35,7 +39,7 @@ class SharedService():
 
     def getPageTitle(self, url: str) -> str:
         """
-        Get page title from the URL url, using mechanize or PyTube.
+        Get page title from the URL url, using the title tag of the page or PyTube.
 
         Args:
             url (str): URL to page to get title from.
@@ -52,14 +56,11 @@ class SharedService():
                 yt = YouTube(url)
                 title = yt.title
             else:
-                printD("Getting title from mechanize.", color = BashColor.WARNING, debug = self.settings.debug)
+                printD("Getting title from page.", color = BashColor.WARNING, debug = self.settings.debug)
                 try:
-                    br = mechanize.Browser()
-                    br.set_handle_robots(False)
-                    br.addheaders = [('User-agent', 'Mozilla/5.0 (X11; U; Linux i686; en-US; rv:1.9.0.1) Gecko/2008071615 Fedora/3.0.1-1.fc9 Firefox/3.0.1')]
-                    br.open(url)
-                    title = br.title()
-                    br.close()
+                    httpRequest = self.httpService.get(url)
+                    httpRequest.raise_for_status()
+                    title = BeautifulSoup(httpRequest.content, "html.parser", parse_only = SoupStrainer("title")).title.string
                 except Exception as e:
                     printS(f"Could not fetch name from URL {url}:\n{e}", color = BashColor.FAIL)
                     return None
@@ -87,8 +88,8 @@ class SharedService():
         if(playlist == None or playlist.playWatchedStreams):
             return PlaylistDetailed()
         
-        for id in playlist.streamIds:
-            stream = self.queueStreamService.get(id, includeSoftDeleted)
+        streams = self.queueStreamService.getMany(playlist.streamIds, includeSoftDeleted)
+        for stream in streams:
             if(stream != None and stream.watched != None):
                 data.queueStreams.append(stream)
         
@@ -110,6 +111,7 @@ class SharedService():
             bool: Result.
         """
         
+        self.playlistService.loadStreamIndex()
         for stream in data.queueStreams:
             if(permanentlyDelete):
                 self.queueStreamService.remove(stream.id, includeSoftDeleted)
@@ -118,6 +120,7 @@ class SharedService():
                 
             for playlist in data.playlists:
                 playlist.streamIds.remove(stream.id)
+                StreamIndex.removeMembership(stream.id, playlist.id)
                 result = self.playlistService.update(playlist)
                 if(not result):
                     printD("failed to update Playlist \"", playlist.name, "\".", color = BashColor.WARNING, debug = self.settings.debug)
@@ -135,12 +138,9 @@ class SharedService():
         
         data = PlaylistDetailed()
         
-        allQ = self.queueStreamService.getAll(includeSoftDeleted = True)
-        data.queueStreams = [_ for _ in allQ if _.deleted != None]
-        allS = self.streamSourceService.getAll(includeSoftDeleted = True)
-        data.streamSources = [_ for _ in allS if _.deleted != None]
-        allP = self.playlistService.getAllSorted(includeSoftDeleted = True)
-        data.playlists = [_ for _ in allP if _.deleted != None]
+        data.queueStreams = self.queueStreamService.getAllDeleted()
+        data.streamSources = self.streamSourceService.getAllDeleted()
+        data.playlists = self.playlistService.getAllDeletedSorted()
         
         return data
     
@@ -305,19 +305,9 @@ class SharedService():
         
         data = PlaylistDetailed()
         
-        queueStreams = self.queueStreamService.getAll(includeSoftDeleted = True)
-        streamSources = self.streamSourceService.getAll(includeSoftDeleted = True)
-        playlists = self.playlistService.getAllSorted(includeSoftDeleted = True)
-        
-        for entity in queueStreams:
-            if(entity.deleted != None):
-                data.queueStreams.append(entity)
-        for entity in streamSources:
-            if(entity.deleted != None):
-                data.streamSources.append(entity)
-        for entity in playlists:
-            if(entity.deleted != None):
-                data.playlists.append(entity)
+        data.queueStreams = self.queueStreamService.getAllDeleted()
+        data.streamSources = self.streamSourceService.getAllDeleted()
+        data.playlists = self.playlistService.getAllDeletedSorted()
         
         return data
     
\ No newline at end of file
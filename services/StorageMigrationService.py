@@ -0,0 +1,65 @@
+import json
+import os
+from typing import Dict
+
+from grdUtil.BashColor import BashColor
+from grdUtil.PrintUtil import printD, printS
+
+from model.Playlist import Playlist
+from model.QueueStream import QueueStream
+from model.StreamSource import StreamSource
+from repositories.SqliteRepository import SqliteRepository
+from Settings import Settings
+
+
+class StorageMigrationService():
+    settings: Settings = None
+
+    def __init__(self):
+        self.settings = Settings()
+
+    def migrateJsonToSqlite(self, batchSize: int = 1000) -> Dict[str, int]:
+        """
+        One-shot migration of all entities in the JSON file tree (LOCAL_STORAGE_PATH/<Type>/<id>.json) to the SQLite database in SQLITE_FILEPATH. Existing rows with the same ID are replaced. JSON files are left untouched.
+
+        Args:
+            batchSize (int): Number of entities to write per transaction. Defaults to 1000.
+
+        Returns:
+            Dict[str, int]: Number of entities migrated, by type name.
+        """
+
+        result = {}
+        for typeT in [Playlist, StreamSource, QueueStream]:
+            typeName = typeT.__name__
+            directory = os.path.join(self.settings.localStoragePath, typeName)
+            repository = SqliteRepository(typeT, self.settings.debug, self.settings.sqliteFilepath)
+            result[typeName] = 0
+            if(not os.path.isdir(directory)):
+                printD("No directory for ", typeName, " at ", directory, ", skipping.", color = BashColor.WARNING, debug = self.settings.debug)
+                continue
+
+            batch = []
+            for filename in os.listdir(directory):
+                if(not filename.endswith(".json")):
+                    continue
+
+                try:
+                    with open(os.path.join(directory, filename), "r") as file:
+                        entity = typeT(**json.load(file))
+                except Exception as e:
+                    printS("Could not read ", typeName, " file \"", filename, "\", it was skipped: ", e, color = BashColor.FAIL)
+                    continue
+
+                if(entity.id == None):
+                    entity.id = filename[:-len(".json")]
+
+                batch.append(entity)
+                if(len(batch) >= batchSize):
+                    result[typeName] += repository.addMany(batch)
+                    batch = []
+
+            result[typeName] += repository.addMany(batch)
+            printS("Migrated ", result[typeName], " ", typeName, "(s).", color = BashColor.OKGREEN)
+
+        return result
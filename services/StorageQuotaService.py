@@ -0,0 +1,216 @@
+import os
+import threading
+from typing import Dict, List, Set
+
+from grdUtil.BashColor import BashColor
+from grdUtil.PrintUtil import printD, printS
+
+from model.DownloadJob import DownloadJob
+from repositories.DownloadStore import DownloadStore
+from repositories.StreamIndex import StreamIndex
+from services.EntityService import EntityService
+from services.PlaylistService import PlaylistService
+from services.QueueStreamService import QueueStreamService
+from Settings import Settings
+
+
+class StorageQuotaService():
+    """
+    Keeps downloaded videos under LOCAL_STORAGE_PATH/video within VIDEO_STORAGE_LIMIT by evicting the least recently used. Videos whose QueueStreams are all watched or soft deleted go first, and videos of the next EVICTION_PROTECTED_STREAMS unwatched QueueStreams of any Playlist are never evicted. Hardlinks of the same video (DownloadStore) are evicted together, as space is only freed when the last one is gone. Videos not in DownloadStore are matched to QueueStreams by the path of the DownloadJob that downloaded them, and videos with no QueueStream are never evicted, only reported with dryRun.
+    """
+
+    lock: threading.Lock = threading.Lock()
+    ignoredExtensions: List[str] = [".part", ".json", ".tmp"]
+    downloadJobEntityService: EntityService[DownloadJob] = None # Not DownloadJobService, which uses this service
+    playlistService: PlaylistService = None
+    queueStreamService: QueueStreamService = None
+    settings: Settings = None
+
+    def __init__(self):
+        self.playlistService = PlaylistService()
+        self.queueStreamService = QueueStreamService()
+        self.settings = Settings()
+        self.downloadJobEntityService = EntityService(DownloadJob, self.settings.debug, os.path.join(self.settings.localStoragePath, "DownloadJob"))
+        DownloadStore.load(os.path.join(self.settings.localStoragePath, "video", "downloadStore.json"))
+
+    def enforce(self, dryRun: bool = False) -> int:
+        """
+        Evict videos until total size is within VIDEO_STORAGE_LIMIT, or report what would be evicted.
+
+        Args:
+            dryRun (bool): Only print what would be evicted and how much could be freed. Defaults to False.
+
+        Returns:
+            int: Bytes freed, or that would be freed if dryRun.
+        """
+
+        with StorageQuotaService.lock:
+            videos = self.getVideos()
+            total = sum([_["size"] for _ in videos])
+            limit = int(self.settings.videoStorageLimit * 1024 ** 3)
+            unknown = [_ for _ in videos if(_["unknown"])]
+            evictable = [_ for _ in videos if(not _["protected"] and not _["unknown"])]
+            evictable.sort(key = lambda _: (not _["finished"], _["accessed"]))
+            toEvict = []
+            remaining = total
+            for video in evictable:
+                if(limit <= 0 or remaining <= limit):
+                    break
+
+                toEvict.append(video)
+                remaining -= video["size"]
+
+            if(dryRun):
+                reclaimable = sum([_["size"] for _ in evictable if(_["finished"])])
+                printS("Videos use ", self.toGiB(total), " GiB", (" of " + self.toGiB(limit) + " GiB") if(limit > 0) else ", no limit set (VIDEO_STORAGE_LIMIT)", ".")
+                printS(len([_ for _ in videos if(_["protected"])]), " video(s) are protected as next in a Playlist, ", self.toGiB(reclaimable), " GiB are watched or deleted and can be reclaimed.")
+                for video in toEvict:
+                    printS("\tWould evict ", self.toGiB(video["size"]), " GiB", ", watched or deleted" if(video["finished"]) else "", ": ", video["paths"][0], color = BashColor.WARNING)
+
+                printS(len(unknown), " video(s) (", self.toGiB(sum([_["size"] for _ in unknown])), " GiB) do not belong to any known stream and are never evicted, delete them manually if not needed:", doPrint = (len(unknown) > 0))
+                for video in unknown:
+                    printS("\t", self.toGiB(video["size"]), " GiB: ", video["paths"][0])
+
+                if(remaining > limit and limit > 0):
+                    printS("Protected and unknown videos alone exceed the limit, ", self.toGiB(remaining - limit), " GiB over.", color = BashColor.FAIL)
+
+                return sum([_["size"] for _ in toEvict])
+
+            freed = 0
+            for video in toEvict:
+                if(self.evict(video)):
+                    freed += video["size"]
+
+            printS("Evicted ", len(toEvict), " video(s), freed ", self.toGiB(freed), " GiB to stay within ", self.toGiB(limit), " GiB.", color = BashColor.OKGREEN, doPrint = (len(toEvict) > 0))
+            return freed
+
+    def getVideos(self) -> List[dict]:
+        """
+        Get downloaded videos, with hardlinks of the same file as one video.
+
+        Returns:
+            List[dict]: Videos with paths, size (once per file), accessed (timestamp), finished (all QueueStreams watched or soft deleted), protected and unknown (no QueueStream found).
+        """
+
+        videoDirectory = os.path.join(self.settings.localStoragePath, "video")
+        protectedIds = self.getProtectedStreamIds()
+        streamIdsByPath = self.getStreamIdsByPath()
+        videosByFile = {}
+        for directory, _, filenames in os.walk(videoDirectory):
+            for filename in filenames:
+                if(os.path.splitext(filename)[1] in self.ignoredExtensions):
+                    continue
+
+                path = os.path.join(directory, filename)
+                stat = os.stat(path)
+                fileKey = (stat.st_dev, stat.st_ino) if(stat.st_ino != 0) else path
+                video = videosByFile.setdefault(fileKey, {"paths": [], "size": stat.st_size, "accessed": 0, "storeKey": None})
+                video["paths"].append(path)
+                video["accessed"] = max(video["accessed"], stat.st_atime, stat.st_mtime)
+                video["storeKey"] = video["storeKey"] or DownloadStore.getKeyOfPath(path)
+
+        result = []
+        for video in videosByFile.values():
+            streams = self.getStreams(video["storeKey"])
+            if(len(streams) == 0):
+                streamIds = list(set([streamIdsByPath[_] for _ in map(os.path.abspath, video["paths"]) if(_ in streamIdsByPath)]))
+                streams = [_ for _ in self.queueStreamService.getMany(streamIds, includeSoftDeleted = True) if(_ != None)]
+
+            video["accessed"] = max(video["accessed"], DownloadStore.getAccessed(video["storeKey"])) if(video["storeKey"] != None) else video["accessed"]
+            video["finished"] = len(streams) > 0 and all([_.watched != None or _.deleted != None for _ in streams])
+            video["protected"] = any([_.id in protectedIds for _ in streams])
+            video["unknown"] = len(streams) == 0
+            result.append(video)
+
+        return result
+
+    def getStreamIdsByPath(self) -> Dict[str, str]:
+        """
+        Get IDs of QueueStreams by path of their downloaded video, from finished DownloadJobs.
+
+        Returns:
+            Dict[str, str]: IDs of QueueStreams by absolute path.
+        """
+
+        return {os.path.abspath(_.path): _.queueStreamId for _ in self.downloadJobEntityService.getAll(includeSoftDeleted = True) if(_.path != None and _.queueStreamId != None)}
+
+    def getStreams(self, storeKey: str) -> list:
+        """
+        Get QueueStreams of a video in DownloadStore, including soft deleted.
+
+        Args:
+            storeKey (str): Key in DownloadStore, or None.
+
+        Returns:
+            List[QueueStream]: QueueStreams, empty if storeKey is None or no QueueStream has the video.
+        """
+
+        if(storeKey == None):
+            return []
+
+        sourceTypeValue, remoteId = storeKey.split(" ", 1)
+        streamIds = StreamIndex.findByRemoteId(int(sourceTypeValue), remoteId)
+        return [_ for _ in self.queueStreamService.getMany(streamIds, includeSoftDeleted = True) if(_ != None)]
+
+    def getProtectedStreamIds(self) -> Set[str]:
+        """
+        Get IDs of the next EVICTION_PROTECTED_STREAMS unwatched QueueStreams of every Playlist, loading QueueStreams in windows until enough are found.
+
+        Returns:
+            Set[str]: IDs of QueueStreams.
+        """
+
+        self.playlistService.loadStreamIndex()
+        count = self.settings.evictionProtectedStreams
+        result = set()
+        if(count <= 0):
+            return result
+
+        for playlist in self.playlistService.getAll():
+            found = 0
+            for start in range(0, len(playlist.streamIds), count * 2):
+                for stream in self.queueStreamService.getMany(playlist.streamIds[start:start + count * 2]):
+                    if(stream != None and stream.watched == None and found < count):
+                        result.add(stream.id)
+                        found += 1
+
+                if(found >= count):
+                    break
+
+        return result
+
+    def evict(self, video: dict) -> bool:
+        """
+        Delete all paths of a video and remove them from DownloadStore.
+
+        Args:
+            video (dict): Video from getVideos.
+
+        Returns:
+            bool: True if all paths were deleted.
+        """
+
+        result = True
+        for path in video["paths"]:
+            try:
+                os.remove(path)
+                DownloadStore.removePath(path)
+                printD("Evicted ", path, debug = self.settings.debug)
+            except OSError as e:
+                printS("Could not evict ", path, ": ", e, color = BashColor.WARNING)
+                result = False
+
+        return result
+
+    def toGiB(self, byteCount: int) -> str:
+        """
+        Format bytes as GiB.
+
+        Args:
+            byteCount (int): Bytes.
+
+        Returns:
+            str: GiB with 2 decimals.
+        """
+
+        return f"{byteCount / 1024 ** 3:.2f}"
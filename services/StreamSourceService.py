@@ -2,18 +2,18 @@ import os
 
 import validators
 from enums.StreamSourceType import StreamSourceTypeUtil
-from grdService.BaseService import BaseService
 from model.StreamSource import StreamSource
+from services.EntityService import EntityService
 from Settings import Settings
 
 T = StreamSource
 
-class StreamSourceService(BaseService[T]):
+class StreamSourceService(EntityService[T]):
     settings: Settings = None
 
     def __init__(self):
         self.settings = Settings()
-        BaseService.__init__(self, T, self.settings.debug, os.path.join(self.settings.localStoragePath, "StreamSource"))
+        EntityService.__init__(self, T, self.settings.debug, os.path.join(self.settings.localStoragePath, "StreamSource"))
 
     def add(self, streamSource: T) -> T:
         """
@@ -30,5 +30,5 @@ class StreamSourceService(BaseService[T]):
         entity.isWeb = validators.url(entity.uri)
         entity.streamSourceTypeId = StreamSourceTypeUtil.strToStreamSourceType(entity.uri).value
         
-        return BaseService.add(self, entity)
+        return EntityService.add(self, entity)
         
\ No newline at end of file
@@ -0,0 +1,219 @@
+import re
+from functools import lru_cache
+from typing import List, Tuple
+from urllib.parse import parse_qs, parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+from enums.StreamSourceType import StreamSourceType
+
+
+class UrlService():
+    """
+    Canonical URLs and IDs for the URL shapes of supported platforms, so the same video or channel is recognized however it was linked (youtu.be/X, m.youtube.com/watch?v=X&t=10, /shorts/X, ...). Patterns are compiled once and results are cached, as the same URLs are looked up repeatedly by duplicate checks and fetch.
+    """
+
+    cacheSize: int = 4096
+    trackingParameters: List[str] = ["fbclid", "feature", "gclid", "igshid", "pp", "si"] # And utm_*
+    schemeRegex: re.Pattern = re.compile(r"^[a-z][a-z0-9+.-]*://", re.IGNORECASE)
+    schemelessHostRegex: re.Pattern = re.compile(r"^((?:[\w-]+\.)+[a-z]{2,})(?::\d+)?(/|[?#]|$)", re.IGNORECASE)
+    youtubeHosts: List[str] = ["youtube.com", "m.youtube.com", "music.youtube.com", "youtube-nocookie.com", "youtu.be"]
+    youtubeVideoIdRegex: re.Pattern = re.compile(r"^[\w-]{11}$")
+    youtubeShortVideoPathRegex: re.Pattern = re.compile(r"^/([\w-]{11})(?:/|$)")
+    youtubeVideoPathRegex: re.Pattern = re.compile(r"^/(?:shorts|embed|live|v|e)/([\w-]{11})(?:/|$)")
+    youtubeChannelPathRegex: re.Pattern = re.compile(r"^/(?:channel/(UC[\w-]{22})|(@[^/]+)|((?:c|user)/[^/]+))")
+    odyseeHosts: List[str] = ["odysee.com", "lbry.tv"]
+    odyseeClaimPathRegex: re.Pattern = re.compile(r"^/(@[^/]+(?:/[^/]+)?)")
+    rumbleHosts: List[str] = ["rumble.com"]
+    rumbleVideoPathRegex: re.Pattern = re.compile(r"^/(v[0-9a-z]+)(?:-[^/]*)?\.html", re.IGNORECASE)
+    rumbleChannelPathRegex: re.Pattern = re.compile(r"^/((?:c|user)/[^/]+)")
+
+    @lru_cache(maxsize = cacheSize)
+    def canonicalize(url: str) -> Tuple[StreamSourceType, str, str]:
+        """
+        Get platform, canonical ID and canonical URL of url. Videos are identified by their platform ID (YouTube video ID, Rumble v-ID, Odysee claim path), channels by ID or handle, and tracking, timestamp and other query arguments are dropped. Other URLs, and URLs of supported platforms not recognized as a video, channel or playlist, only get scheme and host lower cased, fragment, trailing slash and tracking query arguments removed and query arguments sorted.
+
+        Args:
+            url (str): URL, with or without scheme.
+
+        Returns:
+            Tuple[StreamSourceType, str, str]: Tuple of (StreamSourceType or None if not a supported platform, canonical ID or None if url is not a video, channel or playlist, canonical URL). For things that are not URLs, like paths, (None, None, url).
+        """
+
+        if(url == None):
+            return (None, None, None)
+
+        text = url.strip()
+        if(UrlService.schemeRegex.match(text) == None):
+            # Filenames like movie.mkv look like hosts, so without scheme only known hosts or a host followed by a path are URLs
+            match = UrlService.schemelessHostRegex.match(text)
+            if(match == None or (match.group(2) != "/" and UrlService.removeWww(match.group(1).lower()) not in UrlService.youtubeHosts + UrlService.odyseeHosts + UrlService.rumbleHosts)):
+                return (None, None, text)
+
+            text = f"https://{text}"
+
+        try:
+            parts = urlsplit(text)
+            host = (parts.hostname or "").lower()
+        except ValueError:
+            return (None, None, text)
+
+        host = UrlService.removeWww(host)
+        path = unquote(parts.path)
+        if(host in UrlService.youtubeHosts):
+            return UrlService.canonicalizeYoutube(host, path, parts.query)
+        elif(host in UrlService.odyseeHosts):
+            return UrlService.canonicalizeOdysee(path, parts.query)
+        elif(host in UrlService.rumbleHosts):
+            return UrlService.canonicalizeRumble(path, parts.query)
+
+        return (None, None, urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), UrlService.canonicalizeQuery(parts.query), "")))
+
+    def canonicalizeYoutube(host: str, path: str, query: str) -> Tuple[StreamSourceType, str, str]:
+        """
+        Get canonical ID and URL of a YouTube video (https://www.youtube.com/watch?v=ID), channel (https://www.youtube.com/channel/UC..., /@handle, /c/name or /user/name) or playlist (https://www.youtube.com/playlist?list=ID).
+
+        Args:
+            host (str): Host without www.
+            path (str): Path.
+            query (str): Query string.
+
+        Returns:
+            Tuple[StreamSourceType, str, str]: See canonicalize.
+        """
+
+        arguments = parse_qs(query)
+        match = UrlService.youtubeShortVideoPathRegex.match(path) if(host == "youtu.be") else UrlService.youtubeVideoPathRegex.match(path)
+        videoId = match.group(1) if(match != None) else None
+        if(videoId == None and path.rstrip("/") == "/watch"):
+            videoId = arguments.get("v", [None])[0]
+
+        if(videoId != None and UrlService.youtubeVideoIdRegex.match(videoId) != None):
+            return (StreamSourceType.YOUTUBE, videoId, f"https://www.youtube.com/watch?v={videoId}")
+
+        if(path.rstrip("/") == "/playlist" and "list" in arguments):
+            playlistId = arguments["list"][0]
+            return (StreamSourceType.YOUTUBE, playlistId, f"https://www.youtube.com/playlist?list={quote(playlistId, safe = '')}")
+
+        match = UrlService.youtubeChannelPathRegex.match(path)
+        if(match != None):
+            channelId, handle, legacyName = match.groups()
+            if(channelId != None):
+                return (StreamSourceType.YOUTUBE, channelId, f"https://www.youtube.com/channel/{channelId}")
+
+            # Handles are case insensitive
+            id = handle.lower() if(handle != None) else legacyName
+            return (StreamSourceType.YOUTUBE, id, f"https://www.youtube.com/{UrlService.quotePath(id)}")
+
+        return (StreamSourceType.YOUTUBE, None, UrlService.getOtherUrl("www.youtube.com", path, query))
+
+    def canonicalizeOdysee(path: str, query: str) -> Tuple[StreamSourceType, str, str]:
+        """
+        Get canonical ID and URL of an Odysee video (https://odysee.com/@channel:c/video:v) or channel (https://odysee.com/@channel:c). The ID is the claim path.
+
+        Args:
+            path (str): Path.
+            query (str): Query string.
+
+        Returns:
+            Tuple[StreamSourceType, str, str]: See canonicalize.
+        """
+
+        match = UrlService.odyseeClaimPathRegex.match(path)
+        if(match == None):
+            return (StreamSourceType.ODYSEE, None, UrlService.getOtherUrl("odysee.com", path, query))
+
+        claimPath = match.group(1)
+        return (StreamSourceType.ODYSEE, claimPath, f"https://odysee.com/{UrlService.quotePath(claimPath)}")
+
+    def canonicalizeRumble(path: str, query: str) -> Tuple[StreamSourceType, str, str]:
+        """
+        Get canonical ID and URL of a Rumble video (https://rumble.com/vID-title.html, ID is vID) or channel (https://rumble.com/c/name or /user/name).
+
+        Args:
+            path (str): Path.
+            query (str): Query string.
+
+        Returns:
+            Tuple[StreamSourceType, str, str]: See canonicalize.
+        """
+
+        match = UrlService.rumbleVideoPathRegex.match(path)
+        if(match != None):
+            return (StreamSourceType.RUMBLE, match.group(1).lower(), f"https://rumble.com{UrlService.quotePath(path)}")
+
+        match = UrlService.rumbleChannelPathRegex.match(path)
+        if(match != None):
+            return (StreamSourceType.RUMBLE, match.group(1), f"https://rumble.com/{UrlService.quotePath(match.group(1))}")
+
+        return (StreamSourceType.RUMBLE, None, UrlService.getOtherUrl("rumble.com", path, query))
+
+    def getOtherUrl(host: str, path: str, query: str) -> str:
+        """
+        Get canonical URL of a URL of a supported platform not recognized as a video, channel or playlist, keeping its query, see canonicalizeQuery.
+
+        Args:
+            host (str): Host to use.
+            path (str): Unquoted path.
+            query (str): Query string.
+
+        Returns:
+            str: Canonical URL.
+        """
+
+        return urlunsplit(("https", host, UrlService.quotePath(path.rstrip("/")), UrlService.canonicalizeQuery(query), ""))
+
+    def canonicalizeQuery(query: str) -> str:
+        """
+        Get query string with tracking arguments (trackingParameters, utm_*) removed and arguments sorted.
+
+        Args:
+            query (str): Query string.
+
+        Returns:
+            str: Query string, empty if no arguments are left.
+        """
+
+        arguments = [_ for _ in parse_qsl(query, keep_blank_values = True) if(_[0] not in UrlService.trackingParameters and not _[0].startswith("utm_"))]
+        return urlencode(sorted(arguments))
+
+    def quotePath(path: str) -> str:
+        """
+        Percent-encode an unquoted path for use in a canonical URL. IDs are kept unquoted.
+
+        Args:
+            path (str): Unquoted path.
+
+        Returns:
+            str: Path, with "/", "@" and ":" kept as is.
+        """
+
+        return quote(path, safe = "/@:")
+
+    def removeWww(host: str) -> str:
+        """
+        Remove leading www. from host.
+
+        Args:
+            host (str): Lower cased host.
+
+        Returns:
+            str: Host.
+        """
+
+        return host[4:] if(host.startswith("www.")) else host
+
+    def getYoutubeVideoId(url: str) -> str:
+        """
+        Get ID of YouTube video from any YouTube video URL.
+
+        Args:
+            url (str): URL.
+
+        Returns:
+            str | None: Video ID, None if url is not a YouTube video.
+        """
+
+        sourceType, id, canonicalUrl = UrlService.canonicalize(url)
+        if(sourceType != StreamSourceType.YOUTUBE or id == None or not canonicalUrl.startswith("https://www.youtube.com/watch?v=")):
+            return None
+
+        return id
@@ -0,0 +1,231 @@
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Dict, List
+
+from grdUtil.BashColor import BashColor
+from grdUtil.PrintUtil import printD, printS
+
+from services.QueueStreamService import QueueStreamService
+from Settings import Settings
+
+
+class WatchedWriterService():
+    """
+    Process-wide write-behind buffer for QueueStreams watched during playback and their lines in WATCHED_LOG_FILEPATH, and other changes to QueueStreams made in the background during playback, written in the order they were added. Playback only adds to the buffer, a background thread appends each addition to a journal under LOCAL_STORAGE_PATH right away and writes QueueStreams and log every WATCHED_FLUSH_INTERVAL seconds, on flush and on exit. Additions left in the journal by a crash are written the next time the journal is loaded.
+    """
+
+    lock: threading.Lock = threading.Lock()
+    ioLock: threading.RLock = threading.RLock()
+    wakeEvent: threading.Event = threading.Event()
+    thread: threading.Thread = None
+    pending: List[dict] = []
+    journaled: List[dict] = []
+    journalPath: str = None
+    queueStreamService: QueueStreamService = None
+    settings: Settings = None
+
+    def __init__(self):
+        self.queueStreamService = QueueStreamService()
+        self.settings = Settings()
+        self.load(os.path.join(self.settings.localStoragePath, "watchedJournal.jsonl"))
+
+    def load(self, path: str) -> None:
+        """
+        Use journal in path, once per path, writing any additions left in it.
+
+        Args:
+            path (str): Absolute path of journal file.
+        """
+
+        with WatchedWriterService.ioLock:
+            if(WatchedWriterService.journalPath == path):
+                return
+
+            if(WatchedWriterService.journalPath == None):
+                atexit.register(self.flush)
+            else:
+                self.flush()
+
+            WatchedWriterService.journalPath = path
+            if(not os.path.isfile(path)):
+                return
+
+            records = []
+            with open(path, "r") as file:
+                for line in file:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue # Last line may be cut off by a crash
+
+            with WatchedWriterService.lock:
+                WatchedWriterService.journaled = records + WatchedWriterService.journaled
+
+            nRecords = len([_ for _ in records if("logOffset" not in _)])
+            printS("Writing ", nRecords, " watched stream(s) left from last playback.", color = BashColor.WARNING, doPrint = (nRecords > 0))
+            try:
+                self.apply()
+            except OSError as e:
+                printS("Could not write watched streams left from last playback, they are kept for next time: ", e, color = BashColor.FAIL)
+
+    def add(self, streamId: str = None, watched: str = None, logLine: str = None, fields: Dict[str, object] = None) -> None:
+        """
+        Add a watched QueueStream and/or a log line, to be written in the background.
+
+        Args:
+            streamId (str): ID of QueueStream to set as watched, or change fields of. Defaults to None.
+            watched (str): Date and time watched. Defaults to None.
+            logLine (str): Line to append to WATCHED_LOG_FILEPATH. Defaults to None.
+            fields (Dict[str, object]): Other fields of QueueStream to set, by name. Defaults to None.
+        """
+
+        with WatchedWriterService.lock:
+            WatchedWriterService.pending.append({"streamId": streamId, "watched": watched, "logLine": logLine, "fields": fields})
+            if(WatchedWriterService.thread == None or not WatchedWriterService.thread.is_alive()):
+                WatchedWriterService.thread = threading.Thread(target = self.run, name = "watchedWriter", daemon = True)
+                WatchedWriterService.thread.start()
+
+        WatchedWriterService.wakeEvent.set()
+
+    def run(self) -> None:
+        """
+        Journal additions as they come and write them every WATCHED_FLUSH_INTERVAL seconds, until nothing is left.
+        """
+
+        nextApply = time.monotonic() + self.settings.watchedFlushInterval
+        while(True):
+            WatchedWriterService.wakeEvent.wait(timeout = max(0.1, nextApply - time.monotonic()))
+            WatchedWriterService.wakeEvent.clear()
+            try:
+                self.journal()
+                if(time.monotonic() >= nextApply):
+                    self.apply()
+                    nextApply = time.monotonic() + self.settings.watchedFlushInterval
+            except OSError as e:
+                printD("Could not write watched streams: ", e, debug = self.settings.debug)
+
+            with WatchedWriterService.lock:
+                if(len(WatchedWriterService.pending) == 0 and len(WatchedWriterService.journaled) == 0):
+                    WatchedWriterService.thread = None
+                    return
+
+    def flush(self) -> None:
+        """
+        Write all additions now, waiting for disk. Used on quit, interrupt and exit.
+        """
+
+        with WatchedWriterService.ioLock:
+            self.journal()
+            self.apply()
+
+    def journal(self) -> None:
+        """
+        Append additions not yet in the journal to it.
+        """
+
+        with WatchedWriterService.ioLock:
+            with WatchedWriterService.lock:
+                records = WatchedWriterService.pending
+                WatchedWriterService.pending = []
+
+            if(len(records) == 0 or WatchedWriterService.journalPath == None):
+                return
+
+            try:
+                with open(WatchedWriterService.journalPath, "a") as file:
+                    file.write("".join([json.dumps(_) + "\n" for _ in records]))
+                    file.flush()
+                    os.fsync(file.fileno())
+            except OSError:
+                with WatchedWriterService.lock:
+                    WatchedWriterService.pending = records + WatchedWriterService.pending
+                raise
+
+            with WatchedWriterService.lock:
+                WatchedWriterService.journaled += records
+
+    def apply(self) -> int:
+        """
+        Write journaled additions to QueueStreams, then to WATCHED_LOG_FILEPATH, then empty the journal. Additions are kept in the journal if writing fails. Before log lines are appended, the size of the log is saved in the journal, and a retry or a replay after a crash cuts the log back to that size first, so no line is written twice.
+
+        Returns:
+            int: Number of QueueStreams set as watched.
+        """
+
+        with WatchedWriterService.ioLock:
+            with WatchedWriterService.lock:
+                records = WatchedWriterService.journaled
+                WatchedWriterService.journaled = []
+
+            if(len(records) == 0):
+                return 0
+
+            try:
+                changesById = {}
+                for record in [_ for _ in records if(_.get("streamId") != None)]:
+                    changes = changesById.setdefault(record["streamId"], {})
+                    changes.update(record.get("fields") or {})
+                    if(record["watched"] != None):
+                        changes["watched"] = record["watched"]
+
+                streams = self.queueStreamService.getMany(list(changesById.keys()))
+                result = 0
+                for stream in streams:
+                    if(stream == None):
+                        continue
+
+                    for name, value in changesById[stream.id].items():
+                        setattr(stream, name, value)
+
+                    if(self.queueStreamService.update(stream) == None):
+                        printS("\"", stream.name, "\" could not be updated.", color = BashColor.ERROR)
+                    elif("watched" in changesById[stream.id]):
+                        result += 1
+
+                nMissing = len([_ for _ in streams if(_ == None)])
+                printS(nMissing, " stream(s) were not found and could not be updated.", color = BashColor.WARNING, doPrint = (nMissing > 0))
+
+                logLines = [_["logLine"] for _ in records if(_.get("logLine") != None)]
+                if(len(logLines) > 0 and len(self.settings.watchedLogFilepath) > 0):
+                    self.writeLog(records, logLines)
+            except Exception:
+                with WatchedWriterService.lock:
+                    WatchedWriterService.journaled = records + WatchedWriterService.journaled
+                raise
+
+            with open(WatchedWriterService.journalPath, "w"):
+                pass
+
+            printD("Wrote ", result, " watched stream(s) and ", len(logLines), " log line(s).", debug = self.settings.debug)
+            return result
+
+    def writeLog(self, records: List[dict], logLines: List[str]) -> None:
+        """
+        Append logLines to WATCHED_LOG_FILEPATH, at the size saved in records if they were appended before, else saving the current size in records and the journal first.
+
+        Args:
+            records (List[dict]): Journaled additions being written, the saved size is added to them.
+            logLines (List[str]): Lines to append.
+        """
+
+        with open(self.settings.watchedLogFilepath, "ab") as file:
+            size = file.seek(0, os.SEEK_END)
+            logOffset = next((_["logOffset"] for _ in records if("logOffset" in _)), None)
+            if(logOffset != None and logOffset <= size):
+                file.truncate(logOffset)
+                file.seek(logOffset)
+            else:
+                marker = {"logOffset": size}
+                with open(WatchedWriterService.journalPath, "a") as journalFile:
+                    journalFile.write(json.dumps(marker) + "\n")
+                    journalFile.flush()
+                    os.fsync(journalFile.fileno())
+
+                records.insert(0, marker)
+
+            file.write("".join(logLines).encode())
+            file.flush()
+            os.fsync(file.fileno())